@@ -0,0 +1,83 @@
+# bench/analytics.py
+# Progress analytics on long histories: main.analyze_progress (NumPy) against the same
+# numbers computed with plain Python loops, plus the paged history fetch from the stub.
+#
+#   python bench/analytics.py [years] [completions_per_day]
+import sys
+import time
+from datetime import date, timedelta
+
+from servers import TrelloStub, import_main
+from synthetic import make_board, make_history
+
+main = import_main()
+
+def analyze_loops(history, card_lists, n_lists, total_items, completed_items, today):
+    """Reference: velocity / burndown with dicts and loops"""
+    window = main.ANALYTICS_WINDOW
+    n_days = max(main.ANALYTICS_DAYS, 2 * window)
+    start = today - timedelta(days=n_days - 1)
+    daily = [0] * n_days
+    per_list = [[0] * n_days for _ in range(n_lists)]
+    for day, card, delta in zip(history["dates"], history["cards"], history["deltas"]):
+        card_id = history["card_ids"][card]
+        d = (date.fromisoformat(day) - start).days
+        if 0 <= d < n_days:
+            daily[d] += delta
+            li = card_lists.get(card_id, -1)
+            if li >= 0:
+                per_list[li][d] += delta
+    remaining, left = [0] * n_days, total_items - completed_items
+    for d in range(n_days - 1, -1, -1):
+        remaining[d] = left
+        left += daily[d]
+    xs = range(window)
+    ys = remaining[-window:]
+    mx, my = sum(xs) / window, sum(ys) / window
+    slope = sum((x - mx) * (y - my) for x, y in zip(xs, ys)) / sum((x - mx) ** 2 for x in xs)
+    return {"velocity": sum(daily[-window:]) / window, "previous": sum(daily[-2 * window:-window]) / window,
+            "burn_rate": -slope, "lists_done": [sum(row[-window:]) for row in per_list]}
+
+if __name__ == "__main__":
+    years = int(sys.argv[1]) if len(sys.argv) > 1 else 3
+    per_day = int(sys.argv[2]) if len(sys.argv) > 2 else 500
+    main.ANALYTICS_DAYS = years * 365
+    board = make_board(lists=20, cards_per_list=100, checklists_per_card=2, items_per_checklist=10)
+    t0 = time.perf_counter()
+    history = make_history(board, days=main.ANALYTICS_DAYS, per_day=per_day)
+    print(f"{len(history)} completion actions over {years} years (generated in {time.perf_counter() - t0:.1f} s)")
+
+    card_ids = sorted({a["data"]["card"]["id"] for a in history})
+    codes = {card_id: i for i, card_id in enumerate(card_ids)}
+    events = {"dates": [a["date"][:10] for a in history], "cards": [codes[a["data"]["card"]["id"]] for a in history],
+              "deltas": [1 if a["data"]["checkItem"]["state"] == "complete" else -1 for a in history],
+              "card_ids": card_ids}
+    card_lists = {card["id"]: i for i, lst in enumerate(board) for card in lst["cards"]}
+    today = date.today()
+    args = (events, card_lists, len(board), 40000, 20000)
+
+    t0 = time.perf_counter()
+    ref = analyze_loops(*args, today)
+    loops = time.perf_counter() - t0
+    main.analyze_progress(*args, today)  # warm up the NumPy import
+    t0 = time.perf_counter()
+    got = main.analyze_progress(*args, today)
+    vectorized = time.perf_counter() - t0
+    same = all(abs(got[k] - ref[k]) < 1e-6 for k in ("velocity", "previous", "burn_rate")) and \
+        [int(x) for x in got["lists_done"]] == ref["lists_done"]
+    print(f"plain loops: {loops * 1000:8.1f} ms")
+    print(f"numpy:       {vectorized * 1000:8.1f} ms  ({loops / vectorized:.1f}x, results {'match' if same else 'DIFFER'})")
+
+    stub = TrelloStub({"b": board}, actions={"b": history})
+    main.TRELLO_API = stub.base_url + "/1"
+    main.ANALYTICS_MAX_PAGES = len(history) // main.ACTIONS_PAGE_LIMIT + 1
+    main.ROUTE_RATES["127.0.0.1"] = (1e9, 1e9)
+    try:
+        t0 = time.perf_counter()
+        fetched = main.get_completion_history("b")
+        print(f"history fetch: {len(fetched['deltas'])} events in {stub.requests} pages, "
+              f"{stub.bytes_sent / 1e6:.1f} MB, {time.perf_counter() - t0:.1f} s")
+    finally:
+        stub.close()
+    if not same:
+        sys.exit(1)
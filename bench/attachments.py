@@ -0,0 +1,71 @@
+# bench/attachments.py
+# Oversized-report delivery against a webhook stand-in enforcing an upload size limit:
+# uploads with each compression mode, reassembles what arrived and checks it matches
+# (exit 1 if any mode does not; CI runs it).
+#
+#   python bench/attachments.py [lists] [cards_per_list] [limit_kb]
+import email
+import gzip
+import io
+import sys
+import time
+import zipfile
+
+from servers import WebhookStub, import_main
+from synthetic import make_board
+
+main = import_main()
+
+def received_files(stub):
+    """(filename, payload) of every multipart upload the stand-in accepted"""
+    files = []
+    for _, content_type, body in stub.received:
+        if not content_type.startswith("multipart/"):
+            continue
+        msg = email.message_from_bytes(b"Content-Type: " + content_type.encode() + b"\r\n\r\n" + body)
+        for part in msg.get_payload():
+            files.append((part.get_filename(), part.get_payload(decode=True)))
+    return files
+
+def reassemble(files):
+    def part_no(name):
+        return int(name.split(".part")[1].split("of")[0]) if ".part" in name else 1
+    out = []
+    for name, data in sorted(files, key=lambda f: part_no(f[0])):
+        if name.endswith(".gz"):
+            data = gzip.decompress(data)
+        elif name.endswith(".zip"):
+            with zipfile.ZipFile(io.BytesIO(data)) as zf:
+                data = zf.read(zf.namelist()[0])
+        out.append(data)
+    return b"".join(out)
+
+if __name__ == "__main__":
+    lists = int(sys.argv[1]) if len(sys.argv) > 1 else 30
+    cards = int(sys.argv[2]) if len(sys.argv) > 2 else 300
+    limit = int(sys.argv[3]) * 1024 if len(sys.argv) > 3 else 256 * 1024
+
+    chunks, summary = main.render_report(make_board(lists=lists, cards_per_list=cards))
+    report = b"".join(chunks)
+    print(f"report {len(report) / 1024:.0f} kB, upload limit {limit / 1024:.0f} kB")
+    main.ATTACHMENT_LIMIT = limit
+    main.ROUTE_RATES["127.0.0.1"] = (2.5, 5)  # Discord webhook pacing
+
+    results = []
+    for mode in ("none", "gzip", "zip", "auto"):
+        stub = WebhookStub(max_body_bytes=limit, bucket_size=5, bucket_window=2.0)
+        main.WEBHOOK_URL = stub.url
+        main.REPORT_COMPRESSION = mode
+        t0 = time.perf_counter()
+        try:
+            main.send_to_discord_file(chunks, summary)
+        finally:
+            stub.close()
+        elapsed = time.perf_counter() - t0
+        files = received_files(stub)
+        sent = sum(len(d) for _, d in files)
+        ok = reassemble(files) == report
+        print(f"{mode:>5}: {len(files):3d} parts, {sent / 1024:7.0f} kB sent in {elapsed:5.2f} s, "
+              f"responses {dict(sorted(stub.status_counts.items()))}, reassembled ok: {ok}")
+        results.append(ok)
+    sys.exit(0 if all(results) else 1)
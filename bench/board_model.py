@@ -0,0 +1,83 @@
+# bench/board_model.py
+# Text report render of a board with large checklists: the board model (render_report) against
+# the render straight from the raw Trello dicts it replaced, inlined below. CPU time (best of
+# runs, with the garbage collector on and off: the gap is GC time) and, from tracemalloc, the
+# peak memory per card above the fetched board. Checks both renders give the same report.
+#
+#   python bench/board_model.py [lists] [cards_per_list] [runs]
+import gc
+import random
+import sys
+import time
+import tracemalloc
+
+from servers import import_main
+from synthetic import make_board
+
+main = import_main()
+
+def raw_dict_report(board_data):
+    """render_report's text report as it was before the board model: one pass over the dicts"""
+    phrases = main.load_phrases()
+    chunks = []
+    for lst in board_data:
+        lines = [f"📋 {lst.get('name', 'Unnamed list')}", ""]
+        for card in lst.get("cards", []):
+            checklist_items = [it for cl in card.get("checklists", []) for it in cl.get("checkItems", [])]
+            completed = sum(1 for it in checklist_items if it.get("state") == "complete")
+            card_done = bool(checklist_items) and completed == len(checklist_items)
+            lines.append(f"├─ {main.get_priority_emoji(card)} {card.get('name', 'Untitled card')} - "
+                         f"{'✅' if card_done else '❌'}")
+            for cl in card.get("checklists", []):
+                lines.append(f"│   📑 {cl.get('name', 'Checklist')}:")
+                for item in cl.get("checkItems", []):
+                    lines.append(f"│   ├─ {item.get('name', '')} - {'✅' if item.get('state') == 'complete' else '❌'}")
+            note = random.choice(phrases["card_praise"] if card_done else phrases["card_pep"])
+            lines.append(f"│   Note from Sora: {note}")
+            lines.append("")
+        lines.append("")
+        chunks.append((("\n" if chunks else "") + "\n".join(lines)).encode("utf-8"))
+    return b"".join(chunks)
+
+def model_report(board_data):
+    chunks, _ = main.render_report(board_data, formats=["text"])
+    return b"".join(chunks)
+
+def best_cpu(fn, board, runs, collect):
+    times = []
+    for _ in range(runs):
+        random.seed(1)
+        if not collect:
+            gc.disable()
+        t0 = time.process_time()
+        result = fn(board)
+        times.append(time.process_time() - t0)
+        gc.enable()
+        del result
+    return min(times) * 1000
+
+def peak_bytes(fn, board):
+    gc.collect()
+    random.seed(1)
+    tracemalloc.start()
+    result = fn(board)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peak, result
+
+if __name__ == "__main__":
+    lists = int(sys.argv[1]) if len(sys.argv) > 1 else 40
+    cards = int(sys.argv[2]) if len(sys.argv) > 2 else 1000
+    runs = int(sys.argv[3]) if len(sys.argv) > 3 else 3
+    board = make_board(lists=lists, cards_per_list=cards, checklists_per_card=3, items_per_checklist=10)
+    n_cards = lists * cards
+    print(f"{n_cards} cards, {n_cards * 30} checklist items (best of {runs} CPU times)")
+    print(f"{'':>20} {'cpu ms':>8} {'GC off':>8} {'peak MB':>8} {'B/card':>7}")
+    outputs = []
+    for name, fn in (("raw dicts", raw_dict_report), ("board model", model_report)):
+        with_gc = best_cpu(fn, board, runs, True)
+        without_gc = best_cpu(fn, board, runs, False)
+        peak, report = peak_bytes(fn, board)
+        outputs.append(report)
+        print(f"{name:>20} {with_gc:8.0f} {without_gc:8.0f} {peak / 1e6:8.1f} {peak / n_cards:7.0f}")
+    print(f"same report: {outputs[0] == outputs[1]}")
@@ -0,0 +1,39 @@
+# bench/bounded_report.py
+# Bounded report mode: full versus top-N report size and render time as lists grow. The
+# bounded report should stay about the same size (and its render time grow only with the
+# counting pass) however many cards there are; checks the counts in the summary still cover
+# every card.
+#
+#   python bench/bounded_report.py [per_list] [per_board] [formats]
+import random
+import sys
+import time
+
+from servers import import_main
+from synthetic import make_board
+
+main = import_main()
+
+def render(board, formats, per_list, per_board):
+    main.REPORT_TOP_CARDS, main.REPORT_TOP_BOARD = per_list, per_board
+    random.seed(1)
+    stats = {}
+    t0 = time.perf_counter()
+    chunks, summary = main.render_report(board, stats, formats=formats)
+    elapsed = time.perf_counter() - t0
+    size = sum(len(c) for chunk_list in [chunks] + chunks.alternates for c in chunk_list)
+    return elapsed, size, len(stats["cards"]), stats["items"]
+
+if __name__ == "__main__":
+    per_list = int(sys.argv[1]) if len(sys.argv) > 1 else 10
+    per_board = int(sys.argv[2]) if len(sys.argv) > 2 else 60
+    formats = sys.argv[3].split(",") if len(sys.argv) > 3 else ["text"]
+    print(f"top {per_list} per list, {per_board} per board, formats: {', '.join(formats)}")
+    for cards in (50, 200, 1000, 4000):
+        board = make_board(lists=10, cards_per_list=cards, checklists_per_card=3, items_per_checklist=10)
+        t_full, size_full, counted_full, items_full = render(board, formats, 0, 0)
+        t_top, size_top, counted_top, items_top = render(board, formats, per_list, per_board)
+        same = (counted_full, items_full) == (counted_top, items_top)
+        print(f"  {10 * cards:6d} cards  full {size_full / 1e6:7.2f} MB {t_full * 1000:7.0f} ms  "
+              f"bounded {size_top / 1e3:6.1f} KB {t_top * 1000:6.0f} ms  (counts match: {same})")
+    main.REPORT_TOP_CARDS = main.REPORT_TOP_BOARD = 0
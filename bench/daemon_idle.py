@@ -0,0 +1,46 @@
+# bench/daemon_idle.py
+# Idle cost of the daemon scheduler as the number of boards grows: start-up time (state load,
+# heap, first state write), then CPU time per second spent waiting once start-up is done, and
+# peak traced memory, with every board waiting for its next daily roll. Waiting should cost
+# about the same at any size; start-up and memory grow with the boards.
+#
+#   python bench/daemon_idle.py [seconds]
+import asyncio
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+
+from servers import import_main
+
+main = import_main()
+
+async def measure(board_ids, seconds):
+    """(start-up seconds, idle CPU seconds per second) of one daemon"""
+    t0 = time.perf_counter()
+    daemon = asyncio.create_task(main.run_daemon(board_ids))
+    await asyncio.sleep(0)  # the daemon runs its start-up, up to its first wait
+    startup = time.perf_counter() - t0
+    cpu0 = time.process_time()
+    await asyncio.sleep(seconds)
+    idle_cpu = (time.process_time() - cpu0) / seconds
+    daemon.cancel()
+    await asyncio.gather(daemon, return_exceptions=True)
+    return startup, idle_cpu
+
+if __name__ == "__main__":
+    seconds = float(sys.argv[1]) if len(sys.argv) > 1 else 2.0
+    main.DAEMON_STATE_FILE = os.path.join(tempfile.mkdtemp(prefix="sora-daemon-"), "state.json")
+    today = datetime.now().date().isoformat()
+    print(f"{'boards':>8} {'start-up ms':>12} {'idle cpu ms/s':>14} {'peak MB':>8}")
+    for n in (10, 1000, 10000, 100000):
+        board_ids = [f"board{i}" for i in range(n)]
+        # every board already rolled today: the loop only waits for tomorrow's roll
+        main.save_daemon_state({b: {"decided_for": today} for b in board_ids})
+        tracemalloc.start()
+        startup, idle_cpu = asyncio.run(measure(board_ids, seconds))
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        print(f"{n:8d} {startup * 1000:12.0f} {idle_cpu * 1000:14.2f} {peak / 1e6:8.1f}")
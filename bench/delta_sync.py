@@ -0,0 +1,56 @@
+# bench/delta_sync.py
+# Replays a recorded action stream against the local Trello stand-in and checks that the
+# delta-synced snapshot matches the real board, comparing bytes moved with a full fetch.
+# Exits 1 if the snapshot (or the fallback after a corrupt one) does not match; CI runs it.
+#
+#   python bench/delta_sync.py [lists] [cards_per_list] [actions]
+import shutil
+import sys
+import tempfile
+import time
+
+from servers import TrelloStub, import_main
+from synthetic import make_board, mutate_board
+
+main = import_main()
+
+if __name__ == "__main__":
+    lists = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    cards = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+    n_actions = int(sys.argv[3]) if len(sys.argv) > 3 else 200
+
+    before = make_board(lists=lists, cards_per_list=cards)
+    after, actions = mutate_board(before, n_actions=n_actions, first_action=2)
+    seed_action = {"id": f"{1:024x}", "type": "updateList", "data": {}}  # sync point, never replayed
+    stub = TrelloStub({"b": before}, actions={"b": [seed_action]})
+    main.TRELLO_API = stub.base_url + "/1"
+    main.FETCH_STRATEGY = "nested"  # fetch_strategy.py compares strategies
+    main.SNAPSHOT_DIR = tempfile.mkdtemp(prefix="sora-snapshots-")
+    try:
+        main.sync_board_data("b")  # no snapshot yet: full fetch
+        full_bytes = stub.bytes_sent
+
+        stub.set_board("b", after)
+        stub.actions["b"] = actions + [seed_action]
+        stub.bytes_sent = 0
+        t0 = time.perf_counter()
+        synced = main.sync_board_data("b")
+        elapsed = time.perf_counter() - t0
+        delta_bytes = stub.bytes_sent
+
+        # compare with what a full fetch returns now (the fetch projects away fields like desc)
+        expected = main.get_board_data("b")
+        match = synced == expected
+        print(f"full fetch: {full_bytes / 1e6:.2f} MB")
+        print(f"delta sync: {delta_bytes / 1e3:.1f} kB for {len(actions)} actions in {elapsed * 1000:.0f} ms")
+        print("snapshot matches board:", match)
+
+        # a corrupt snapshot must fall back to a full fetch and still be right
+        with open(main.snapshot_path("b"), "w") as f:
+            f.write("{not json")
+        fallback = main.sync_board_data("b") == expected
+        print("fallback matches board:", fallback)
+        sys.exit(0 if match and fallback else 1)
+    finally:
+        stub.close()
+        shutil.rmtree(main.SNAPSHOT_DIR, ignore_errors=True)
@@ -0,0 +1,73 @@
+# bench/fanout.py
+# Fan-out delivery: every board to two channels, all boards rolled up into one slow channel,
+# a few boards also to a channel that always fails. Compares a plain loop (plan and post
+# per destination, one after another) with the dispatcher, one report per message and batched,
+# and checks every report reached every working channel.
+#
+#   python bench/fanout.py [boards]
+import sys
+import time
+
+from servers import WebhookStub, import_main
+from synthetic import make_board
+
+main = import_main()
+
+def run_loop(reports, routes):
+    """Baseline: each (board, webhook) planned and posted in turn; failures just logged"""
+    for board_id, (chunks, summary) in reports.items():
+        for webhook in routes[board_id]:
+            try:
+                main.post_report(*main.prepare_report(chunks, summary), webhook)
+            except Exception:
+                pass
+
+def run_dispatcher(reports, routes, linger):
+    dispatcher = main.Dispatcher(linger=linger)
+    deliveries = [dispatcher.submit(b, chunks, summary, routes[b]) for b, (chunks, summary) in reports.items()]
+    failed = 0
+    for d in deliveries:
+        try:
+            d.wait()
+        except main.DeliveryFailed as e:
+            failed += len(e.failures)
+    return failed
+
+if __name__ == "__main__":
+    n_boards = int(sys.argv[1]) if len(sys.argv) > 1 else 12
+    main.ROUTE_RATES["127.0.0.1"] = (10.0, 5)  # Discord's 5 per 2 s, sped up 4x
+    main.HTTP_RETRIES = 2
+    main.HTTP_BACKOFF_BASE = 0.05
+    reports = {}
+    for i in range(n_boards):
+        reports[f"board{i}"] = main.render_report(make_board(lists=4, cards_per_list=10, seed=i))
+
+    print(f"{n_boards} boards; {'mode':>18} {'wall s':>7} {'healthy done s':>15} {'POSTs':>6} {'MB out':>7}")
+    for mode in ("loop", "dispatch", "dispatch+batch"):
+        main.DISCORD_MAX_FILES = 1 if mode == "dispatch" else 10  # one report per message unless batching
+        healthy = [WebhookStub(bucket_size=5, bucket_window=0.5) for _ in range(4)]
+        slow = WebhookStub(latency=0.3)
+        failing = WebhookStub(error_rate=1.0)
+        hooks = healthy + [slow, failing]
+        routes = {}
+        for i, board_id in enumerate(reports):
+            routes[board_id] = [healthy[i % 4].url, healthy[(i + 1) % 4].url, slow.url]
+            if i < 3:
+                routes[board_id].append(failing.url)
+        # fresh route buckets per mode (each stub is a new URL anyway)
+        t0 = time.perf_counter()
+        if mode == "loop":
+            run_loop(reports, routes)
+        else:
+            run_dispatcher(reports, routes, 0.2)
+        wall = time.perf_counter() - t0
+        healthy_done = max(h.last_received for h in healthy) - t0
+        posts = sum(len(h.received) for h in hooks)
+        mb = sum(len(body) for h in hooks for _, _, body in h.received) / 1e6
+        delivered = sum(len(routes[b]) for b in routes) - 3
+        files = sum(body.count(b'filename="') for h in hooks for _, _, body in h.received)
+        assert files == delivered, (files, delivered)  # every report reached every working channel
+        print(f"{'':>10} {mode:>18} {wall:7.2f} {healthy_done:15.2f} {posts:6d} {mb:7.2f}"
+              f"   ({delivered} deliveries, {delivered / wall:.1f}/s)")
+        for h in hooks:
+            h.close()
@@ -0,0 +1,53 @@
+# bench/fetch_strategy.py
+# Bytes moved per board fetch: the old unprojected call (with card descriptions), the projected
+# nested call, and the split bulk endpoints, for a few board shapes; plus what "auto" settles on.
+#
+#   python bench/fetch_strategy.py
+import os
+import tempfile
+import time
+
+from servers import TrelloStub, import_main
+from synthetic import make_board
+
+main = import_main()
+
+SHAPES = {
+    "few-checklists": dict(lists=10, cards_per_list=60, checklists_per_card=0, items_per_checklist=0, labels=8),
+    "typical": dict(lists=10, cards_per_list=60, checklists_per_card=2, items_per_checklist=5, labels=8),
+    "checklist-heavy": dict(lists=10, cards_per_list=60, checklists_per_card=4, items_per_checklist=20, labels=8),
+    "label-heavy": dict(lists=10, cards_per_list=60, checklists_per_card=1, items_per_checklist=3, labels=40),
+}
+
+def old_board_url(board_id):
+    return (f"{main.TRELLO_API}/boards/{board_id}/lists"
+            f"?cards=open&card_fields=name,labels,desc&checklists=all&fields=name"
+            f"&key={main.TRELLO_KEY}&token={main.TRELLO_TOKEN}")
+
+def fetch_bytes(stub, fetch):
+    before, requests = stub.bytes_sent, stub.requests
+    t0 = time.perf_counter()
+    fetch()
+    return stub.bytes_sent - before, stub.requests - requests, time.perf_counter() - t0
+
+if __name__ == "__main__":
+    main.ROUTE_RATES["127.0.0.1"] = (1e9, 1e9)
+    main.STATE_DB = os.path.join(tempfile.mkdtemp(prefix="sora-fetch-"), "sora_state.db")  # where auto keeps its measurements
+    print(f"{'shape':>16} {'strategy':>9} {'KB':>9} {'reqs':>5} {'ms':>7}")
+    for name, shape in SHAPES.items():
+        stub = TrelloStub({name: make_board(**shape)})
+        main.TRELLO_API = stub.base_url + "/1"
+        try:
+            rows = [("old", fetch_bytes(stub, lambda: main.cached_get_json(old_board_url(name))))]
+            for strategy in ("nested", "split"):
+                main.FETCH_STRATEGY = strategy
+                rows.append((strategy, fetch_bytes(stub, lambda: main.get_board_data(name))))
+            main.FETCH_STRATEGY = "auto"
+            for _ in range(2):  # one measurement per strategy, then the choice
+                main.get_board_data(name)
+            rows.append(("auto", fetch_bytes(stub, lambda: main.get_board_data(name))))
+        finally:
+            stub.close()
+        for strategy, (size, reqs, secs) in rows:
+            print(f"{name:>16} {strategy:>9} {size / 1024:9.1f} {reqs:5d} {secs * 1000:7.1f}")
+        print(f"{'':>16} auto picks {main.choose_fetch_strategy(name)}")
@@ -0,0 +1,55 @@
+# bench/formats.py
+# Several report formats from one run: one render_report pass feeding every renderer versus
+# one pass per format (re-walking the board and recomputing the totals each time). Checks
+# both give the same bytes per format.
+#
+#   python bench/formats.py [lists] [cards_per_list] [formats]
+import random
+import sys
+import time
+import tracemalloc
+
+from servers import import_main
+from synthetic import make_board
+
+main = import_main()
+
+def timed(fn):
+    """(result, seconds, peak MB); the peak comes from a second run, as tracemalloc slows the first"""
+    random.seed(1)
+    t0 = time.perf_counter()
+    result = fn()
+    elapsed = time.perf_counter() - t0
+    tracemalloc.start()
+    fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, elapsed, peak / 1e6
+
+def one_pass(board, formats):
+    chunks, _ = main.render_report(board, formats=formats)
+    return {c.format: b"".join(c) for c in [chunks] + chunks.alternates}
+
+def pass_per_format(board, formats):
+    out = {}
+    for fmt in formats:
+        random.seed(1)  # same notes as the single pass
+        chunks, _ = main.render_report(board, formats=[fmt])
+        out[fmt] = b"".join(chunks)
+    return out
+
+if __name__ == "__main__":
+    lists = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    cards = int(sys.argv[2]) if len(sys.argv) > 2 else 500
+    formats = sys.argv[3].split(",") if len(sys.argv) > 3 else list(main.RENDERERS)
+    board = make_board(lists=lists, cards_per_list=cards, checklists_per_card=3, items_per_checklist=12)
+    print(f"{lists * cards} cards, formats: {', '.join(formats)}")
+
+    for fmt in formats:
+        (out,), elapsed, peak = timed(lambda: list(pass_per_format(board, [fmt]).values()))
+        print(f"  {fmt:>9} alone     {elapsed * 1000:7.0f} ms  peak {peak:6.1f} MB  {len(out) / 1e6:6.1f} MB out")
+    separate, t_separate, peak_separate = timed(lambda: pass_per_format(board, formats))
+    single, t_single, peak_single = timed(lambda: one_pass(board, formats))
+    print(f"  pass per format   {t_separate * 1000:7.0f} ms  peak {peak_separate:6.1f} MB")
+    print(f"  one pass          {t_single * 1000:7.0f} ms  peak {peak_single:6.1f} MB  "
+          f"(output identical: {separate == single})")
@@ -0,0 +1,39 @@
+# bench/multi_board.py
+# Wall time of sequential vs concurrent multi-board fetches against a local Trello stand-in
+#
+#   python bench/multi_board.py [boards] [latency_seconds]
+import sys
+import time
+
+from servers import TrelloStub, import_main
+from synthetic import make_board
+
+main = import_main()
+
+if __name__ == "__main__":
+    n_boards = int(sys.argv[1]) if len(sys.argv) > 1 else 24
+    latency = float(sys.argv[2]) if len(sys.argv) > 2 else 0.2
+    board_ids = [f"board{i}" for i in range(n_boards)]
+    stub = TrelloStub({bid: make_board(lists=5, cards_per_list=20, seed=i) for i, bid in enumerate(board_ids)},
+                      latency=latency)
+    main.board_url = stub.board_url
+    main.FETCH_STRATEGY = "nested"  # fetch_strategy.py compares strategies
+    try:
+        t0 = time.perf_counter()
+        for bid in board_ids:
+            main.generate_report(main.get_board_data(bid))
+        sequential = time.perf_counter() - t0
+
+        t0 = time.perf_counter()
+        for bid, board_data, error in main.fetch_boards(board_ids):
+            if error:
+                raise error
+            main.generate_report(board_data)
+        concurrent = time.perf_counter() - t0
+    finally:
+        stub.close()
+
+    print(f"{n_boards} boards, {latency * 1000:.0f} ms latency each, "
+          f"{main.FETCH_WORKERS} workers / {main.HOST_CONCURRENCY} per host")
+    print(f"  sequential: {sequential:6.2f} s")
+    print(f"  concurrent: {concurrent:6.2f} s  ({sequential / concurrent:.1f}x)")
@@ -0,0 +1,125 @@
+# bench/outbox.py
+# Durable outbox: drain throughput of stored reports against the webhook stand-in (versus
+# sending the same reports without the outbox), then crash recovery of `python main.py`:
+# an upload that fails after the summary went out, and a process killed mid-delivery. The
+# follow-up run must finish the report without fetching Trello or re-posting what arrived
+# (a killed run may leave one duplicate: the message that was in flight). Exits 1 when a
+# check fails; CI runs it.
+#
+#   python bench/outbox.py [reports]
+import contextlib
+import io
+import os
+import re
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+from servers import TrelloStub, WebhookStub, import_main
+from startup import REPO, WRAPPER
+from synthetic import make_board
+
+main = import_main()
+
+def planned_reports(n):
+    reports = []
+    for i in range(n):
+        report, summary = main.render_report(make_board(lists=4, cards_per_list=10, seed=i))
+        reports.append((f"board{i}", *main.prepare_report(report, summary)))
+    return reports
+
+def drain(reports, durable):
+    hook = WebhookStub()
+    main.WEBHOOK_URL = hook.url
+    main._dispatcher = None
+    try:
+        t0 = time.perf_counter()
+        if durable:
+            for board_id, summary, parts in reports:
+                main.outbox_put(board_id, summary, parts, [hook.url])
+            stored = time.perf_counter() - t0
+            with contextlib.redirect_stdout(io.StringIO()):  # one line per resumed report
+                results = main.resume_outbox([board_id for board_id, _, _ in reports])
+            ok = len(results) == len(reports) and all(e is None for e in results.values())
+        else:
+            stored = 0.0
+            dispatcher = main.get_dispatcher()
+            deliveries = [dispatcher.queue(main.Delivery(b, summary, parts, [hook.url])) for b, summary, parts in reports]
+            for delivery in deliveries:
+                delivery.wait()
+            ok = True
+        return time.perf_counter() - t0, stored, ok, hook.status_counts.get(204, 0)
+    finally:
+        hook.close()
+
+def messages(hook):
+    """Summaries and attachment filenames the webhook accepted, in order"""
+    out = []
+    for _, ctype, body in hook.received:
+        if ctype.startswith("application/json"):
+            out.append("summary")
+        out += re.findall(rb'filename="([^"]+)"', body)
+    return out
+
+def crash_run(env, cwd, hook, trello, kill_after=None):
+    """Run main.py once (killed once the webhook has kill_after messages); returns (exit code, Trello requests)"""
+    before = trello.requests
+    proc = subprocess.Popen([sys.executable, "-c", WRAPPER, os.path.join(REPO, "main.py"), "0.0"],
+                            env=env, cwd=cwd, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    if kill_after is not None:
+        while len(messages(hook)) < kill_after and proc.poll() is None:
+            time.sleep(0.01)
+        proc.kill()
+    return proc.wait(), trello.requests - before
+
+def recovery(scenario):
+    workdir = tempfile.mkdtemp(prefix="sora-outbox-")
+    trello = TrelloStub({"b": make_board(lists=12, cards_per_list=20)})
+    hook = WebhookStub(latency=0.2 if scenario == "killed" else 0.0, reject_files=scenario == "upload failed")
+    env = dict(os.environ, TRELLO_KEY="k", TRELLO_TOKEN="t", TRELLO_BOARD_ID="b", DISCORD_WEBHOOK=hook.url,
+               TRELLO_API_URL=trello.base_url + "/1", SORA_OUTBOX="1", SORA_HTTP_RETRIES="0",
+               SORA_ATTACHMENT_LIMIT_MB="0.02", SORA_REPORT_COMPRESSION="none", SORA_UPLOAD_WORKERS="1")
+    try:
+        first = crash_run(env, workdir, hook, trello, kill_after=3 if scenario == "killed" else None)
+        delivered_first = len(messages(hook))
+        hook.reject_files = False
+        second = crash_run(env, workdir, hook, trello)
+        sent = messages(hook)
+        third = crash_run(env, workdir, hook, trello)  # nothing left: rolls as usual, sends a fresh report
+    finally:
+        trello.close()
+        hook.close()
+        shutil.rmtree(workdir, ignore_errors=True)
+    dupes = len(sent) - len(set(sent))
+    print(f"  {scenario:>13}: first run exit {first[0]} after {delivered_first} message(s), "
+          f"resume exit {second[0]} with {second[1]} Trello request(s), "
+          f"{len(set(sent))} distinct messages, {dupes} duplicate(s); next run fetched again: {third[1] > 0}")
+    # the resume must not refetch Trello, and only a killed run may repeat its in-flight message
+    return second[0] == 0 and second[1] == 0 and dupes <= (scenario == "killed") and third[1] > 0
+
+if __name__ == "__main__":
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    main.ROUTE_RATES["127.0.0.1"] = (1e9, 1e9)  # measure the outbox, not the rate limiter
+    main.DISPATCH_LINGER = 0.0
+    workdir = tempfile.mkdtemp(prefix="sora-outbox-")
+    main.STATE_DB = os.path.join(workdir, "state.db")
+    results = []
+    try:
+        reports = planned_reports(n)
+        size = sum(len(c) for _, _, parts in reports for _, chunks, _ in parts for c in chunks)
+        print(f"{n} reports, {size / 1e6:.1f} MB of attachments")
+        for durable in (False, True):
+            elapsed, stored, ok, posts = drain(reports, durable)
+            label = "outbox" if durable else "direct"
+            print(f"  {label}: {elapsed * 1000:7.0f} ms ({n / elapsed:6.0f} reports/s, {posts} posts), "
+                  f"storing {stored * 1000:.0f} ms, all delivered: {ok}")
+            results.append(ok)
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    print("crash recovery (python main.py against the stand-ins)")
+    for scenario in ("upload failed", "killed"):
+        results.append(recovery(scenario))
+    sys.exit(0 if all(results) else 1)
@@ -0,0 +1,59 @@
+# bench/parallel_render.py
+# Parallel render scaling: one large board and many small boards rendered with 1..N pool
+# workers (1 = the serial path), checking every output is byte-identical to the serial one
+# and the stats counts match. The pool is started before timing; its start-up is shown apart.
+#
+#   python bench/parallel_render.py [max_workers] [formats]
+import os
+import random
+import sys
+import time
+
+from servers import import_main
+from synthetic import make_board
+
+main = import_main()
+
+def render(jobs, formats):
+    random.seed(1)
+    stats = [{} for _ in jobs]
+    t0 = time.perf_counter()
+    results = main.render_reports([(board, st, None) for board, st in zip(jobs, stats)], formats)
+    elapsed = time.perf_counter() - t0
+    out = [([bytes(b"".join(c)) for c in [chunks] + chunks.alternates], summary) for chunks, summary in results]
+    return elapsed, out, stats
+
+def start_pool(workers):
+    main.RENDER_WORKERS = workers
+    if main._render_pool is not None:
+        main._render_pool.shutdown()
+        main._render_pool = None
+    if workers <= 1:
+        return 0.0
+    t0 = time.perf_counter()
+    list(main.get_render_pool().map(abs, range(workers * 4)))  # every worker up and importing main
+    return time.perf_counter() - t0
+
+if __name__ == "__main__":
+    max_workers = int(sys.argv[1]) if len(sys.argv) > 1 else max(4, os.cpu_count() or 1)
+    formats = sys.argv[2].split(",") if len(sys.argv) > 2 else ["text"]
+    scenarios = {
+        "one board, 40x500 cards": [make_board(lists=40, cards_per_list=500, checklists_per_card=3,
+                                               items_per_checklist=12)],
+        "36 boards, 6x100 cards": [make_board(lists=6, cards_per_list=100, checklists_per_card=3,
+                                              items_per_checklist=10, seed=i) for i in range(36)],
+    }
+    workers = sorted({1, *[w for w in (2, 4, 8, 16, 32) if w < max_workers], max_workers})
+    print(f"{os.cpu_count()} CPU(s), formats: {', '.join(formats)}")
+    for name, jobs in scenarios.items():
+        print(name)
+        baseline = None
+        for n in workers:
+            startup = start_pool(n)
+            elapsed, out, stats = render(jobs, formats)
+            if baseline is None:
+                baseline = (elapsed, out, stats)
+            same = out == baseline[1] and stats == baseline[2]
+            print(f"  {n:3d} worker(s) {elapsed * 1000:8.0f} ms  {baseline[0] / elapsed:5.2f}x  "
+                  f"(pool start {startup * 1000:4.0f} ms, identical: {same})")
+    start_pool(1)
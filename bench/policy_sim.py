@@ -0,0 +1,243 @@
+# bench/policy_sim.py
+# Monte Carlo simulator of the run policy: many boards over years of simulated days in seconds,
+# on a virtual clock (no sleeping, no datetime.now). The "current" policy is main.py's own
+# run_chance / decide_run; alternatives are pluggable. Reports the gaps between reports, the
+# send-time histogram and the runner time the daily job costs.
+#
+#   python bench/policy_sim.py                                   # current policy, 10000 boards x 10 years
+#   python bench/policy_sim.py --policy current --policy short-delay --policy steep
+#   python bench/policy_sim.py --policy my_policies.py:weekly --engine python
+#   python bench/policy_sim.py --check                           # the two engines agree (exit 1 if not)
+#
+# The numpy engine samples every board's day at once from a policy's chance and max_delay; the
+# python engine runs the policy's decide and main.days_since board by board, day by day, and is
+# the reference. Policies with their own decide always use the python engine, as does everything
+# without numpy. --check runs both engines on a small run and compares them; for "current" the
+# python side runs main.decide_run itself, so the two stay in step with main.py.
+import argparse
+import importlib
+import importlib.util
+import math
+import random
+import time
+from datetime import date, timedelta
+
+from servers import import_main
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+main = import_main()
+
+class Policy:
+    """A run policy: the chance to report after `days` without one, and the delay before sending
+
+    `decide(days, rng)` has decide_run's shape (None to rest, else the delay in
+    seconds); by default it rolls `chance` and a uniform 0..max_delay delay. With
+    `sleeps` the delay is spent on the runner (the job sleeps before sending).
+    """
+
+    def __init__(self, name, chance, max_delay, decide=None, sleeps=True):
+        self.name = name
+        self.chance = chance
+        self.max_delay = max_delay
+        self.sleeps = sleeps
+        if decide is not None:
+            self.decide = decide
+
+    def decide(self, days, rng):
+        if rng.random() >= self.chance(days):
+            return None
+        return rng.randint(0, self.max_delay)
+
+    @property
+    def vectorized(self):
+        """Whether sample() matches decide: only for the default chance-and-delay decide"""
+        return "decide" not in vars(self) and type(self).decide is Policy.decide
+
+    def sample(self, days, gen):
+        """Vectorized decide for an array of day counts: delays, NaN to rest"""
+        top = int(days.max())
+        table = getattr(self, "_table", None)
+        if table is None or len(table) <= top:
+            table = self._table = np.array([self.chance(d) for d in range(top + 1)])
+        send = gen.random(len(days)) < table[days]
+        delays = np.full(len(days), np.nan)
+        delays[send] = gen.integers(0, self.max_delay + 1, int(send.sum()))
+        return delays
+
+def ramp(base, daily, cap):
+    return lambda days: min(base + daily * days, cap)
+
+POLICIES = {
+    "current": Policy("current", main.run_chance, main.MAX_DELAY_SECONDS),  # decide_run, vectorized
+    "no-delay": Policy("no-delay", main.run_chance, 0),
+    "short-delay": Policy("short-delay", main.run_chance, 3600),
+    "steep": Policy("steep", ramp(0.1, 0.3, 0.95), main.MAX_DELAY_SECONDS),
+    "flat": Policy("flat", lambda days: 0.5, main.MAX_DELAY_SECONDS),
+}
+
+def load_policy(spec):
+    """A POLICIES name, or module:attribute / path.py:attribute naming a Policy"""
+    if spec in POLICIES:
+        return POLICIES[spec]
+    target, _, attr = spec.rpartition(":")
+    if not target:
+        raise SystemExit(f"Unknown policy {spec!r}: use one of {', '.join(POLICIES)} or module:attribute")
+    if target.endswith(".py"):
+        module_spec = importlib.util.spec_from_file_location("sora_policy", target)
+        module = importlib.util.module_from_spec(module_spec)
+        module_spec.loader.exec_module(module)
+    else:
+        module = importlib.import_module(target)
+    return getattr(module, attr)
+
+def simulate_numpy(policy, boards, days, seed, cost):
+    gen = np.random.default_rng(seed)
+    last = np.full(boards, -1)  # day of the last report; -1 never (days_since counts that as 1 day)
+    gaps = np.zeros(1, dtype=np.int64)
+    times = np.zeros(0, dtype=np.int64)
+    runner = billed = reports = 0
+    for day in range(days):
+        since = np.where(last < 0, 1, day - last)
+        delay = policy.sample(since, gen)
+        sent = ~np.isnan(delay)
+        delays = delay[sent].astype(np.int64)
+        gap = since[sent & (last >= 0)]
+        if gap.size:
+            counts = np.bincount(gap)
+            if len(counts) > len(gaps):
+                gaps = np.pad(gaps, (0, len(counts) - len(gaps)))
+            gaps[:len(counts)] += counts
+        counts = np.bincount(delays // cost.bucket, minlength=len(times))
+        if len(counts) > len(times):
+            times = np.pad(times, (0, len(counts) - len(times)))
+        times += counts
+        job = cost.startup + cost.send + (delays if policy.sleeps else np.zeros_like(delays))
+        rest = boards - len(delays)
+        runner += rest * cost.startup + job.sum()
+        billed += rest * math.ceil(cost.startup / 60) + np.ceil(job / 60).sum()
+        reports += len(delays)
+        last[sent] = day
+    return ({int(g): int(n) for g, n in enumerate(gaps) if n}, {int(b): int(n) for b, n in enumerate(times) if n},
+            reports, float(runner), int(billed))
+
+def simulate_python(policy, boards, days, seed, cost):
+    """decide_run and days_since as main.py runs them, with the virtual date as today"""
+    rng = random.Random(seed)
+    start = date(2026, 1, 1)
+    gaps, times = {}, {}
+    runner = 0.0
+    billed = reports = 0
+    for _ in range(boards):
+        last = None
+        for day in range(days):
+            today = start + timedelta(days=day)
+            since = main.days_since(last, today)
+            delay = policy.decide(since, rng)
+            job = cost.startup
+            if delay is not None:
+                job += cost.send + (delay if policy.sleeps else 0)
+                if last is not None:
+                    gaps[since] = gaps.get(since, 0) + 1
+                bucket = delay // cost.bucket
+                times[bucket] = times.get(bucket, 0) + 1
+                reports += 1
+                last = today
+            runner += job
+            billed += math.ceil(job / 60)
+    return gaps, times, reports, runner, billed
+
+class Cost:
+    """Runner time of one daily job: start-up (checkout, Python, pip, cache) and the send itself"""
+
+    def __init__(self, startup, send, bucket_minutes):
+        self.startup = startup
+        self.send = send
+        self.bucket = bucket_minutes * 60
+
+def percentile(counts, q):
+    total = sum(counts.values())
+    seen = 0
+    for value in sorted(counts):
+        seen += counts[value]
+        if seen >= q * total:
+            return value
+    return None
+
+def bar(share, width=40):
+    return "█" * round(share * width)
+
+def report(policy, result, boards, days, elapsed, cron_hour, cost):
+    gaps, times, reports, runner, billed = result
+    years = boards * days / 365.0
+    n_gaps = sum(gaps.values())
+    print(f"policy {policy.name}: {boards} boards x {days} days in {elapsed:.2f} s")
+    print(f"  reports: {reports / (boards * days):.3f} per day ({reports / years:.0f} per board-year)")
+    if n_gaps:
+        mean = sum(g * n for g, n in gaps.items()) / n_gaps
+        print(f"  gap between reports (days): mean {mean:.2f}  p50 {percentile(gaps, 0.5)}  "
+              f"p90 {percentile(gaps, 0.9)}  p99 {percentile(gaps, 0.99)}  max {max(gaps)}")
+        for gap in sorted(gaps)[:10]:
+            share = gaps[gap] / n_gaps
+            print(f"    {gap:3d} d {share * 100:5.1f}% {bar(share)}")
+    if reports:
+        print(f"  send time (cron at {cron_hour:02d}:00 + delay):")
+        for bucket in sorted(times):
+            minutes = cron_hour * 60 + bucket * cost.bucket // 60
+            share = times[bucket] / reports
+            print(f"    {minutes // 60 % 24:02d}:{minutes % 60:02d} {share * 100:5.1f}% {bar(share)}")
+    print(f"  runner: {runner / 3600 / years:.1f} h per board-year, "
+          f"{billed / years:.0f} billed minutes per board-year (jobs round up to a minute)")
+
+def summary(result, boards, days):
+    """(reports per board-day, mean gap in days, mean send-time bucket) of one simulation"""
+    gaps, times, reports, _, _ = result
+    n_gaps = sum(gaps.values())
+    return (reports / (boards * days), sum(g * n for g, n in gaps.items()) / n_gaps if n_gaps else 0.0,
+            sum(b * n for b, n in times.items()) / reports if reports else 0.0)
+
+def check_engines(policy, cost, boards=2000, days=365, tolerance=0.03):
+    """Whether the numpy engine matches the python one (running main.decide_run for "current")"""
+    reference = policy
+    if policy is POLICIES["current"]:
+        reference = Policy("current", main.run_chance, main.MAX_DELAY_SECONDS, decide=main.decide_run)
+    fast = summary(simulate_numpy(policy, boards, days, 1, cost), boards, days)
+    slow = summary(simulate_python(reference, boards, days, 2, cost), boards, days)
+    ok = all(abs(a - b) <= tolerance * max(abs(b), 1e-9) for a, b in zip(fast, slow))
+    print(f"policy {policy.name}: numpy {fast[0]:.4f}/day, gap {fast[1]:.3f} d, send bucket {fast[2]:.2f}; "
+          f"python {slow[0]:.4f}/day, gap {slow[1]:.3f} d, send bucket {slow[2]:.2f}: {'agree' if ok else 'DIFFER'}")
+    return ok
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Monte Carlo simulator of the run policy")
+    parser.add_argument("--policy", action="append", default=[],
+                        help=f"{', '.join(POLICIES)} or module:attribute (repeatable; default current)")
+    parser.add_argument("--boards", type=int, default=10000)
+    parser.add_argument("--years", type=float, default=10.0)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--engine", choices=("numpy", "python"), default="numpy" if np is not None else "python")
+    parser.add_argument("--cron-hour", type=int, default=12, help="UTC hour of the daily job")
+    parser.add_argument("--startup-seconds", type=float, default=30.0, help="runner time of every job")
+    parser.add_argument("--send-seconds", type=float, default=10.0, help="fetch, render and send")
+    parser.add_argument("--bucket-minutes", type=int, default=30, help="send-time histogram resolution")
+    parser.add_argument("--check", action="store_true", help="compare the two engines on a small run and exit")
+    args = parser.parse_args()
+    if (args.engine == "numpy" or args.check) and np is None:
+        raise SystemExit("the numpy engine needs numpy installed (or use --engine python)")
+    cost = Cost(args.startup_seconds, args.send_seconds, args.bucket_minutes)
+    if args.check:
+        policies = [load_policy(spec) for spec in args.policy or POLICIES]
+        results = [check_engines(policy, cost) for policy in policies if policy.vectorized]
+        raise SystemExit(0 if all(results) else 1)
+    days = round(args.years * 365)
+    for spec in args.policy or ["current"]:
+        policy = load_policy(spec)
+        simulate = simulate_numpy if args.engine == "numpy" and policy.vectorized else simulate_python
+        if args.engine == "numpy" and simulate is simulate_python:
+            print(f"policy {policy.name} has its own decide: using the python engine")
+        t0 = time.perf_counter()
+        result = simulate(policy, args.boards, days, args.seed, cost)
+        report(policy, result, args.boards, days, time.perf_counter() - t0, args.cron_hour, cost)
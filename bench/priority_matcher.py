@@ -0,0 +1,44 @@
+# bench/priority_matcher.py
+# Per-card cost of get_priority_emoji: original nested scan vs the memoized PriorityMatcher
+#
+#   python bench/priority_matcher.py [cards] [labels]
+import sys
+import timeit
+
+from servers import import_main
+from synthetic import make_board
+
+main = import_main()
+
+def original_priority_emoji(card):
+    """get_priority_emoji as it was before PriorityMatcher"""
+    emojis = {
+        "high": "!!",
+        "medium": "!",
+        "low": ".",
+        "urgent": "!!!",
+        "done": "✅"
+    }
+    if "labels" in card and card["labels"]:
+        for label in card["labels"]:
+            name = (label.get("name") or "").lower()
+            for keyword, emoji in emojis.items():
+                if keyword in name:
+                    return emoji
+    return ":"
+
+if __name__ == "__main__":
+    n_cards = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    n_labels = int(sys.argv[2]) if len(sys.argv) > 2 else 12
+    board = make_board(lists=10, cards_per_list=n_cards // 10, checklists_per_card=0, labels=n_labels)
+    cards = [c for lst in board for c in lst["cards"]]
+    # make every card carry labels; put the non-matching ones first to exercise the full scan
+    for i, card in enumerate(cards):
+        card["labels"] = [{"id": "nomatch", "name": "Feature request"},
+                          {"id": f"label{i % n_labels}", "name": ["High", "Medium", "Low", "Bug"][i % 4]}]
+
+    assert [original_priority_emoji(c) for c in cards] == [main.get_priority_emoji(c) for c in cards]
+
+    for label, fn in (("original", original_priority_emoji), ("matcher", main.get_priority_emoji)):
+        best = min(timeit.repeat(lambda: [fn(c) for c in cards], number=1, repeat=5))
+        print(f"{label:>9}: {best * 1e9 / len(cards):7.0f} ns/card  ({len(cards)} cards)")
@@ -0,0 +1,52 @@
+# bench/render_cache.py
+# Render time with the persistent render cache: cold, warm (nothing changed) and warm with
+# a share of the cards edited; also checks cached output matches an uncached render. Cards
+# are keyed by dateLastActivity, so a warm run should beat no cache at any size; the cold
+# run also pays for writing the cache file.
+#
+#   python bench/render_cache.py [lists] [cards_per_list] [actions]
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+
+from servers import import_main
+from synthetic import make_board, mutate_board
+
+main = import_main()
+
+def render(board, seed=1):
+    random.seed(seed)
+    t0 = time.perf_counter()
+    chunks, _ = main.render_report(board)
+    return time.perf_counter() - t0, b"".join(chunks)
+
+if __name__ == "__main__":
+    lists = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    cards = int(sys.argv[2]) if len(sys.argv) > 2 else 500
+    n_actions = int(sys.argv[3]) if len(sys.argv) > 3 else 500
+    board = make_board(lists=lists, cards_per_list=cards, checklists_per_card=3, items_per_checklist=12)
+    edited, _ = mutate_board(board, n_actions=n_actions)
+
+    uncached, expected = render(board)
+    tmp = tempfile.mkdtemp(prefix="sora-render-cache-")
+    main.RENDER_CACHE_FILE = os.path.join(tmp, "render_cache.bin")
+    try:
+        cold, _ = render(board)
+        main._render_cache = None  # reload from disk like a new run would
+        warm, text = render(board)
+        main._render_cache = None
+        main.REPORT_CHANGES = True
+        changed, edited_text = render(edited)
+        section = edited_text.split("🔄 Changes since last report".encode("utf-8"))[1]
+        n_changed = section.count("├─".encode("utf-8"))
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+
+    print(f"{lists * cards} cards")
+    print(f"  no cache        {uncached * 1000:7.0f} ms")
+    print(f"  cold cache      {cold * 1000:7.0f} ms")
+    print(f"  warm, unchanged {warm * 1000:7.0f} ms  ({uncached / warm:.1f}x no cache, output identical: {text == expected})")
+    print(f"  warm, edited    {changed * 1000:7.0f} ms  ({n_changed} cards listed as changed)")
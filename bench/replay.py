@@ -0,0 +1,179 @@
+# bench/replay.py
+# Record/replay harness: capture a real run's Trello and Discord exchanges to fixture files, then
+# run the whole `python main.py` flow again offline against local stand-ins serving them, with
+# configurable latency, bandwidth, error rates and rate limits, on a virtual clock running
+# --speed times faster than real time (the 0-4 hour delay, backoff and rate limits included).
+#
+#   python bench/replay.py record fixtures/                        # real credentials from the env
+#   python bench/replay.py record fixtures/ --synthetic 12x40       # no credentials: synthetic board
+#   python bench/replay.py replay fixtures/ --speed 3600 --latency 0.3 --bandwidth 2e6 \
+#       --error-rate 0.05 --rate-limit 5/2 --runs 3 --env SORA_FETCH_STRATEGY=split
+#
+# A replay checks that Discord got the same messages (summaries and attachment names) as in the
+# recording. Endpoints the recording lacks are derived from the recorded board, so other fetch
+# strategies can be compared offline.
+import argparse
+import json
+import os
+import re
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from urllib.parse import urlsplit
+
+from servers import Faults, TrelloStub, WebhookStub, replay_key
+from startup import REPO
+from synthetic import make_board
+
+# Runs main.py with the day's roll (the first random.random() call) and optionally the delay
+# (the first random.randint() call) pinned, on a clock running `speed` times faster
+CLOCK_WRAPPER = (
+    "import random, runpy, sys, time\n"
+    "speed, pinned_random = float(sys.argv[2]), [float(sys.argv[3])]\n"
+    "pinned_randint = [int(sys.argv[4])] if sys.argv[4] else []\n"
+    "real_random, real_randint = random.random, random.randint\n"
+    "random.random = lambda: pinned_random.pop() if pinned_random else real_random()\n"
+    "random.randint = lambda a, b: pinned_randint.pop() if pinned_randint else real_randint(a, b)\n"
+    "sleep, monotonic, wall = time.sleep, time.monotonic, time.time\n"
+    "m0, t0 = monotonic(), wall()\n"
+    "time.sleep = lambda s: sleep(s / speed)\n"
+    "time.monotonic = lambda: m0 + (monotonic() - m0) * speed\n"
+    "time.time = lambda: t0 + (wall() - t0) * speed\n"
+    "runpy.run_path(sys.argv[1], run_name='__main__')\n"
+)
+
+def run_main(env, cwd, speed=1.0, roll=0.0, delay=None):
+    """One `python main.py` run; returns (exit code, wall seconds, output)"""
+    t0 = time.perf_counter()
+    proc = subprocess.run([sys.executable, "-c", CLOCK_WRAPPER, os.path.join(REPO, "main.py"), str(speed),
+                           str(roll), "" if delay is None else str(delay)], env=env, cwd=cwd, capture_output=True)
+    return proc.returncode, time.perf_counter() - t0, (proc.stdout + proc.stderr).decode("utf-8", "replace")
+
+def load_recording(fixtures):
+    """(exchanges, body reader) from a record-mode directory"""
+    with open(os.path.join(fixtures, "exchanges.jsonl"), "r", encoding="utf-8") as f:
+        exchanges = [json.loads(line) for line in f if line.strip()]
+
+    def body(digest):
+        if not digest:
+            return b""
+        with open(os.path.join(fixtures, "bodies", digest), "rb") as f:
+            return f.read()
+    return exchanges, body
+
+def messages(exchanges):
+    """What Discord accepted, in order: "summary" per summary and the attachment names per upload"""
+    out = []
+    for content_type, body in exchanges:
+        if (content_type or "").startswith("application/json") or b'name="payload_json"' in body:
+            out.append("summary")  # on its own, or batched with the upload
+        out += [name.decode("utf-8") for name in re.findall(rb'filename="([^"]+)"', body)]
+    return out
+
+def trello_fixtures(exchanges, body):
+    """Recorded Trello GETs as TrelloStub `recorded` bodies, and the recorded nested board payloads"""
+    recorded, boards = {}, {}
+    for ex in exchanges:
+        if ex["method"] != "GET" or ex["status"] != 200:
+            continue  # 304s revalidate a body recorded earlier; errors are the fault model's job
+        parts = urlsplit(ex["url"])
+        key = replay_key(parts.path, parts.query)
+        payload = body(ex["body"])
+        recorded.setdefault(key, []).append(payload)
+        segments = parts.path.strip("/").split("/")
+        if segments[-1] == "lists" and "cards" in dict(key[1]) and "checklists" in dict(key[1]):
+            boards[segments[-2]] = json.loads(payload)
+    return recorded, boards
+
+def record(args):
+    os.makedirs(args.fixtures, exist_ok=True)
+    workdir = tempfile.mkdtemp(prefix="sora-record-")
+    env = dict(os.environ, SORA_RECORD_DIR=os.path.abspath(args.fixtures))
+    stubs = []
+    try:
+        if args.synthetic:
+            lists, cards = (int(n) for n in args.synthetic.split("x"))
+            trello = TrelloStub({"board": make_board(lists=lists, cards_per_list=cards)})
+            hook = WebhookStub()
+            stubs = [trello, hook]
+            env.update(TRELLO_KEY="key", TRELLO_TOKEN="token", TRELLO_BOARD_ID="board", DISCORD_WEBHOOK=hook.url,
+                       TRELLO_API_URL=trello.base_url + "/1")
+        code, elapsed, output = run_main(env, workdir, roll=0.0, delay=0)
+    finally:
+        for stub in stubs:
+            stub.close()
+        shutil.rmtree(workdir, ignore_errors=True)
+    exchanges, _ = load_recording(args.fixtures)
+    print(output.rstrip())
+    print(f"recorded {len(exchanges)} exchange(s) to {args.fixtures} in {elapsed:.1f} s (exit {code})")
+    return code
+
+def replay(args):
+    exchanges, body = load_recording(args.fixtures)
+    recorded, boards = trello_fixtures(exchanges, body)
+    posts = [(ex["request"]["content_type"], body(ex["request"]["body"])) for ex in exchanges
+             if ex["method"] == "POST" and 200 <= ex["status"] < 300]
+    expected = messages(posts)
+    board_ids = sorted({urlsplit(ex["url"]).path.strip("/").split("/")[2] for ex in exchanges
+                        if ex["method"] == "GET" and "/boards/" in ex["url"]})
+    bucket_size, bucket_window = (None, 2.0)
+    if args.rate_limit:
+        size, window = args.rate_limit.split("/")
+        bucket_size, bucket_window = int(size), float(window)
+
+    def faults(seed):
+        return Faults(latency=args.latency, bandwidth=args.bandwidth, error_rate=args.error_rate,
+                      rate_limit_rate=args.rate_limit_rate, bucket_size=bucket_size, bucket_window=bucket_window,
+                      seed=seed, speed=args.speed)
+
+    print(f"{len(exchanges)} recorded exchange(s), {len(board_ids)} board(s), {len(posts)} Discord post(s); "
+          f"speed {args.speed:g}x")
+    failures = 0
+    for i in range(args.runs):
+        trello = TrelloStub(boards, faults=faults(i), recorded=recorded)
+        hook = WebhookStub(faults=faults(i + 1000))
+        workdir = tempfile.mkdtemp(prefix="sora-replay-")
+        env = dict(os.environ, TRELLO_KEY="key", TRELLO_TOKEN="token", DISCORD_WEBHOOK=hook.url,
+                   TRELLO_API_URL=trello.base_url + "/1")
+        env.pop("SORA_RECORD_DIR", None)
+        env.pop("TRELLO_BOARD_ID", None)
+        env["TRELLO_BOARD_IDS"] = ",".join(board_ids)
+        env.update(kv.split("=", 1) for kv in args.env)
+        try:
+            code, elapsed, output = run_main(env, workdir, speed=args.speed, roll=0.0, delay=args.delay)
+        finally:
+            trello.close()
+            hook.close()
+            shutil.rmtree(workdir, ignore_errors=True)
+        got = messages((ctype, data) for _, ctype, data in hook.received)
+        same = got == expected
+        failures += code != 0 or not same
+        print(f"  run {i + 1}: exit {code}, {elapsed:6.2f} s wall (~{elapsed * args.speed / 60:6.1f} min simulated), "
+              f"Trello {trello.requests} request(s) {dict(sorted(trello.faults.status_counts.items()))}, "
+              f"Discord {dict(sorted(hook.status_counts.items()))}, messages match recording: {same}")
+        if args.verbose or code != 0:
+            print("    " + output.rstrip().replace("\n", "\n    "))
+    return 1 if failures else 0
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    sub = parser.add_subparsers(dest="mode", required=True)
+    rec = sub.add_parser("record", help="run main.py once, saving every exchange to the fixture directory")
+    rec.add_argument("fixtures")
+    rec.add_argument("--synthetic", metavar="LISTSxCARDS", help="record against stand-ins with a synthetic board")
+    rep = sub.add_parser("replay", help="run main.py against stand-ins serving the fixtures")
+    rep.add_argument("fixtures")
+    rep.add_argument("--speed", type=float, default=3600.0, help="virtual seconds per real second")
+    rep.add_argument("--delay", type=int, default=None, help="pin the send delay (seconds; default: rolled)")
+    rep.add_argument("--latency", type=float, default=0.0, help="seconds per response")
+    rep.add_argument("--bandwidth", type=float, default=None, help="bytes per second")
+    rep.add_argument("--error-rate", type=float, default=0.0, help="share of requests answered 502")
+    rep.add_argument("--rate-limit-rate", type=float, default=0.0, help="share of requests answered 429")
+    rep.add_argument("--rate-limit", metavar="N/SECONDS", help="request bucket per stand-in, e.g. 5/2")
+    rep.add_argument("--runs", type=int, default=1)
+    rep.add_argument("--env", action="append", default=[], metavar="NAME=VALUE", help="extra env for main.py")
+    rep.add_argument("--verbose", action="store_true", help="show main.py's output")
+    args = parser.parse_args()
+    sys.exit(record(args) if args.mode == "record" else replay(args))
@@ -0,0 +1,39 @@
+# bench/retry_throughput.py
+# Delivery throughput through main.http_request against a webhook stand-in injecting 429s and 5xx
+#
+#   python bench/retry_throughput.py [messages] [rate_limit_rate] [error_rate]
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from servers import WebhookStub, import_main
+
+main = import_main()
+
+if __name__ == "__main__":
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 60
+    rate_limit_rate = float(sys.argv[2]) if len(sys.argv) > 2 else 0.1
+    error_rate = float(sys.argv[3]) if len(sys.argv) > 3 else 0.1
+
+    main.HTTP_BACKOFF_BASE = 0.05
+    main.HTTP_RETRIES = 8
+    # stand-in enforces Discord's 5 requests / 2 s bucket; our client side uses the same rate
+    stub = WebhookStub(rate_limit_rate=rate_limit_rate, error_rate=error_rate, bucket_size=5, bucket_window=2.0)
+    main.ROUTE_RATES["127.0.0.1"] = (2.5, 5)
+
+    def send(i):
+        r = main.http_request("POST", stub.url, json={"content": f"message {i}"})
+        return r.status_code
+
+    t0 = time.perf_counter()
+    try:
+        with ThreadPoolExecutor(max_workers=4) as pool:
+            statuses = list(pool.map(send, range(n)))
+    finally:
+        stub.close()
+    elapsed = time.perf_counter() - t0
+
+    delivered = sum(1 for s in statuses if s < 300)
+    print(f"{delivered}/{n} delivered in {elapsed:.1f} s ({delivered / elapsed:.2f} msg/s, limit 2.5 msg/s)")
+    print("server responses:", dict(sorted(stub.status_counts.items())))
+    print("client stats:", main.transport_stats)
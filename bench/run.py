@@ -0,0 +1,173 @@
+# bench/run.py
+# Benchmark suite: fetch / priority / render / send phases against local stand-ins
+#
+#   python bench/run.py --preset medium
+#   python bench/run.py --lists 20 --cards 500 --checklists 4 --items 25   # 1M check items
+#   python bench/run.py --compare bench/results/a.json bench/results/b.json
+#
+# Each phase is timed with tracing off (best of --repeat), then run once more under
+# tracemalloc for peak memory and, from snapshots taken before and after, the blocks and MB
+# the phase left allocated (its result included). "gc0" is the number of generation-0
+# collections during that run: only a proxy for allocation churn.
+import argparse
+import gc
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import time
+import tracemalloc
+from datetime import datetime
+
+from servers import TrelloStub, WebhookStub, import_main
+from synthetic import make_board
+
+main = import_main()
+
+PRESETS = {
+    "small": dict(lists=5, cards=20, checklists=1, items=5, labels=8),
+    "medium": dict(lists=20, cards=200, checklists=2, items=8, labels=12),
+    "large": dict(lists=40, cards=1000, checklists=3, items=10, labels=20),
+    "huge": dict(lists=20, cards=500, checklists=4, items=25, labels=20),  # 1M check items
+}
+
+def measure(fn, repeat):
+    """Run fn best-of-repeat for time, then once under tracemalloc; return (result, stats)"""
+    best = None
+    for _ in range(repeat):
+        gc.collect()
+        t0 = time.perf_counter()
+        result = fn()
+        elapsed = time.perf_counter() - t0
+        best = elapsed if best is None else min(best, elapsed)
+        del result
+
+    gc.collect()
+    gc0_before = gc.get_stats()[0]["collections"]
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    tracemalloc.reset_peak()
+    result = fn()
+    _, peak = tracemalloc.get_traced_memory()
+    gc0 = gc.get_stats()[0]["collections"] - gc0_before
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    ignore = [tracemalloc.Filter(False, tracemalloc.__file__)]
+    diff = after.filter_traces(ignore).compare_to(before.filter_traces(ignore), "filename")
+    stats = {
+        "wall_s": best,
+        "peak_mb": peak / 1e6,
+        "net_blocks": sum(d.count_diff for d in diff),
+        "net_mb": sum(d.size_diff for d in diff) / 1e6,
+        "gc0": gc0,
+    }
+    return result, stats
+
+def run(params, repeat, phases):
+    random.seed(params["seed"])
+    t0 = time.perf_counter()
+    board = make_board(lists=params["lists"], cards_per_list=params["cards"],
+                       checklists_per_card=params["checklists"], items_per_checklist=params["items"],
+                       labels=params["labels"], seed=params["seed"])
+    n_cards = params["lists"] * params["cards"]
+    n_items = n_cards * params["checklists"] * params["items"]
+    print(f"board: {params['lists']} lists, {n_cards} cards, {n_items} items "
+          f"(generated in {time.perf_counter() - t0:.1f} s)")
+
+    trello = TrelloStub({"bench": board})
+    webhook = WebhookStub()
+    main.BOARD_URL = trello.board_url("bench")
+    main.FETCH_STRATEGY = "nested"  # fetch_strategy.py compares strategies
+    main.WEBHOOK_URL = webhook.url
+    main.ROUTE_RATES["127.0.0.1"] = (1e9, 1e9)  # measure our code, not the rate limiter
+    results = {}
+    try:
+        payload_mb = len(trello.boards["bench"]) / 1e6
+        if "fetch" in phases:
+            _, results["fetch"] = measure(main.get_board_data, repeat)
+            results["fetch"]["payload_mb"] = payload_mb
+            if main.STREAM_FETCH:
+                _, results["fetch_stream"] = measure(lambda: list(main.stream_board_data()), repeat)
+        if "priority" in phases:
+            cards = [c for lst in board for c in lst["cards"]]
+            _, results["priority"] = measure(lambda: [main.get_priority_emoji(c) for c in cards], repeat)
+        chunks = None
+        if "render" in phases or "send" in phases:
+            (chunks, summary), stats = measure(lambda: main.render_report(board), repeat)
+            if "render" in phases:
+                results["render"] = stats
+                results["render"]["report_mb"] = sum(len(c) for c in chunks) / 1e6
+        if "send" in phases:
+            _, results["send"] = measure(lambda: main.send_to_discord_file(chunks, summary), repeat)
+    finally:
+        trello.close()
+        webhook.close()
+
+    for name, stats in results.items():
+        stats["cards_per_s"] = n_cards / stats["wall_s"] if stats["wall_s"] else None
+    return {"cards": n_cards, "items": n_items, "phases": results}
+
+def git_commit():
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"],
+                                       cwd=os.path.dirname(os.path.abspath(__file__)),
+                                       stderr=subprocess.DEVNULL).decode().strip()
+    except Exception:
+        return None
+
+def print_results(results):
+    print(f"{'phase':>12} {'wall ms':>10} {'cards/s':>12} {'peak MB':>9} {'net blocks':>11} {'net MB':>8} {'gc0':>6}")
+    for name, st in results["phases"].items():
+        print(f"{name:>12} {st['wall_s'] * 1000:10.1f} {st['cards_per_s']:12.0f} "
+              f"{st['peak_mb']:9.1f} {st['net_blocks']:11d} {st['net_mb']:8.2f} {st['gc0']:6d}")
+    print("net blocks / MB: tracemalloc snapshots, before and after; gc0: gen-0 collections (a proxy for churn)")
+
+def compare(path_a, path_b):
+    with open(path_a) as f:
+        a = json.load(f)
+    with open(path_b) as f:
+        b = json.load(f)
+    print(f"{a['meta'].get('commit')} -> {b['meta'].get('commit')}")
+    print(f"{'phase':>12} {'wall':>16} {'peak MB':>16}")
+    for name, st_b in b["results"]["phases"].items():
+        st_a = a["results"]["phases"].get(name)
+        if not st_a:
+            continue
+        print(f"{name:>12} {st_b['wall_s'] / st_a['wall_s']:15.2f}x {st_a['peak_mb']:7.1f} -> {st_b['peak_mb']:<7.1f}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--preset", choices=sorted(PRESETS), default="medium")
+    for name in ("lists", "cards", "checklists", "items", "labels"):
+        parser.add_argument(f"--{name}", type=int)
+    parser.add_argument("--seed", type=int, default=1234)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--phases", default="fetch,priority,render,send")
+    parser.add_argument("--output", help="JSON results path (default: bench/results/<preset>-<time>.json)")
+    parser.add_argument("--compare", nargs=2, metavar=("BEFORE", "AFTER"))
+    args = parser.parse_args()
+
+    if args.compare:
+        compare(*args.compare)
+        sys.exit(0)
+
+    params = dict(PRESETS[args.preset], seed=args.seed)
+    for name in ("lists", "cards", "checklists", "items", "labels"):
+        if getattr(args, name) is not None:
+            params[name] = getattr(args, name)
+    results = run(params, args.repeat, set(args.phases.split(",")))
+    print_results(results)
+
+    output = args.output or os.path.join(
+        os.path.dirname(os.path.abspath(__file__)), "results",
+        f"{args.preset}-{datetime.now().strftime('%Y%m%d-%H%M%S')}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump({
+            "meta": {"params": params, "repeat": args.repeat, "commit": git_commit(),
+                     "python": platform.python_version(), "time": datetime.now().isoformat(timespec="seconds")},
+            "results": results,
+        }, f, indent=2)
+    print("saved", output)
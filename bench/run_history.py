@@ -0,0 +1,58 @@
+# bench/run_history.py
+# Run history under concurrent writers: several processes recording runs (with per-card
+# snapshots) into one SQLite file at once, then an integrity check and the cost of the
+# scheduler's last-run lookup as the history grows.
+#
+#   python bench/run_history.py [processes] [runs_per_process] [cards]
+import multiprocessing
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+
+from servers import import_main
+
+main = import_main()
+
+def writer(path, board_id, runs, cards):
+    main.STATE_DB = path
+    stats = {"lists": 5, "cards_total": cards, "completed_cards": 0, "items": cards * 5, "completed_items": 0,
+             "cards": [(f"{board_id}-card{i}", 5, i % 6) for i in range(cards)]}
+    for n in range(runs):
+        main.record_run(board_id, "sent", "delivered" if n % 3 else "failed", stats,
+                        {"fetch": 0.1, "render": 0.05, "send": 0.2}, delay=n)
+
+if __name__ == "__main__":
+    processes = int(sys.argv[1]) if len(sys.argv) > 1 else 8
+    runs = int(sys.argv[2]) if len(sys.argv) > 2 else 50
+    cards = int(sys.argv[3]) if len(sys.argv) > 3 else 500
+    path = os.path.join(tempfile.mkdtemp(prefix="sora-history-"), "state.db")
+    main.STATE_DB = path
+    main.connect_state_db().close()  # create the schema before the writers race
+
+    t0 = time.perf_counter()
+    procs = [multiprocessing.Process(target=writer, args=(path, f"board{i}", runs, cards)) for i in range(processes)]
+    for p in procs:
+        p.start()
+    for p in procs:
+        p.join()
+    elapsed = time.perf_counter() - t0
+
+    conn = sqlite3.connect(path)
+    n_runs = conn.execute("SELECT COUNT(*) FROM runs").fetchone()[0]
+    n_cards = conn.execute("SELECT COUNT(*) FROM card_snapshots").fetchone()[0]
+    integrity = conn.execute("PRAGMA integrity_check").fetchone()[0]
+    conn.close()
+    print(f"{processes} writers x {runs} runs x {cards} cards: {elapsed:.2f} s "
+          f"({n_runs / elapsed:.0f} runs/s, {n_cards / elapsed:.0f} card rows/s)")
+    ok = n_runs == processes * runs and n_cards == processes * runs * cards
+    print(f"rows: {n_runs} runs, {n_cards} card snapshots ({'all present' if ok else 'MISSING ROWS'}), "
+          f"integrity_check: {integrity}")
+
+    t0 = time.perf_counter()
+    for _ in range(100):
+        main.read_last_run([f"board{i}" for i in range(processes)])
+    print(f"last-run lookup over {processes} boards: {(time.perf_counter() - t0) * 10:.2f} ms")
+    if not ok or integrity != "ok":
+        sys.exit(1)
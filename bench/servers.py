@@ -0,0 +1,356 @@
+# bench/servers.py
+# Local stand-in HTTP servers for the benchmarks (no Trello/Discord credentials needed)
+import hashlib
+import itertools
+import json
+import os
+import random
+import sys
+import threading
+import time
+from urllib.parse import parse_qs, parse_qsl
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+def import_main():
+    """Import main.py from the repo root with placeholder credentials"""
+    sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+    for var in ("TRELLO_KEY", "TRELLO_TOKEN", "TRELLO_BOARD_ID", "DISCORD_WEBHOOK"):
+        os.environ.setdefault(var, "bench")
+    import main
+    return main
+
+def replay_key(path, query):
+    """How recorded requests are matched: the path and the query without the credentials"""
+    return path, tuple(sorted((k, v) for k, v in parse_qsl(query) if k not in ("key", "token")))
+
+class TrelloStub:
+    """Serves board payloads at /1/boards/<board_id>/lists, with optional per-request latency
+
+    Boards given as dicts also answer the split bulk endpoints (/cards/open, /checklists,
+    /labels) and honour Trello's fields / card_fields / checklist_fields / checkItem_fields
+    projection; without projection parameters the stored payload is served as-is.
+
+    Recorded action streams (newest first, like Trello) are replayed at
+    /1/boards/<board_id>/actions, honouring the `filter`, `since` (action ID or
+    date), `before` and `limit` parameters.
+
+    `recorded` maps (path, query key) (see replay_key) to response bodies captured
+    in record mode; they are served first, in order, the last one repeating.
+    `faults` (a Faults model) adds errors, rate limits and bandwidth; `latency`
+    alone is a shorthand for Faults(latency=...).
+    """
+
+    def __init__(self, boards, actions=None, latency=0.0, chunk_size=65536, faults=None, recorded=None):
+        self.boards = {}
+        self.board_dicts = {}
+        for bid, b in boards.items():
+            self.set_board(bid, b)
+        self.actions = dict(actions or {})
+        self.faults = faults or Faults(latency=latency)
+        self.recorded = {key: list(bodies) for key, bodies in (recorded or {}).items()}
+        self.chunk_size = chunk_size
+        self.requests = 0
+        self.bytes_sent = 0
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_GET(self):
+                stub.requests += 1
+                stub.faults.delay()
+                status, headers = stub.faults.decide(ok=200)
+                if status != 200:
+                    payload = json.dumps({"message": "rate limited" if status == 429 else "bad gateway"}).encode()
+                    self.send_response(status)
+                    for k, v in headers.items():
+                        self.send_header(k, v)
+                    self.send_header("Content-Type", "application/json")
+                    self.send_header("Content-Length", str(len(payload)))
+                    self.end_headers()
+                    self.wfile.write(payload)
+                    return
+                path, _, query = self.path.partition("?")
+                parts = path.strip("/").split("/")
+                params = parse_qs(query)
+                payload = stub.replayed(path, query)
+                if payload is not None:
+                    pass
+                elif len(parts) == 4 and parts[3] == "actions" and parts[2] in stub.actions:
+                    payload = stub.actions_payload(parts[2], params)
+                elif len(parts) >= 4 and parts[2] in stub.board_dicts and (
+                        parts[3] != "lists" or "fields" in params or "card_fields" in params):
+                    payload = stub.projected_payload(parts[2], parts[3], params)
+                elif len(parts) >= 3:
+                    payload = stub.boards.get(parts[2])
+                if payload is None:
+                    self.send_response(404)
+                    self.send_header("Content-Length", "0")
+                    self.end_headers()
+                    return
+                etag = '"%s"' % hashlib.sha1(payload).hexdigest()
+                if self.headers.get("If-None-Match") == etag:
+                    self.send_response(304)
+                    self.send_header("ETag", etag)
+                    self.send_header("Content-Length", "0")
+                    self.end_headers()
+                    return
+                self.send_response(200)
+                self.send_header("ETag", etag)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                stub.bytes_sent += len(payload)
+                for i in range(0, len(payload), stub.chunk_size):
+                    chunk = payload[i:i + stub.chunk_size]
+                    stub.faults.transfer(len(chunk))
+                    self.wfile.write(chunk)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.server.daemon_threads = True
+        self.base_url = f"http://127.0.0.1:{self.server.server_port}"
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def set_board(self, board_id, board):
+        if isinstance(board, bytes):
+            self.boards[board_id] = board
+            self.board_dicts.pop(board_id, None)
+        else:
+            self.boards[board_id] = json.dumps(board).encode("utf-8")
+            self.board_dicts[board_id] = board
+
+    def replayed(self, path, query):
+        bodies = self.recorded.get(replay_key(path, query))
+        if not bodies:
+            return None
+        with self.faults.lock:
+            return bodies.pop(0) if len(bodies) > 1 else bodies[0]
+
+    def projected_payload(self, board_id, endpoint, params):
+        """Trello-style field projection, for the nested lists call and the split bulk endpoints"""
+        def project(obj, key, always=("id",)):
+            fields = params.get(key, ["all"])[0]
+            if fields == "all":
+                return dict(obj)
+            keep = set(fields.split(",")) | set(always)
+            return {k: v for k, v in obj.items() if k in keep}
+
+        def checklist(cl, extra):
+            out = project({**cl, **extra}, "checklist_fields" if endpoint == "lists" else "fields")
+            out["checkItems"] = [project(it, "checkItem_fields") for it in cl["checkItems"]]
+            return out
+
+        board = self.board_dicts[board_id]
+        cards = [(lst, pos, card) for lst in board for pos, card in enumerate(lst["cards"])]
+        if endpoint == "lists" and "cards" in params:
+            out = []
+            for lst in board:
+                entry = project(lst, "fields")
+                entry["cards"] = []
+                for pos, card in enumerate(lst["cards"]):
+                    c = project(card, "card_fields")
+                    if "checklists" in params:
+                        c["checklists"] = [checklist(cl, {"idCard": card["id"], "pos": k})
+                                           for k, cl in enumerate(card["checklists"])]
+                    entry["cards"].append(c)
+                out.append(entry)
+        elif endpoint == "lists":
+            out = [project(lst, "fields") for lst in board]
+        elif endpoint == "cards":
+            out = [project({**card, "idList": lst["id"], "pos": pos,
+                            "idLabels": [lb["id"] for lb in card["labels"]]}, "fields")
+                   for lst, pos, card in cards]
+        elif endpoint == "checklists":
+            out = [checklist(cl, {"idCard": card["id"], "pos": k})
+                   for _, _, card in cards for k, cl in enumerate(card["checklists"])]
+        elif endpoint == "labels":
+            labels = {lb["id"]: lb for _, _, card in cards for lb in card["labels"]}
+            out = [project(lb, "fields") for lb in labels.values()]
+        else:
+            return None
+        return json.dumps(out).encode("utf-8")
+
+    def actions_payload(self, board_id, params):
+        actions = self.actions[board_id]
+        kinds = set(params["filter"][0].split(",")) if "filter" in params else None
+        since = params.get("since", [None])[0]
+        before = params.get("before", [None])[0]
+        limit = int(params.get("limit", ["50"])[0])
+        start = 0
+        if before:  # newest first, so IDs descend: binary search for the first one older than `before`
+            lo, hi = 0, len(actions)
+            while lo < hi:
+                mid = (lo + hi) // 2
+                if actions[mid]["id"] >= before:
+                    lo = mid + 1
+                else:
+                    hi = mid
+            start = lo
+        page = []
+        for a in itertools.islice(actions, start, None):
+            if since and ("-" in since and a.get("date", "") < since or "-" not in since and a["id"] <= since):
+                break  # a date (history fetch) or an action ID (delta sync); everything after is older
+            if kinds is None or a["type"] in kinds:
+                page.append(a)
+                if len(page) >= limit:
+                    break
+        return json.dumps(page).encode("utf-8")
+
+    def board_url(self, board_id):
+        return f"{self.base_url}/1/boards/{board_id}/lists"
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+class Faults:
+    """Latency, bandwidth, error and rate-limit model for a stand-in server
+
+    Faults are injected at random (seeded): `rate_limit_rate` of requests get a 429
+    with Retry-After, `error_rate` get a 502. A real bucket of `bucket_size` requests
+    per `bucket_window` seconds is enforced when bucket_size is set. `latency`
+    delays every response and `bandwidth` (bytes/s) paces bodies. Times are virtual:
+    at `speed` N the server waits N times less than the figures say, while the
+    headers keep the virtual figures, for clients whose clock runs N times faster.
+    """
+
+    def __init__(self, latency=0.0, bandwidth=None, error_rate=0.0, rate_limit_rate=0.0, retry_after=0.05,
+                 bucket_size=None, bucket_window=2.0, seed=7, speed=1.0):
+        self.latency = latency
+        self.bandwidth = bandwidth
+        self.error_rate = error_rate
+        self.rate_limit_rate = rate_limit_rate
+        self.retry_after = retry_after
+        self.bucket_size = bucket_size
+        self.bucket_window = bucket_window
+        self.speed = speed
+        self.rng = random.Random(seed)
+        self.lock = threading.Lock()
+        self.window_start = self.now()
+        self.window_count = 0
+        self.status_counts = {}
+
+    def now(self):
+        return time.monotonic() * self.speed
+
+    def sleep(self, seconds):
+        if seconds > 0:
+            time.sleep(seconds / self.speed)
+
+    def delay(self):
+        self.sleep(self.latency)
+
+    def transfer(self, size):
+        """Wait as long as moving size bytes takes at the configured bandwidth"""
+        if self.bandwidth:
+            self.sleep(size / self.bandwidth)
+
+    def decide(self, ok=204):
+        """(status, headers) for the next request; counted in status_counts"""
+        with self.lock:
+            headers = {}
+            status = ok
+            roll = self.rng.random()
+            if self.bucket_size:
+                now = self.now()
+                if now - self.window_start >= self.bucket_window:
+                    self.window_start, self.window_count = now, 0
+                reset_after = self.bucket_window - (now - self.window_start)
+                if self.window_count >= self.bucket_size:
+                    status = 429
+                    headers["Retry-After"] = f"{reset_after:.3f}"
+                else:
+                    self.window_count += 1
+                headers["X-RateLimit-Limit"] = str(self.bucket_size)
+                headers["X-RateLimit-Remaining"] = str(max(0, self.bucket_size - self.window_count))
+                headers["X-RateLimit-Reset-After"] = f"{reset_after:.3f}"
+            if status == ok and roll < self.rate_limit_rate:
+                status = 429
+                headers["Retry-After"] = str(self.retry_after)
+            elif status == ok and roll < self.rate_limit_rate + self.error_rate:
+                status = 502
+            self.status_counts[status] = self.status_counts.get(status, 0) + 1
+            return status, headers
+
+    def recount(self, old, new):
+        with self.lock:
+            self.status_counts[old] -= 1
+            self.status_counts[new] = self.status_counts.get(new, 0) + 1
+
+class WebhookStub:
+    """Discord webhook stand-in: accepts JSON and multipart POSTs on any path
+
+    Latency, bandwidth, 429s (with Retry-After / X-RateLimit-* headers and a
+    Discord-style JSON body), 502s and a request bucket come from a Faults model
+    built from the keyword arguments. Bodies over `max_body_bytes` are refused with
+    a 413 like Discord's upload limit. A ready-made `faults` model replaces the
+    fault arguments. While `reject_files` is set, every multipart
+    (file) POST gets a 502: the summary goes through, the upload does not.
+    """
+
+    def __init__(self, rate_limit_rate=0.0, error_rate=0.0, retry_after=0.05,
+                 bucket_size=None, bucket_window=2.0, max_body_bytes=None, seed=7, latency=0.0,
+                 reject_files=False, bandwidth=None, speed=1.0, faults=None):
+        self.faults = faults or Faults(latency=latency, bandwidth=bandwidth, error_rate=error_rate,
+                                       rate_limit_rate=rate_limit_rate, retry_after=retry_after,
+                                       bucket_size=bucket_size, bucket_window=bucket_window, seed=seed, speed=speed)
+        self.max_body_bytes = max_body_bytes
+        self.reject_files = reject_files
+        self.last_received = None  # time.perf_counter() of the latest accepted request
+        self.lock = self.faults.lock
+        self.status_counts = self.faults.status_counts
+        self.received = []  # (path, content_type, body bytes) of accepted requests
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_POST(self):
+                body = self.rfile.read(int(self.headers.get("Content-Length") or 0))
+                stub.faults.transfer(len(body))
+                stub.faults.delay()
+                status, headers = stub.decide()
+                payload = b""
+                if status == 204 and stub.reject_files and self.headers.get("Content-Type", "").startswith("multipart/"):
+                    status = 502
+                    stub.faults.recount(204, 502)
+                if status == 204 and stub.max_body_bytes and len(body) > stub.max_body_bytes:
+                    status = 413
+                    payload = json.dumps({"message": "Request entity too large", "code": 40005}).encode()
+                    headers["Content-Type"] = "application/json"
+                    stub.faults.recount(204, 413)
+                elif status == 429:
+                    payload = json.dumps({"message": "You are being rate limited.",
+                                          "retry_after": stub.faults.retry_after, "global": False}).encode()
+                    headers["Content-Type"] = "application/json"
+                elif status == 204:
+                    with stub.lock:
+                        stub.received.append((self.path, self.headers.get("Content-Type", ""), body))
+                        stub.last_received = time.perf_counter()
+                self.send_response(status)
+                for k, v in headers.items():
+                    self.send_header(k, v)
+                self.send_header("Content-Length", str(len(payload)))
+                try:
+                    self.end_headers()
+                    self.wfile.write(payload)
+                except (BrokenPipeError, ConnectionResetError):
+                    pass  # the client was killed mid-request (crash-recovery benches)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.server.daemon_threads = True
+        self.url = f"http://127.0.0.1:{self.server.server_port}/api/webhooks/1/token"
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def decide(self):
+        return self.faults.decide()
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
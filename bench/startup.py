@@ -0,0 +1,107 @@
+# bench/startup.py
+# Cold-start wall time of `python main.py` for the rest-day (skip) path and the send path,
+# against the original script's skip path (inlined below). The random roll is pinned by a
+# tiny wrapper; the send path talks to the local Trello/webhook stand-ins.
+#
+#   python bench/startup.py [runs]
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+from servers import TrelloStub, WebhookStub
+from synthetic import make_board
+
+REPO = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+WRAPPER = (
+    "import random, runpy, sys\n"
+    "random.random = lambda: float(sys.argv[2])\n"
+    "random.randint = lambda a, b: 0\n"
+    "runpy.run_path(sys.argv[1], run_name='__main__')\n"
+)
+
+# The original main.py up to its rest-day exit: the same eager imports, env check and
+# roll. Its phrase lists and report functions are left out: they are only compiled and
+# defined before the exit, so the reference is if anything a little faster than the original.
+ORIGINAL_SKIP_PATH = """\
+import os
+import requests
+import random
+import time
+from datetime import datetime, timedelta
+import sys
+
+TRELLO_KEY = os.getenv("TRELLO_KEY")
+TRELLO_TOKEN = os.getenv("TRELLO_TOKEN")
+TRELLO_BOARD_ID = os.getenv("TRELLO_BOARD_ID")
+WEBHOOK_URL = os.getenv("DISCORD_WEBHOOK")
+
+missing = [name for name, val in [
+    ("TRELLO_KEY", TRELLO_KEY),
+    ("TRELLO_TOKEN", TRELLO_TOKEN),
+    ("TRELLO_BOARD_ID", TRELLO_BOARD_ID),
+    ("DISCORD_WEBHOOK", WEBHOOK_URL),
+] if not val]
+if missing:
+    raise SystemExit(f"Missing environment variables: {', '.join(missing)}")
+
+LAST_RUN_FILE = "last_run.txt"
+
+def read_last_run():
+    if os.path.exists(LAST_RUN_FILE):
+        try:
+            with open(LAST_RUN_FILE, "r", encoding="utf-8") as f:
+                txt = f.read().strip()
+                return datetime.strptime(txt, "%Y-%m-%d").date()
+        except Exception:
+            return None
+    return None
+
+if __name__ == "__main__":
+    last_run_date = read_last_run()
+    today = datetime.now().date()
+    days_since_last = (today - last_run_date).days if last_run_date else 1
+    progressive_chance = min(0.2 + 0.15 * days_since_last, 0.9)
+    print(f"[Sora] Days since last: {days_since_last}, chance to run today: {progressive_chance:.2f}")
+    if random.random() >= progressive_chance:
+        print("[Sora] Taking a rest today :) No report sent.")
+        sys.exit(0)
+"""
+
+def timed_runs(args, env, cwd, runs):
+    times = []
+    for _ in range(runs):
+        t0 = time.perf_counter()
+        proc = subprocess.run(args, env=env, cwd=cwd, capture_output=True)
+        times.append(time.perf_counter() - t0)
+        if proc.returncode != 0:
+            raise SystemExit(proc.stdout.decode() + proc.stderr.decode())
+    return statistics.median(times) * 1000
+
+if __name__ == "__main__":
+    runs = int(sys.argv[1]) if len(sys.argv) > 1 else 15
+    workdir = tempfile.mkdtemp(prefix="sora-startup-")
+    baseline = os.path.join(workdir, "main_baseline.py")
+    with open(baseline, "w", encoding="utf-8") as f:
+        f.write(ORIGINAL_SKIP_PATH)
+
+    trello = TrelloStub({"b": make_board(lists=5, cards_per_list=20)})
+    hook = WebhookStub()
+    env = dict(os.environ, TRELLO_KEY="k", TRELLO_TOKEN="t", TRELLO_BOARD_ID="b",
+               DISCORD_WEBHOOK=hook.url, TRELLO_API_URL=trello.base_url + "/1")
+    current = os.path.join(REPO, "main.py")
+    try:
+        interpreter = timed_runs([sys.executable, "-c", "pass"], env, workdir, runs)
+        skip_before = timed_runs([sys.executable, "-c", WRAPPER, baseline, "0.999"], env, workdir, runs)
+        skip_after = timed_runs([sys.executable, "-c", WRAPPER, current, "0.999"], env, workdir, runs)
+        send_after = timed_runs([sys.executable, "-c", WRAPPER, current, "0.0"], env, workdir, runs)
+    finally:
+        trello.close()
+        hook.close()
+
+    print(f"median of {runs} runs (bare interpreter start: {interpreter:.0f} ms)")
+    print(f"  skip path, original script: {skip_before:6.0f} ms")
+    print(f"  skip path, now:             {skip_after:6.0f} ms")
+    print(f"  send path, now:             {send_after:6.0f} ms")
@@ -0,0 +1,35 @@
+# bench/stream_memory.py
+# Peak-memory comparison of get_board_data() vs stream_board_data() against a local board server
+#
+#   python bench/stream_memory.py [lists] [cards_per_list]
+import sys
+import time
+import tracemalloc
+
+from servers import TrelloStub, import_main
+from synthetic import make_board
+
+main = import_main()
+
+def measure(label, fn):
+    tracemalloc.start()
+    t0 = time.perf_counter()
+    report_text, _ = fn()
+    elapsed = time.perf_counter() - t0
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"{label:>8}: peak {peak / 1e6:8.1f} MB  time {elapsed:6.2f} s  report {len(report_text) / 1e6:.1f} MB")
+
+if __name__ == "__main__":
+    lists = int(sys.argv[1]) if len(sys.argv) > 1 else 40
+    cards = int(sys.argv[2]) if len(sys.argv) > 2 else 250
+    stub = TrelloStub({"big": make_board(lists=lists, cards_per_list=cards)})
+    print(f"Board: {lists} lists x {cards} cards, payload {len(stub.boards['big']) / 1e6:.1f} MB")
+
+    main.BOARD_URL = stub.board_url("big")
+    main.FETCH_STRATEGY = "nested"  # fetch_strategy.py compares strategies
+    try:
+        measure("full", lambda: main.generate_report(main.get_board_data()))
+        measure("stream", lambda: main.generate_report(main.stream_board_data()))
+    finally:
+        stub.close()
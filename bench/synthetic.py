@@ -0,0 +1,137 @@
+# bench/synthetic.py
+# Seeded generator for fake Trello board payloads (same shape as BOARD_URL returns)
+import copy
+import random
+
+LABEL_NAMES = ["High", "Medium", "Low", "Urgent", "Done", "Bug", "Feature", "Chore"]
+
+def make_board(lists=10, cards_per_list=50, checklists_per_card=2, items_per_checklist=5,
+               labels=8, seed=1234):
+    """Build a list-of-lists board payload; identical output for identical arguments"""
+    rng = random.Random(seed)
+    label_pool = [
+        {"id": f"label{i:04d}", "name": LABEL_NAMES[i % len(LABEL_NAMES)], "color": "green"}
+        for i in range(labels)
+    ]
+    board = []
+    for li in range(lists):
+        cards = []
+        for ci in range(cards_per_list):
+            checklists = []
+            for ki in range(checklists_per_card):
+                items = [
+                    {
+                        "id": f"item{li}-{ci}-{ki}-{ii}",
+                        "name": f"Step {ii + 1} of card {ci}",
+                        "state": "complete" if rng.random() < 0.5 else "incomplete",
+                    }
+                    for ii in range(items_per_checklist)
+                ]
+                checklists.append({"id": f"cl{li}-{ci}-{ki}", "name": f"Checklist {ki + 1}", "checkItems": items})
+            card_labels = rng.sample(label_pool, k=min(len(label_pool), rng.randint(0, 2)))
+            cards.append({
+                "id": f"card{li}-{ci}",
+                "name": f"Card {ci} in list {li}",
+                "dateLastActivity": "2026-01-01T00:00:00.000Z",
+                "desc": "Lorem ipsum dolor sit amet. " * rng.randint(0, 8),
+                "labels": card_labels,
+                "checklists": checklists,
+            })
+        board.append({"id": f"list{li}", "name": f"List {li}", "cards": cards})
+    return board
+
+def mutate_board(board, n_actions=100, seed=99, first_action=1):
+    """Apply random edits to a copy of board; return (new_board, actions newest-first)
+
+    Actions use the Trello action shapes that main.apply_actions understands, with
+    fixed-width hex IDs so they sort like real ones.
+    """
+    rng = random.Random(seed)
+    board = copy.deepcopy(board)
+    actions = []
+
+    def emit(kind, data, touched=None):
+        n = first_action + len(actions)
+        date = f"2026-02-01T{n // 3600 % 24:02d}:{n // 60 % 60:02d}:{n % 60:02d}.{n // 86400 % 1000:03d}Z"
+        if touched is not None:
+            touched["dateLastActivity"] = date  # as Trello does for any change to the card
+        actions.append({"id": f"{n:024x}", "type": kind, "date": date, "data": data})
+
+    all_labels = {lb["id"]: lb for lst in board for c in lst["cards"] for lb in c["labels"]}
+    for _ in range(n_actions):
+        lst = rng.choice(board)
+        if not lst["cards"]:
+            continue
+        card = rng.choice(lst["cards"])
+        ref = {"id": card["id"], "name": card["name"]}
+        op = rng.random()
+        if op < 0.4 and card["checklists"] and card["checklists"][0]["checkItems"]:
+            cl = rng.choice(card["checklists"])
+            it = rng.choice(cl["checkItems"])
+            it["state"] = "incomplete" if it["state"] == "complete" else "complete"
+            emit("updateCheckItemStateOnCard", {"card": ref, "checklist": {"id": cl["id"]},
+                                                "checkItem": {"id": it["id"], "state": it["state"]}}, card)
+        elif op < 0.55:
+            old = card["name"]
+            card["name"] = old + " (edited)"
+            emit("updateCard", {"card": {"id": card["id"], "name": card["name"]}, "old": {"name": old}}, card)
+        elif op < 0.7:
+            dest = rng.choice(board)
+            lst["cards"].remove(card)
+            dest["cards"].append(card)
+            emit("updateCard", {"card": {"id": card["id"], "idList": dest["id"]}, "old": {"idList": lst["id"]},
+                                "listBefore": {"id": lst["id"]}, "listAfter": {"id": dest["id"]}}, card)
+        elif op < 0.8 and all_labels:
+            label = rng.choice(list(all_labels.values()))
+            if any(lb["id"] == label["id"] for lb in card["labels"]):
+                card["labels"] = [lb for lb in card["labels"] if lb["id"] != label["id"]]
+                emit("removeLabelFromCard", {"card": ref, "label": dict(label)}, card)
+            else:
+                card["labels"].append(dict(label))
+                emit("addLabelToCard", {"card": ref, "label": dict(label)}, card)
+        elif op < 0.85 and all_labels:
+            label_id = rng.choice(list(all_labels))
+            all_labels[label_id]["name"] += "!"
+            new_name = all_labels[label_id]["name"]
+            for c in (c for l in board for c in l["cards"]):
+                for lb in c["labels"]:
+                    if lb["id"] == label_id:
+                        lb["name"] = new_name
+            emit("updateLabel", {"label": dict(all_labels[label_id])})
+        elif op < 0.95:
+            new = {"id": f"newcard{seed}-{len(actions)}", "name": "Fresh card", "labels": [], "checklists": []}
+            lst["cards"].append(new)
+            emit("createCard", {"card": {"id": new["id"], "name": new["name"]}, "list": {"id": lst["id"]}}, new)
+        else:
+            lst["cards"].remove(card)
+            emit("updateCard", {"card": {"id": card["id"], "closed": True}, "old": {"closed": False}})
+
+    actions.reverse()
+    return board, actions
+
+def make_history(board, days=365, per_day=50, seed=7, end=None):
+    """Check-item state changes over the last `days` days, newest first like Trello's actions feed
+
+    Roughly one in six changes unchecks an item; activity drifts over time so the
+    velocity trend is not flat.
+    """
+    from datetime import date, timedelta
+    rng = random.Random(seed)
+    end = end or date.today()
+    refs = [(card, cl, it) for lst in board for card in lst["cards"]
+            for cl in card["checklists"] for it in cl["checkItems"]]
+    actions = []
+    for d in range(days):
+        day = end - timedelta(days=days - 1 - d)
+        for n in range(rng.randint(0, per_day * 2 * (d + days) // (2 * days))):
+            card, cl, it = rng.choice(refs)
+            state = "incomplete" if rng.random() < 1 / 6 else "complete"
+            actions.append({
+                "id": f"{len(actions) + 1:024x}",
+                "type": "updateCheckItemStateOnCard",
+                "date": f"{day.isoformat()}T{n % 24:02d}:00:00.000Z",
+                "data": {"card": {"id": card["id"], "name": card["name"]}, "checklist": {"id": cl["id"]},
+                         "checkItem": {"id": it["id"], "name": it["name"], "state": state}},
+            })
+    actions.reverse()
+    return actions
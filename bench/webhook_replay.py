@@ -0,0 +1,91 @@
+# bench/webhook_replay.py
+# Replays Trello webhook events into the receiver and measures events/s and catch-up time.
+#
+#   python bench/webhook_replay.py [--events 5000] [--cards 200]
+#       self-contained: seeds a synthetic board, starts the receiver in-process, replays a
+#       generated action stream and checks the live state matches the final board
+#   python bench/webhook_replay.py --file events.jsonl --url http://host:8080/trello/<board>
+#       replays recorded webhook bodies (one JSON object per line) against a running receiver
+import argparse
+import json
+import os
+import shutil
+import socket
+import sys
+import tempfile
+import time
+
+import requests
+
+from servers import TrelloStub, import_main
+from synthetic import make_board, mutate_board
+
+main = import_main()
+
+def replay(url, bodies):
+    """POST each body in order over one keep-alive connection; return (seconds, status counts)"""
+    session = requests.Session()
+    statuses = {}
+    t0 = time.perf_counter()
+    for body in bodies:
+        r = session.post(url, data=body, headers={"Content-Type": "application/json"})
+        statuses[r.status_code] = statuses.get(r.status_code, 0) + 1
+    return time.perf_counter() - t0, statuses
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--events", type=int, default=5000)
+    parser.add_argument("--lists", type=int, default=20)
+    parser.add_argument("--cards", type=int, default=200)
+    parser.add_argument("--file", help="recorded webhook bodies, one JSON object per line")
+    parser.add_argument("--url", help="receiver callback URL (with --file)")
+    args = parser.parse_args()
+
+    if args.file:
+        with open(args.file, "rb") as f:
+            bodies = [line.strip() for line in f if line.strip()]
+        seconds, statuses = replay(args.url, bodies)
+        print(f"{len(bodies)} events in {seconds:.2f} s ({len(bodies) / seconds:.0f} events/s), responses {statuses}")
+        sys.exit(0)
+
+    before = make_board(lists=args.lists, cards_per_list=args.cards)
+    after, actions = mutate_board(before, n_actions=args.events, first_action=2)
+    seed_action = {"id": f"{1:024x}", "type": "updateList", "data": {}}  # sync point, never replayed
+    model = {"id": "b", "name": "Synthetic board"}
+    bodies = [json.dumps({"model": model, "action": a}).encode("utf-8") for a in reversed(actions)]
+
+    stub = TrelloStub({"b": before}, actions={"b": [seed_action]})
+    main.TRELLO_API = stub.base_url + "/1"
+    main.FETCH_STRATEGY = "nested"  # fetch_strategy.py compares strategies
+    main.SNAPSHOT_DIR = tempfile.mkdtemp(prefix="sora-live-")
+    main.TRELLO_BOARD_IDS = ["b"]  # callbacks for other boards are refused
+    try:
+        port = free_port()
+        main.start_webhook_receiver(f"127.0.0.1:{port}")
+        t0 = time.perf_counter()
+        main.get_live_board("b")  # initial seed (full fetch: there is no snapshot yet)
+        seed_seconds = time.perf_counter() - t0
+
+        seconds, statuses = replay(f"http://127.0.0.1:{port}/trello/b", bodies)
+        t0 = time.perf_counter()
+        chunks, _ = main.render_report(main.fetch_board_data("b"))
+        render_seconds = time.perf_counter() - t0
+
+        print(f"seed: {seed_seconds * 1000:.0f} ms (full fetch)")
+        print(f"{len(bodies)} events in {seconds:.2f} s ({len(bodies) / seconds:.0f} events/s), responses {statuses}")
+        print(f"catch-up: live state current {seconds:.2f} s after the first event; "
+              f"report rendered from it in {render_seconds * 1000:.0f} ms with no Trello fetch "
+              f"({stub.requests} Trello requests total)")
+        stub.set_board("b", after)  # compare with a full fetch, which projects away fields like desc
+        print("live state matches board:", main.live_boards["b"].lists_copy() == main.get_board_data("b"))
+        main.save_live_boards()
+        print("snapshot written:", os.path.exists(main.snapshot_path("b")))
+    finally:
+        stub.close()
+        main.webhook_receiver.shutdown()
+        shutil.rmtree(main.SNAPSHOT_DIR, ignore_errors=True)
@@ -1,10 +1,25 @@
 # main.py
 import os
-import requests
 import random
 import time
-from datetime import datetime, timedelta
+import json
+import re
+import codecs
+import hashlib
+import hmac
+import base64
+import zlib
+import io
+import marshal
+import atexit
+import heapq
+from contextlib import contextmanager
+import threading
+from urllib.parse import parse_qs, urlsplit
+from datetime import datetime, timedelta, timezone
 import sys
+# requests, asyncio, concurrent.futures, http.server, ipaddress, zipfile, uuid and email.utils are
+# imported where they are used, so a rest day never pays for loading them
 
 # -----------------------------
 # Configuration (env vars)
@@ -12,583 +27,2855 @@ import sys
 TRELLO_KEY = os.getenv("TRELLO_KEY")
 TRELLO_TOKEN = os.getenv("TRELLO_TOKEN")
 TRELLO_BOARD_ID = os.getenv("TRELLO_BOARD_ID")
+# Multi-board mode: comma-separated board IDs (takes precedence over TRELLO_BOARD_ID)
+TRELLO_BOARD_IDS = [b.strip() for b in os.getenv("TRELLO_BOARD_IDS", "").split(",") if b.strip()]
 WEBHOOK_URL = os.getenv("DISCORD_WEBHOOK")
+TRELLO_API = os.getenv("TRELLO_API_URL", "https://api.trello.com/1")
 
-# sanity check
-missing = [name for name, val in [
-    ("TRELLO_KEY", TRELLO_KEY),
-    ("TRELLO_TOKEN", TRELLO_TOKEN),
-    ("TRELLO_BOARD_ID", TRELLO_BOARD_ID),
-    ("DISCORD_WEBHOOK", WEBHOOK_URL),
-] if not val]
-if missing:
-    raise SystemExit(f"Missing environment variables: {', '.join(missing)}")
-
-BOARD_URL = (
-    f"https://api.trello.com/1/boards/{TRELLO_BOARD_ID}/lists"
-    f"?cards=open&card_fields=name,labels,desc&checklists=all&fields=name"
-    f"&key={TRELLO_KEY}&token={TRELLO_TOKEN}"
-)
+# Fan-out routing (SORA_ROUTES: JSON inline or a file path): {"<board id>": ["<webhook>", ...]},
+# with "*" for boards not listed. Boards may share a webhook (rolled up into one channel).
+ROUTES_SPEC = os.getenv("SORA_ROUTES", "")
+DISPATCH_LINGER = float(os.getenv("SORA_DISPATCH_LINGER", "0.2"))  # seconds a webhook waits to fill a batch
+DISCORD_MAX_FILES = 10  # attachments per message
+DISCORD_MAX_CONTENT = 2000  # characters per message
 
+def load_routes(spec):
+    """Parse SORA_ROUTES into {board id: [webhook, ...]}"""
+    if not spec:
+        return {}
+    try:
+        if spec.lstrip().startswith("{"):
+            routes = json.loads(spec)
+        else:
+            with open(spec, "r", encoding="utf-8") as f:
+                routes = json.load(f)
+    except (OSError, ValueError) as e:
+        raise SystemExit(f"Invalid SORA_ROUTES: {e}")
+    return {board: [hooks] if isinstance(hooks, str) else list(hooks) for board, hooks in routes.items()}
+
+ROUTES = load_routes(ROUTES_SPEC)
+if ROUTES and not TRELLO_BOARD_IDS and not TRELLO_BOARD_ID:
+    TRELLO_BOARD_IDS = [board for board in ROUTES if board != "*"]
+
+def check_config():
+    """Sanity check before a run (not at import, so the module can be loaded without credentials)"""
+    missing = [name for name, val in [
+        ("TRELLO_KEY", TRELLO_KEY),
+        ("TRELLO_TOKEN", TRELLO_TOKEN),
+        ("TRELLO_BOARD_ID", TRELLO_BOARD_IDS != [None]),
+        ("DISCORD_WEBHOOK", WEBHOOK_URL or ROUTES),
+    ] if not val]
+    if missing:
+        raise SystemExit(f"Missing environment variables: {', '.join(missing)}")
+
+if not TRELLO_BOARD_IDS:
+    TRELLO_BOARD_IDS = [TRELLO_BOARD_ID]
+
+# Field projection: only what the report renders (card names, label names, checklist and
+# item names, item state). Trello always adds the object IDs.
+CARD_FIELDS = os.getenv("SORA_CARD_FIELDS", "name,labels")
+if (os.getenv("SORA_DELTA_SYNC", "") == "1" or os.getenv("SORA_WEBHOOK_LISTEN")) and "pos" not in CARD_FIELDS.split(","):
+    CARD_FIELDS += ",pos"  # board snapshots place moved and reordered cards by position
+if os.getenv("SORA_RENDER_CACHE") and "dateLastActivity" not in CARD_FIELDS.split(","):
+    CARD_FIELDS += ",dateLastActivity"  # the render cache keys cards by it instead of hashing their checklists
+CHECKLIST_FIELDS = os.getenv("SORA_CHECKLIST_FIELDS", "name")
+CHECKITEM_FIELDS = os.getenv("SORA_CHECKITEM_FIELDS", "name,state")
+LABEL_FIELDS = os.getenv("SORA_LABEL_FIELDS", "name")
+
+# Fetch strategy: "nested" (one lists+cards+checklists call), "split" (the bulk lists, cards,
+# checklists and labels endpoints in parallel, joined by ID) or "auto" (per board, whichever
+# moved fewer bytes per card; the other one is re-measured every SORA_FETCH_REPROBE fetches).
+# The measurements are kept in the state DB with the run history.
+FETCH_STRATEGY = os.getenv("SORA_FETCH_STRATEGY", "auto")
+FETCH_REPROBE = int(os.getenv("SORA_FETCH_REPROBE", "20"))
+REQUEST_OVERHEAD_BYTES = 700  # status line + headers per request, both directions
+
+def board_url(board_id):
+    """Trello lists+cards+checklists URL for one board"""
+    return (
+        f"{TRELLO_API}/boards/{board_id}/lists"
+        f"?cards=open&card_fields={CARD_FIELDS}&checklists=all&checklist_fields={CHECKLIST_FIELDS}"
+        f"&checkItem_fields={CHECKITEM_FIELDS}&fields=name"
+        f"&key={TRELLO_KEY}&token={TRELLO_TOKEN}"
+    )
+
+def split_urls(board_id):
+    """Bulk endpoint URLs for the split fetch: lists, cards, checklists (with items) and labels"""
+    base = f"{TRELLO_API}/boards/{board_id}"
+    auth = f"key={TRELLO_KEY}&token={TRELLO_TOKEN}"
+    card_fields = [("idLabels" if f == "labels" else f) for f in CARD_FIELDS.split(",") if f != "pos"]
+    return {
+        "lists": f"{base}/lists?filter=open&fields=name&{auth}",
+        "cards": f"{base}/cards/open?fields={','.join(card_fields + ['idList', 'pos'])}&{auth}",
+        "checklists": (f"{base}/checklists?fields={CHECKLIST_FIELDS},idCard,pos"
+                       f"&checkItems=all&checkItem_fields={CHECKITEM_FIELDS}&{auth}"),
+        "labels": f"{base}/labels?fields={LABEL_FIELDS}&limit=1000&{auth}",
+    }
+
+BOARD_URL = board_url(TRELLO_BOARD_IDS[0])
+
+# Concurrent fetching: worker threads overall, and max in-flight requests per host
+FETCH_WORKERS = int(os.getenv("SORA_FETCH_WORKERS", "8"))
+HOST_CONCURRENCY = int(os.getenv("SORA_HOST_CONCURRENCY", "4"))
+
+# Run history: every run (rest days too) with counts, timings, delivery status and per-card
+# completion, in SQLite. last_run.txt is only read when the history has no delivered run yet.
+STATE_DB = os.getenv("SORA_STATE_DB", "sora_state.db")
 LAST_RUN_FILE = "last_run.txt"
 
-# -----------------------------
-# Dialogue lists (100 each)
-# (copy-paste-ready; text/kaomoji emoticons)
-# -----------------------------
-intros = [
- "I just peeked at your board and I’m so excited to share what I found! :-)",
- "Hi Alex — I had a little look at your board and I’ve got news! =)",
- "Good news! I checked your Trello and want to tell you about it :D",
- "Hey — I looked over your board and I’m here to cheer you on ;-)",
- "Hello! I took a peek at your Trello and I’m excited to report back ;)",
- "Hi there! I checked your board and I’m smiling about it :P",
- "Oh hi! I looked at your board and found bits to celebrate XP",
- "Hey Alex — I peeked at your board and noted some things :3",
- "Hello! I popped by your Trello and it looks interesting ^_^",
- "Hi! I checked your board and I’m pleasantly surprised ^-^",
- "Hello Alex — I took a peek and wanted to give you an update ^^",
- "Hiya! I scanned your board and I’m ready to share the details (^_^)",
- "Hey! I had a look at your board and I’m excited to tell you (^.^)",
- "Hi Alex! I browsed your board and I’m smiling about it (＾▽＾)",
- "Hello! I checked your Trello and I’m happy to share (⌒‿⌒)",
- "Hey Alex — Sora here, I glanced at your board and I’m excited (⌒▽⌒)",
- "Hello! I popped in to see your Trello and I’m all smiles (◕‿◕)",
- "Hi Alex! I checked your lists and I’ve got some friendly notes (◠‿◠)",
- "Hey — I looked at your board and noticed lovely things (≧◡≦)",
- "Hello Alex! I checked your projects and I’m feeling cheerful (≧ω≦)",
- "Hi! I peeked at your Trello and I’m full of happy energy (✧ω✧)",
- "Hey Alex — I had a look at your board and I’m being supportive (´｡• ᵕ •｡`)",
- "Hello! I viewed your board and I’m ready to give a warm update ʘ‿ʘ",
- "Hi Alex — I checked your Trello and I’m feeling motivated for you (•̀ᴗ•́)",
- "Hey! I popped by your board and I’m excited to help out (•̀ᴗ•́)و",
- "Hello Alex! I peeked at your tasks and I’m ready to cheer (•̀ω•́)",
- "Hi! I looked through your board and I’m ready to encourage you (ง'̀-'́)ง",
- "Hey Alex — I glanced at your Trello and I’m rooting for you (ง^‿^)ง",
- "Hello! I checked your lists and I’m here with support (☞ﾟヮﾟ)☞",
- "Hi Alex! I browsed your Trello and I’m sending warm thoughts (｡◕‿◕｡)",
- "Hey! I looked at your board and I’m here to celebrate (ღ˘⌣˘ღ)",
- "Hello Alex — I checked your board and I’m excited to share (＾ω＾)",
- "Hi! I peeked at your Trello and I’ve got encouraging words (✿◠‿◠)",
- "Hey Alex — I visited your board and I’m happily reporting ʕ•ᴥ•ʔ",
- "Hello! I checked your Trello and I’m grinning for you (ᵔᴥᵔ)",
- "Hi Alex — I looked at your board and I’m hoping to inspire (ಥ‿ಥ)",
- "Hey! I checked your Trello and I’m quietly proud of you (ಥ_ಥ)",
- "Hello Alex — I peeked at your lists and I’m pleasantly surprised (◕ᴗ◕✿)",
- "Hi! I viewed your Trello and I’m full of gentle cheer (｡♥‿♥｡)",
- "Hey Alex — I checked your board and I’m delighted to tell you (✿╹◡╹)",
- "Hello! I took a peek at your Trello and I’m smiling inside (ﾉ◕ヮ◕)ﾉ*:･ﾟ✧",
- "Hi Alex — I looked at your board and I’m excited to cheer (ﾉ◕‿◕)ﾉ",
- "Hey! I glanced at your Trello and I’m ready to encourage ٩(◕‿◕｡)۶",
- "Hello Alex — I checked your lists and I’m here to help (ヽ(•‿•)ノ)",
- "Hi! I took a look at your Trello and I’m excited to share (ヽ(*⌒∇⌒*)ﾉ)",
- "Hey Alex — I checked your board and I came with smiles (*^_^*)",
- "Hello! I looked at your Trello and I’m sending cheer ( ^_−)☆",
- "Hi Alex — I peeked at your tasks and I’m feeling upbeat (~‾▿‾)~",
- "Hey! I glanced at your Trello and I’m sending support (o^^)o",
- "Hello Alex — I checked your board and it warmed my heart (⌒▽⌒)☆",
- "Hi! I looked at your Trello and I’m excited for you (*≧ω≦)",
- "Hey Alex — I took a peek and I’ve got good vibes for you (ﾉ´ヮ`)ﾉ",
- "Hello! I peeked at your board and I’m smiling to share (*´꒳`*)",
- "Hi Alex — I checked your Trello and I’m full of cheer (=^_^=)",
- "Hey! I looked at your lists and I’m happy to report (^з^)-☆",
- "Hello Alex — I peeked at your projects and I’m excited (≧︶≦))",
- "Hi! I checked your Trello and I’ve got supportive words (^o^)/",
- "Hey Alex — I looked at your board and I’m glowing (＾◡＾)",
- "Hello! I peeked at your Trello and I couldn’t help but smile (￣▽￣)ノ",
- "Hi Alex — I checked your board and I’m cheering you on (°∀°)b",
- "Hey! I took a look at your Trello and I’m feeling lively (o^_^o)",
- "Hello Alex — I checked your board and I’m all encouragement (´ ▽｀)",
- "Hi! I peeked at your Trello and I’m sending a little pep (｀・ω・´)",
- "Hey Alex — I looked at your board and I’m quietly enthusiastic (︶ω︶)",
- "Hello! I checked your Trello and I’ve got warm words (✪ω✪)",
- "Hi Alex — I peeked at your lists and I’m happy to report (＾_＾;)",
- "Hey! I scanned your Trello and I’ve got a friendly update (´∇｀)",
- "Hello Alex — I looked at your board and I’m here for you (¬‿¬)",
- "Hi! I peeked at your Trello and I’m sending a little pep (°◡°♡)",
- "Hey Alex — I checked your lists and I’m smiling quietly (⌒_⌒;)",
- "Hello! I peeked at your Trello and I’ve got warm support (•◡•)/",
- "Hi Alex — I checked your board and I’m excited to tell you (´• ω •`)",
- "Hey! I glanced at your Trello and I’m cheerful for you (ﾉ◕ヮ◕)ﾉﾞ",
- "Hello Alex — I took a look at your board and I’m bubbling with cheer (ﾉ^_^)ﾉ",
- "Hi! I peeked at your board and I’m sending positive vibes ٩(＾◡＾)۶",
- "Hey Alex — I checked your Trello and I’m quietly proud (≧◡≦)/",
- "Hello! I looked at your board and I’m really glad to share (*ﾟ▽ﾟ*)",
- "Hi Alex — I peeked at your tasks and I’m hopeful for you (^人^)",
- "Hey! I checked your Trello and I’m glowing with encouragement (^_^)/~~",
- "Hello Alex — I glanced at your board and I’m ready to cheer (･_･ )",
- "Hi! I peered at your Trello and I’m sending a warm nudge (＾▽＾)V",
- "Hey Alex — I checked your board and I’m smiling inside (￣▽￣)",
- "Hello! I peeked at your Trello and I’m gently excited (°ロ°)☝",
- "Hi Alex — I checked your board and I’m happy to help (•ω•)",
- "Hey! I looked at your Trello and I’m pleasantly surprised (つ✧ω✧)つ",
- "Hello Alex — I peeked at your board and I’ve got nice things to say ( ´ ▽ ` )ﾉ",
- "Hi! I checked your Trello and I’m sending a supportive hug (づ｡◕‿‿◕｡)づ",
- "Hey Alex — I glanced through your lists and I’m encouraged (っ˘ω˘ς )",
- "Hello! I took a look at your Trello and I’m positively smiling (っ◔◡◔)っ",
- "Hi Alex — I skimmed your board and I’m here to cheer you on (❤ω❤)",
- "Hey! I peeked at your Trello and I’m brimming with support (*＾ω＾)人(＾ω＾*)",
- "Hello Alex — I checked your lists and I’m feeling glad (●´ω｀●)",
- "Hi! I popped by your Trello and I’m happy to report (＾▽＾)っ",
- "Hey Alex — I took a look and I’m rooting for you (¬_¬)",
- "Hello! I peeked at your board and I’ve got friendly news (￣︶￣)"
-]
+# Durable outbox (SORA_OUTBOX=1): each rendered report is stored in the state DB before it is
+# sent, with per-message progress, so a failed delivery is finished by the next run (no new
+# roll, no Trello fetch). Reports that keep failing or grow too old are given up.
+OUTBOX = os.getenv("SORA_OUTBOX", "") == "1"
+OUTBOX_MAX_ATTEMPTS = int(os.getenv("SORA_OUTBOX_MAX_ATTEMPTS", "5"))  # failed sends per webhook
+OUTBOX_MAX_AGE_HOURS = float(os.getenv("SORA_OUTBOX_MAX_AGE_HOURS", "48"))
 
-encouragements_done = [
- "Wow Alex, amazing progress — that’s brilliant! :-D",
- "Incredible work, Alex — you’re doing so well =D",
- "I’m so proud of you — keep shining! ;D",
- "Fantastic job, Alex — that’s worth celebrating ;)",
- "Beautiful progress — you’re on fire :P",
- "You crushed it — awesome job XP",
- "Absolutely lovely — well done :3",
- "So proud — your effort shows ^_^",
- "Terrific work — truly inspiring ^-^",
- "Stunning progress — keep it up ^^",
- "Exceptional — you really nailed it (^_^)",
- "Brilliant, Alex! Keep going (^.^)",
- "So impressive — you’re doing great (＾▽＾)",
- "Beautifully done — you make me smile (⌒‿⌒)",
- "Outstanding work — I’m so happy for you (⌒▽⌒)",
- "Great job — you deserve a pat on the back (◕‿◕)",
- "You’re amazing — terrific progress (◠‿◠)",
- "So good to see — your dedication shows (≧◡≦)",
- "Way to go — proud of you (≧ω≦)",
- "You’re on a roll — keep going (✧ω✧)",
- "Amazing effort — that really matters (´｡• ᵕ •｡`)",
- "That’s wonderful — I’m cheering for you ʘ‿ʘ",
- "Bravissimo — keep shining (•̀ᴗ•́)",
- "You did it — I’m celebrating with you (•̀ᴗ•́)و",
- "That’s a win — brilliant work (•̀ω•́)",
- "Nicely done — you’ve earned a smile (ง'̀-'́)ง",
- "Spectacular — you make progress look easy (ง^‿^)ง",
- "Amazing, Alex — keep the momentum (☞ﾟヮﾟ)☞",
- "Absolutely lovely — I’m beaming for you (｡◕‿◕｡)",
- "Wonderful job — you’re so capable (ღ˘⌣˘ღ)",
- "So proud — rock on (＾ω＾)",
- "Fantastic — you’re doing beautifully (✿◠‿◠)",
- "Great news — your effort is paying off ʕ•ᴥ•ʔ",
- "Incredible — very well done (ᵔᴥᵔ)",
- "Nice! That’s progress — keep going (ಥ‿ಥ)",
- "Blessings — you did a great job (ಥ_ಥ)",
- "Superb work — keep it steady (◕ᴗ◕✿)",
- "You did amazing — I’m proud (｡♥‿♥｡)",
- "Yes! That’s brilliant — well done (✿╹◡╹)",
- "Wonderful — that’s worth celebrating (ﾉ◕ヮ◕)ﾉ*:･ﾟ✧",
- "You’re terrific — the results show (ﾉ◕‿◕)ﾉ",
- "Beautiful — you’re moving forward ٩(◕‿◕｡)۶",
- "Spectacular! Keep it up ヽ(•‿•)ノ",
- "That’s gorgeous progress — I adore it ヽ(*⌒∇⌒*)ﾉ",
- "So proud — your work shines (*^_^*)",
- "Excellent — perfect pace (^_−)☆",
- "Beautifully handled — bravo (~‾▿‾)~",
- "That’s so good — I’m cheering (o^^)o",
- "Hooray — that’s a lovely result (⌒▽⌒)☆",
- "Amazing job — keep the momentum (*≧ω≦)",
- "Thumbs up — you did great (ﾉ´ヮ`)ﾉ",
- "You’re doing splendidly — so happy (*´꒳`*)",
- "Wonderful — you finished this one (=^_^=)",
- "Yes! That’s so satisfying (^з^)-☆",
- "Top-notch work — outstanding (≧︶≦))",
- "Brilliant — you make me proud (^o^)/",
- "Incredible — on to the next (＾◡＾)",
- "Outstanding — you nailed it (￣▽￣)ノ",
- "So impressive — you shine (°∀°)b",
- "Beautiful — incredible effort (o^_^o)",
- "Marvelous — you’re doing so well (´ ▽｀)",
- "Wonderful — brilliant job (｀・ω・´)",
- "Awesome! Keep it up (︶ω︶)",
- "That’s lovely — keep going (✪ω✪)",
- "Amazing energy — so proud (＾_＾;)",
- "You did wonderfully — well done (´∇｀)",
- "You’re shining — keep pushing (¬‿¬)",
- "Stellar job — I’m impressed (°◡°♡)",
- "Terrific — you’re making me smile (⌒_⌒;)",
- "Fantastic — totally great (•◡•)/",
- "Beautiful finish — well done (´• ω •`)",
- "So happy — you finished it (ﾉ◕ヮ◕)ﾉﾞ",
- "Amazing — that’s real progress (ﾉ^_^)ﾉ",
- "You did it — bravo ٩(＾◡＾)۶",
- "Lovely result — keep going (≧◡≦)/",
- "Admirable — I adore this (*ﾟ▽ﾟ*)",
- "So proud — you’ve come far (^人^)",
- "Nice job — that’s wonderful (^_^)/~~",
- "That’s perfect — you did it (･_･ )",
- "Bravo — keep the good work (＾▽＾)V",
- "Fabulous — excellent outcome (￣▽￣)",
- "Wonderful — lovely job (°ロ°)☝",
- "You rocked it — great job (•ω•)",
- "That’s superb — I’m beaming (つ✧ω✧)つ",
- "So proud — well done ( ´ ▽ ` )ﾉ",
- "Amazing — I’m truly impressed (づ｡◕‿‿◕｡)づ",
- "Wonderful — you’re a star (っ˘ω˘ς )",
- "Brilliant — you deserve praise (っ◔◡◔)っ",
- "So great — keep the momentum (❤ω❤)",
- "Lovely — you did that so well (*＾ω＾)人(＾ω＾*)",
- "Exciting — that’s real progress (●´ω｀●)",
- "Beautiful — you finished strong (＾▽＾)っ",
- "Amazing — I love this (¬_¬)",
- "Stunning — excellent work (￣︶￣)"
-]
+# Dialogue phrase pack: phrases/<persona>_<lang>.json
+PERSONA = os.getenv("SORA_PERSONA", "sora")
+LANGUAGE = os.getenv("SORA_LANG", "en")
+PHRASES_DIR = os.getenv("SORA_PHRASES_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), "phrases"))
 
-encouragements_none = [
- "Hmm… it looks a bit quiet on progress today. Don’t worry — you’ve got this :)",
- "It’s okay if nothing moved today. Small steps tomorrow! :D",
- "No rush — we’ll make progress soon =)",
- "Don’t be hard on yourself — we can start small ;)",
- "It’s okay to rest — then tackle it again :P",
- "Sometimes no progress is prep — you’ll do great XP",
- "No worries — a fresh start tomorrow :3",
- "Take your time — we’ll try again ^_^",
- "No pressure — little by little ^-^",
- "It’s fine — every day is a chance ^^",
- "No stress — you’ll get there (^_^)",
- "It’s okay — tomorrow is another day (^.^)",
- "Rest is progress too (＾▽＾)",
- "Take a breath — we’ll try again (⌒‿⌒)",
- "No rush — steady wins (⌒▽⌒)",
- "All good — small things add up (◕‿◕)",
- "No worries — I believe in you (◠‿◠)",
- "It’s okay — we’ll make steps soon (≧◡≦)",
- "No pressure — gentle nudges help (≧ω≦)",
- "It’s fine — keep your head up (✧ω✧)",
- "Don’t worry — tomorrow is bright (´｡• ᵕ •｡`)",
- "It’s okay — we’ll start small ʘ‿ʘ",
- "Take it easy — you’ve got this (•̀ᴗ•́)",
- "We’ll try again tomorrow — no stress (•̀ᴗ•́)و",
- "It’s ok to pause — come back stronger (•̀ω•́)",
- "No pressure — baby steps are fine (ง'̀-'́)ง",
- "It’s alright — we’ll get moving soon (ง^‿^)ง",
- "No bother — rest up and try later (☞ﾟヮﾟ)☞",
- "It’s okay — even rest fuels progress (｡◕‿◕｡)",
- "Take care — tomorrow is new (ღ˘⌣˘ღ)",
- "It’s fine — recharge then go (＾ω＾)",
- "No rush — one step at a time (✿◠‿◠)",
- "Rest is important — we’ll do this soon ʕ•ᴥ•ʔ",
- "No worries — start small tomorrow (ᵔᴥᵔ)",
- "It’s okay — a short pause helps (ಥ‿ಥ)",
- "Rest today, progress tomorrow (ಥ_ಥ)",
- "Take it slow — I’m here for you (◕ᴗ◕✿)",
- "No pressure — small wins count (｡♥‿♥｡)",
- "It’s fine — breathe and reset (✿╹◡╹)",
- "No worries — we’ll get to it (ﾉ◕ヮ◕)ﾉ*:･ﾟ✧",
- "It’s okay — gentle steps work (ﾉ◕‿◕)ﾉ",
- "No hurry — you’re still doing fine ٩(◕‿◕｡)۶",
- "Take your time — I believe in you ヽ(•‿•)ノ",
- "It’s okay — rest is progress ヽ(*⌒∇⌒*)ﾉ",
- "No problem — small steps tomorrow (*^_^*)",
- "It’s fine — we’ll try again later ( ^_−)☆",
- "Rest up — then we’ll tackle it (~‾▿‾)~",
- "No stress — tomorrow is fresh (o^^)o",
- "It’s okay — be kind to yourself (⌒▽⌒)☆",
- "Rest a bit — you’ll do fine (*≧ω≦)",
- "It’s all good — slow progress is fine (ﾉ´ヮ`)ﾉ",
- "Take it easy — I’m cheering ( *´꒳`*)",
- "No hurry — we’ll get there (=^_^=)",
- "It’s okay — small steps are progress (^з^)-☆",
- "Rest today — come back refreshed (≧︶≦))",
- "It’s fine — tomorrow is another chance (^o^)/",
- "Take a breather — I believe in you (＾◡＾)",
- "No pressure — take the pace you need (￣▽￣)ノ",
- "It’s okay — you’re still moving forward (°∀°)b",
- "Rest when needed — we’ll continue (o^_^o)",
- "No worries — approach gently (´ ▽｀)",
- "It’s okay — take care of yourself (｀・ω・´)",
- "No problem — we’ll make progress later (︶ω︶)",
- "Rest is okay — we’ll try again (✪ω✪)",
- "It’s fine — you’re allowed to pause (＾_＾;)",
- "No hurry — we’ll try again soon (´∇｀)",
- "It’s okay — small rest helps (¬‿¬)",
- "Take it slow — you have my support (°◡°♡)",
- "No rush — healing and rest matter (⌒_⌒;)",
- "It’s fine — I’m here, whenever you’re ready (•◡•)/",
- "Take care — you’ll find the drive again (´• ω •`)",
- "It’s okay — tomorrow may be better (ﾉ◕ヮ◕)ﾉﾞ",
- "Rest a bit — little steps tomorrow (ﾉ^_^)ﾉ",
- "It’s okay — a pause can spark momentum ٩(＾◡＾)۶",
- "No pressure — take your time (≧◡≦)/",
- "It’s fine — be gentle with yourself (*ﾟ▽ﾟ*)",
- "No worries — one day at a time (^人^)",
- "Take a break — you’ve earned it (^_^)/~~",
- "It’s okay — reset and restart (･_･ )",
- "Be kind to yourself — progress will come (＾▽＾)V",
- "No stress — tomorrow we try again (￣▽￣)",
- "It’s okay — every rest helps (°ロ°)☝",
- "Take care — I’m patient with you (•ω•)",
- "No rush — I’ll wait and cheer you on (つ✧ω✧)つ",
- "It’s fine — you’re still doing your best ( ´ ▽ ` )ﾉ",
- "Rest now — we’ll pick up later (づ｡◕‿‿◕｡)づ",
- "It’s okay — small and steady wins (っ˘ω˘ς )",
- "Take time — you are allowed to breathe (っ◔◡◔)っ",
- "No hurry — progress in your own time (❤ω❤)",
- "It’s okay — I trust your pace (*＾ω＾)人(＾ω＾*)",
- "Take a pause — then we’ll try (●´ω｀●)",
- "It’s fine — we’ll continue when you’re ready (＾▽＾)っ",
- "No pressure — you matter most (¬_¬)",
- "Rest kindly — come back refreshed (￣︶￣)"
-]
+# Run policy: chance to report = base + ramp per day since the last report, capped;
+# a report that goes out is delayed by a random 0-4 hours
+BASE_CHANCE = 0.2
+DAILY_RAMP = 0.15
+MAX_CHANCE = 0.9
+MAX_DELAY_SECONDS = 4 * 3600
+
+# Daemon mode (SORA_DAEMON=1): one long-running process scheduling every board
+DAEMON = os.getenv("SORA_DAEMON", "") == "1"
+DAEMON_STATE_FILE = os.getenv("SORA_DAEMON_STATE", "daemon_state.json")
+DAEMON_DECIDE_AT = os.getenv("SORA_DAEMON_DECIDE_AT", "12:00")  # local time of the daily roll
+DAEMON_WORKERS = int(os.getenv("SORA_DAEMON_WORKERS", "4"))  # reports running at once
+DAEMON_SAVE_SECONDS = float(os.getenv("SORA_DAEMON_SAVE_SECONDS", "5"))  # state changes are written at most this often
+
+# Streaming fetch: parse the board list by list instead of r.json() on the whole payload
+STREAM_FETCH = os.getenv("SORA_STREAM_FETCH", "") == "1"
+STREAM_CHUNK_SIZE = int(os.getenv("SORA_STREAM_CHUNK_SIZE", "65536"))
+
+# Transport: retries with jittered exponential backoff, and per-route request rates
+HTTP_RETRIES = int(os.getenv("SORA_HTTP_RETRIES", "5"))
+HTTP_BACKOFF_BASE = float(os.getenv("SORA_HTTP_BACKOFF_BASE", "1.0"))  # seconds
+HTTP_BACKOFF_CAP = float(os.getenv("SORA_HTTP_BACKOFF_CAP", "60"))
+HTTP_TIMEOUT = float(os.getenv("SORA_HTTP_TIMEOUT", "60"))
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+# requests per second and burst size, by host (Trello: 100 req / 10 s per token, shared by
+# every path; Discord webhooks: 5 req / 2 s per route); unknown hosts use the default
+ROUTE_RATES = {
+    "api.trello.com": (10.0, 10),
+    "discord.com": (2.5, 5),
+    "discordapp.com": (2.5, 5),
+}
+DEFAULT_ROUTE_RATE = (10.0, 10)
+
+# Webhook receiver (SORA_WEBHOOK_LISTEN=host:port): Trello pushes board changes, reports
+# render from the live in-memory state. Register the callback as <base URL>/trello/<board id>.
+WEBHOOK_LISTEN = os.getenv("SORA_WEBHOOK_LISTEN", "")
+TRELLO_WEBHOOK_SECRET = os.getenv("TRELLO_WEBHOOK_SECRET", "")  # Trello app secret: verify signatures (required off loopback)
+WEBHOOK_CALLBACK_URL = os.getenv("SORA_WEBHOOK_CALLBACK_URL", "").rstrip("/")  # public base URL
+WEBHOOK_SNAPSHOT_SECONDS = float(os.getenv("SORA_WEBHOOK_SNAPSHOT_SECONDS", "60"))
+
+# Record mode (SORA_RECORD_DIR): every Trello and Discord exchange is saved there as a fixture
+# (credentials redacted) for the local replay stand-ins, see bench/replay.py
+RECORD_DIR = os.getenv("SORA_RECORD_DIR", "")
 
-endings = [
- "Here’s the full board so you can see everything and plan your next steps! (^-^)",
- "I’ve attached the full board below — ready for you to conquer it! (=^.^=)",
- "Take a look at the full board, Alex! Let’s keep moving forward! (＾ω＾)",
- "The full board is below — take your time and decide what to do next (^_−)☆",
- "I saved the full board for you — check it out when you’re ready (^-^*)",
- "Full report is attached — I believe in you! (^o^)",
- "See the full board below — we’ll tackle it together soon (^_^)/",
- "Full board is attached — you’ve got this! (￣︶￣)",
- "I left the full details in the file — take it slow and steady (･_･ )",
- "Full report is below — plan your next steps with love (*^_^*)",
- "I attached the board — enjoy reviewing it (＾▽＾)っ",
- "Full board’s attached — feel proud, Alex (´ ▽｀)",
- "I included the full details — you can do this (｀・ω・´)",
- "The board is attached — let’s keep moving forward (•◡•)/",
- "I’ve added the full board — take a peek when you can (｡◕‿◕｡)",
- "Full details are attached — breathe and decide (✿◠‿◠)",
- "I attached the full board — you’re not alone (ღ˘⌣˘ღ)",
- "Find full report attached — I’m cheering for you (´｡• ᵕ •｡`)",
- "Full board below — take a break, then tackle it (≧◡≦)",
- "I included everything in the file — plan at your pace (・_・)",
- "Full report is attached — you’re doing great (⌒‿⌒)",
- "I saved the full board for you — go through it gently (＾_＾)",
- "Full board attached — small steps win races (ﾉ◕ヮ◕)ﾉ",
- "See the full board — take the next tiny step (ﾉ´ヮ`)ﾉ",
- "Full report included — you’ve got my support (✧ω✧)",
- "I attached the board — check it whenever you’re ready (•̀ᴗ•́)",
- "Full details below — go at your own pace (•̀ω•́)",
- "I included the full report — you’ll do great (ง'̀-'́)ง",
- "Full board is attached — let’s make a plan soon (ง^‿^)ง",
- "I added the full board — review when calm (☞ﾟヮﾟ)☞",
- "Full report is below — you’re already doing well (｡◕‿◕｡)",
- "I attached the board — take your time with it (ღ˘⌣˘ღ)",
- "Full details included — make small steps (＾ω＾)",
- "I added the entire board — keep being awesome (✿╹◡╹)",
- "Full board attached — you’re stronger than you think (｡♥‿♥｡)",
- "I included the full file — take your next move (´∇｀)",
- "Full report is here — you got this, Alex (ﾉ◕‿◕)ﾉﾞ",
- "I attached everything — plan your next tiny win (ﾉ^_^)ﾉ",
- "Full board included — I’m rooting for you ٩(＾◡＾)۶",
- "File attached — go gently and succeed (≧◡≦)/",
- "Full report below — think small and act (●´ω｀●)",
- "I added the full board — look when you’re ready (っ˘ω˘ς )",
- "Full details attached — choose one small thing (っ◔◡◔)っ",
- "I included the board — take a deep breath first (＾▽＾)",
- "File attached — then we’ll tackle it (☆^_^)",
- "Full report is attached — plan with care (°◡°)",
- "I added the board — hope it helps you decide (¬_¬)",
- "Full file below — go at your pace (￣︶￣)",
- "I attached the full board — time to shine when ready (•‿•)",
- "Full report included — you know what to do next (＾_＾)",
- "I saved the full board — check it and act (^-^*)",
- "Full report attached — small steps, big wins (≧ω≦)",
- "I included everything — make a tiny plan (´｡• ᵕ •｡`)",
- "Full board attached — cheerfully yours (✿◠‿◠)",
- "I added the details — you can handle this (ღ˘⌣˘ღ)",
- "File attached — review and tackle one item (◕ᴗ◕✿)",
- "Full report below — you’re not alone (｡◕‿◕｡)",
- "I attached the board — go for it when ready (ﾉ◕ヮ◕)ﾉ*:･ﾟ✧",
- "Full file attached — I believe in you (´∇｀)",
- "I saved your board — take a look and breathe (≧◡≦)",
- "Full report included — choose a tiny win (＾▽＾)っ",
- "I attached the board — you’ve got my support (❤ω❤)",
- "Full details below — plan one step (●´ω｀●)",
- "I included the board — you can do it (＾◡＾)",
- "Full file attached — I’m cheering (•‿•)",
- "I added the board — take one small action (^-^)",
- "Full report below — I’m here for you (＾ω＾)",
- "I attached everything — ready when you are (=^.^=)",
- "Full board is included — keep going gently (＾_＾)",
- "I added the full file — time for a tiny step (´• ω •`)",
- "Full report attached — you can accomplish this (●^o^●)",
- "I included the board — check and pick one task (°∀°)b",
- "Full file attached — you’re doing fine (^-^*)",
- "I saved the board — review and act (＾▽＾)V",
- "Full report included — focus on one thing (￣▽￣)",
- "I attached the full board — go slowly and win (･_･ )",
- "Full report below — you’ve got this, Alex (＾▽＾)",
- "I included the file — take your next step (￣︶￣)",
- "Full board attached — I’ll cheer you on (っ˘ω˘ς )",
- "I added the details — pick one and start (っ◔◡◔)っ",
- "Full report included — small step success (❤ω❤)",
- "I attached everything — time to shine (●´ω｀●)",
- "Full file below — choose a gentle goal (＾◡＾)",
- "I included the board — planning helps (＾_＾)",
- "Full report attached — go at your own pace (¬_¬)",
- "I saved the board — you have my support (≧◡≦)",
- "Full details included — tackle one small task (•‿•)",
- "I attached the board — make a gentle step (^-^)",
- "Full report below — I’m proud of you already (＾▽＾)",
- "I included the file — you can do it in pieces (￣︶￣)",
- "Full board attached — take a deep breath and choose (⋆‿⋆)",
- "I added the report — your next step awaits (♪^∇^)"
+# Conditional-request cache for board reads (disabled unless SORA_HTTP_CACHE_DIR is set)
+HTTP_CACHE_DIR = os.getenv("SORA_HTTP_CACHE_DIR", "")
+HTTP_CACHE_TTL = int(os.getenv("SORA_HTTP_CACHE_TTL", str(7 * 24 * 3600)))  # seconds
+HTTP_CACHE_MAX_BYTES = int(float(os.getenv("SORA_HTTP_CACHE_MAX_MB", "200")) * 1024 * 1024)
+
+# Instrumentation: JSON log lines per phase, Prometheus textfile, optional profiler
+METRICS_LOG = os.getenv("SORA_METRICS_LOG", "") == "1"
+PROM_TEXTFILE = os.getenv("SORA_PROM_TEXTFILE", "")  # e.g. /var/lib/node_exporter/sora.prom
+PROFILE_MODE = os.getenv("SORA_PROFILE", "")  # "cprofile" or "tracemalloc"
+PROFILE_OUT = os.getenv("SORA_PROFILE_OUT", "")
+
+# Label keyword -> priority marker, checked in order (first keyword found in a label name wins).
+# Override with SORA_PRIORITY_LABELS="blocker=!!!,high=!!,..."
+DEFAULT_PRIORITY_LABELS = "high=!!,medium=!,low=.,urgent=!!!,done=✅"
+PRIORITY_LABELS = [
+    tuple(pair.split("=", 1)) for pair in
+    os.getenv("SORA_PRIORITY_LABELS", DEFAULT_PRIORITY_LABELS).split(",") if "=" in pair
 ]
+DEFAULT_PRIORITY_MARKER = ":"
+
+# Attachment delivery: Discord's upload limit, compression ("auto" compresses only when the
+# plain report does not fit), and how many parts may upload at once
+ATTACHMENT_LIMIT = int(float(os.getenv("SORA_ATTACHMENT_LIMIT_MB", "10")) * 1024 * 1024)
+REPORT_COMPRESSION = os.getenv("SORA_REPORT_COMPRESSION", "auto")  # auto, none, gzip or zip
+UPLOAD_WORKERS = int(os.getenv("SORA_UPLOAD_WORKERS", "3"))
+ATTACHMENT_MARGIN = 1024  # headroom for zip headers / multipart framing
+
+# Render cache: reuse each unchanged card's rendered block across runs (SORA_RENDER_CACHE=<path>),
+# and optionally list the cards that changed since the last report
+RENDER_CACHE_FILE = os.getenv("SORA_RENDER_CACHE", "")
+RENDER_CACHE_MAX_CARDS = int(os.getenv("SORA_RENDER_CACHE_MAX_CARDS", "50000"))
+
+# Parallel render (SORA_RENDER_WORKERS > 1): fetched boards are cut into shards of whole lists,
+# about SORA_RENDER_SHARD_ITEMS check items each, and formatted in a process pool
+RENDER_WORKERS = int(os.getenv("SORA_RENDER_WORKERS", "1"))
+RENDER_SHARD_ITEMS = int(os.getenv("SORA_RENDER_SHARD_ITEMS", "20000"))
+REPORT_CHANGES = os.getenv("SORA_REPORT_CHANGES", "") == "1"
+
+# Bounded report: at most SORA_REPORT_TOP_CARDS cards per list and SORA_REPORT_TOP_BOARD per board
+# (0 = no limit), the most important first: by priority label (SORA_REPORT_PRIORITY_ORDER, label
+# keywords from most to least important), then by how much is left to do. The rest of each list
+# is rolled up into counts.
+REPORT_TOP_CARDS = int(os.getenv("SORA_REPORT_TOP_CARDS", "0"))
+REPORT_TOP_BOARD = int(os.getenv("SORA_REPORT_TOP_BOARD", "0"))
+REPORT_PRIORITY_ORDER = [k.strip().lower() for k in os.getenv("SORA_REPORT_PRIORITY_ORDER", "urgent,high,medium,low")
+                         .split(",") if k.strip()]
+
+# Progress analytics (SORA_ANALYTICS=1, needs numpy: pip install -r requirements-analytics.txt):
+# check-item completions from the actions history as daily series, giving velocity, burndown
+# trend and a projected completion date
+ANALYTICS = os.getenv("SORA_ANALYTICS", "") == "1"
+ANALYTICS_DAYS = int(os.getenv("SORA_ANALYTICS_DAYS", "365"))  # history window
+ANALYTICS_WINDOW = int(os.getenv("SORA_ANALYTICS_WINDOW", "14"))  # days per velocity window
+ANALYTICS_MAX_PAGES = int(os.getenv("SORA_ANALYTICS_MAX_PAGES", "100"))  # 1000 actions per page
+
+# Report formats (SORA_REPORT_FORMATS, comma-separated): text, markdown, json, html. The first one
+# is the main attachment, the others ride along; all are written in one pass over the board.
+REPORT_FORMATS = [f.strip() for f in os.getenv("SORA_REPORT_FORMATS", "text").split(",") if f.strip()] or ["text"]
+
+# Optional debug copy of each uploaded report (the upload itself never touches disk)
+REPORT_DUMP_FILE = os.getenv("SORA_REPORT_DUMP", "")
+
+# Delta sync: keep a local snapshot per board and only replay Trello actions since the last sync
+DELTA_SYNC = os.getenv("SORA_DELTA_SYNC", "") == "1"
+SNAPSHOT_DIR = os.getenv("SORA_SNAPSHOT_DIR", "board_snapshots")
+ACTIONS_PAGE_LIMIT = 1000
+SNAPSHOT_FULL_SYNC_HOURS = float(os.getenv("SORA_SNAPSHOT_FULL_SYNC_HOURS", "168"))  # bounds any drift
+ACTION_FILTER = ",".join([
+    "createCard", "updateCard", "deleteCard", "moveCardToBoard", "moveCardFromBoard",
+    "copyCard", "convertToCardFromCheckItem", "emailCard",
+    "addChecklistToCard", "removeChecklistFromCard", "updateChecklist",
+    "createCheckItem", "updateCheckItem", "deleteCheckItem", "updateCheckItemStateOnCard",
+    "addLabelToCard", "removeLabelFromCard", "updateLabel", "deleteLabel",
+    "createList", "updateList", "moveListToBoard", "moveListFromBoard",
+])
+SNAPSHOT_ACTIONS = frozenset(ACTION_FILTER.split(","))
+
+# -----------------------------
+# Dialogue: phrase packs (phrases/<persona>_<lang>.json), loaded on first use
+# (intros, encouragements, endings, card notes, greetings and the summary template)
+# -----------------------------
+_phrases = None
+
+def load_phrases():
+    """Load the SORA_PERSONA / SORA_LANG phrase pack once"""
+    global _phrases
+    if _phrases is None:
+        path = os.path.join(PHRASES_DIR, f"{PERSONA}_{LANGUAGE}.json")
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                _phrases = json.load(f)
+        except OSError:
+            raise SystemExit(f"Missing phrase pack: {path}")
+    return _phrases
 
 # -----------------------------
 # Helper functions
 # -----------------------------
 def get_time_greeting():
     """Return time-aware greeting"""
+    greetings = load_phrases()["greetings"]
     now = datetime.now()
     hour = now.hour
     if 5 <= hour < 12:
-        return "Good morning, Alex! :)"
+        return greetings["morning"]
     elif 12 <= hour < 18:
-        return "Good afternoon, Alex! (≧▽≦)"
+        return greetings["afternoon"]
     elif 18 <= hour < 22:
-        return "Good evening, Alex! :]"
+        return greetings["evening"]
     else:
-        return "Good night, Alex! (•‿•)"
+        return greetings["night"]
 
-def get_board_data():
-    """Fetch lists + cards + checklists from Trello"""
-    r = requests.get(BOARD_URL)
+# -----------------------------
+# Instrumentation
+# -----------------------------
+metrics = {"phases": {}, "counts": {}, "http_status": {}}
+_metrics_lock = threading.Lock()
+_profiler = None
+
+def log_event(event, **fields):
+    """Print one structured JSON log line (only when SORA_METRICS_LOG=1)"""
+    if METRICS_LOG:
+        print(json.dumps({"ts": round(time.time(), 3), "event": event, **fields}, ensure_ascii=False), flush=True)
+
+def metric_count(name, n=1):
+    with _metrics_lock:
+        metrics["counts"][name] = metrics["counts"].get(name, 0) + n
+
+@contextmanager
+def phase(name, **labels):
+    """Time a phase of the run; repeated phases (multi-board, retries) accumulate"""
+    t0 = time.perf_counter()
+    status = "ok"
+    try:
+        yield
+    except BaseException:
+        status = "error"
+        raise
+    finally:
+        seconds = time.perf_counter() - t0
+        with _metrics_lock:
+            p = metrics["phases"].setdefault(name, {"seconds": 0.0, "count": 0, "errors": 0})
+            p["seconds"] += seconds
+            p["count"] += 1
+            p["errors"] += status == "error"
+        log_event("phase", phase=name, seconds=round(seconds, 6), status=status, **labels)
+
+_gc_frozen = 0
+_gc_lock = threading.Lock()
+
+@contextmanager
+def gc_frozen():
+    """Keep every object alive so far (the fetched board) out of garbage collection passes
+
+    A full collection during a render would otherwise walk every raw Trello dict
+    of the board. Nested and concurrent renders unfreeze when the last one ends.
+    """
+    global _gc_frozen
+    import gc
+    with _gc_lock:
+        if not _gc_frozen:
+            gc.freeze()
+        _gc_frozen += 1
+    try:
+        yield
+    finally:
+        with _gc_lock:
+            _gc_frozen -= 1
+            if not _gc_frozen:
+                gc.unfreeze()
+
+def decode_json(r):
+    """r.json() recorded as the decode phase, counting the response bytes"""
+    metric_count("bytes_in", len(r.content))
+    with phase("decode"):
+        return r.json()
+
+def start_profiler():
+    """Start cProfile or tracemalloc if SORA_PROFILE asks for it"""
+    global _profiler
+    if PROFILE_MODE == "cprofile":
+        import cProfile
+        _profiler = cProfile.Profile()
+        _profiler.enable()
+    elif PROFILE_MODE == "tracemalloc":
+        import tracemalloc
+        tracemalloc.start(25)
+        _profiler = tracemalloc
+
+def stop_profiler():
+    global _profiler
+    if _profiler is None:
+        return
+    if PROFILE_MODE == "cprofile":
+        _profiler.disable()
+        out = PROFILE_OUT or "sora_profile.prof"
+        _profiler.dump_stats(out)
+    else:
+        snapshot = _profiler.take_snapshot()
+        _, peak = _profiler.get_traced_memory()
+        _profiler.stop()
+        out = PROFILE_OUT or "sora_tracemalloc.txt"
+        with open(out, "w", encoding="utf-8") as f:
+            f.write(f"peak traced memory: {peak} bytes\n\n")
+            for stat in snapshot.statistics("traceback")[:25]:
+                f.write(f"{stat}\n")
+                f.writelines(f"    {line}\n" for line in stat.traceback.format())
+    _profiler = None
+    print(f"[Sora] Profile written to {out}")
+
+def write_prometheus_textfile(path, outcome):
+    """Write last-run metrics in the node_exporter textfile format (atomically)"""
+    out = [
+        "# HELP sora_run_timestamp_seconds When the last run finished",
+        "# TYPE sora_run_timestamp_seconds gauge",
+        f"sora_run_timestamp_seconds {time.time():.3f}",
+        "# HELP sora_run_outcome Outcome of the last run (1 for the matching outcome label)",
+        "# TYPE sora_run_outcome gauge",
+    ]
+    out += [f'sora_run_outcome{{outcome="{o}"}} {int(o == outcome)}' for o in ("skipped", "sent", "failed", "stopped")]
+    out += ["# HELP sora_phase_seconds Time spent per phase in the last run",
+            "# TYPE sora_phase_seconds gauge"]
+    out += [f'sora_phase_seconds{{phase="{name}"}} {p["seconds"]:.6f}' for name, p in metrics["phases"].items()]
+    out += ["# HELP sora_count Counters from the last run (bytes, cards, items, ...)",
+            "# TYPE sora_count gauge"]
+    out += [f'sora_count{{name="{name}"}} {value}' for name, value in metrics["counts"].items()]
+    out += ["# HELP sora_http_responses HTTP responses by status code in the last run",
+            "# TYPE sora_http_responses gauge"]
+    out += [f'sora_http_responses{{code="{code}"}} {n}' for code, n in metrics["http_status"].items()]
+    out += ["# HELP sora_transport Transport counters (requests, retries, rate limits) in the last run",
+            "# TYPE sora_transport gauge"]
+    out += [f'sora_transport{{name="{name}"}} {n}' for name, n in transport_stats.items()]
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        f.write("\n".join(out) + "\n")
+    os.replace(tmp, path)
+
+def finish_metrics(outcome):
+    """Emit the end-of-run summary: JSON log line, Prometheus textfile, profile dump"""
+    stop_profiler()
+    log_event("run", outcome=outcome, phases=metrics["phases"], counts=metrics["counts"],
+              http_status=metrics["http_status"], transport=transport_stats)
+    if PROM_TEXTFILE:
+        write_prometheus_textfile(PROM_TEXTFILE, outcome)
+
+# Shared HTTP session (keep-alive connection pool) and per-host request slots
+_session = None
+_session_lock = threading.Lock()
+_host_slots = {}
+
+def get_session():
+    """Return the process-wide requests.Session, sized for FETCH_WORKERS"""
+    global _session
+    import requests
+    with _session_lock:
+        if _session is None:
+            _session = requests.Session()
+            adapter = requests.adapters.HTTPAdapter(pool_connections=4, pool_maxsize=max(FETCH_WORKERS, HOST_CONCURRENCY))
+            _session.mount("https://", adapter)
+            _session.mount("http://", adapter)
+        return _session
+
+class TokenBucket:
+    """Thread-safe token bucket; acquire() blocks until a request may be sent"""
+
+    def __init__(self, rate, capacity):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        self.blocked_until = 0.0
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if now >= self.blocked_until and self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = max(self.blocked_until - now, (1 - self.tokens) / self.rate)
+            time.sleep(wait)
+
+    def block_for(self, seconds):
+        """Server said the route is exhausted: send nothing more for `seconds`"""
+        with self.lock:
+            self.blocked_until = max(self.blocked_until, time.monotonic() + seconds)
+            self.tokens = 0
+
+_route_buckets = {}
+transport_stats = {"requests": 0, "retries": 0, "rate_limited": 0, "server_errors": 0}
+
+def route_bucket(method, url):
+    """Token bucket for one route (method + host + path, query ignored)
+
+    Trello limits per token, not per path: requests carrying a token share one
+    bucket per host and token.
+    """
+    parts = urlsplit(url)
+    token = parse_qs(parts.query).get("token")
+    key = f"{parts.netloc} token {token[0]}" if token else f"{method} {parts.netloc}{parts.path}"
+    with _session_lock:
+        if key not in _route_buckets:
+            rate, burst = ROUTE_RATES.get(parts.hostname, DEFAULT_ROUTE_RATE)
+            _route_buckets[key] = TokenBucket(rate, burst)
+        return _route_buckets[key]
+
+def parse_retry_after(r):
+    """Seconds to wait according to Retry-After / X-RateLimit-* headers or Discord's JSON body"""
+    value = r.headers.get("Retry-After")
+    if value:
+        try:
+            return max(0.0, float(value))
+        except ValueError:
+            from email.utils import parsedate_to_datetime
+            try:
+                return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+            except (TypeError, ValueError):
+                pass
+    reset_after = r.headers.get("X-RateLimit-Reset-After")
+    if reset_after:
+        try:
+            return max(0.0, float(reset_after))
+        except ValueError:
+            pass
+    if r.status_code == 429 and "json" in r.headers.get("Content-Type", ""):
+        try:
+            return max(0.0, float(r.json().get("retry_after")))
+        except (ValueError, TypeError, AttributeError):
+            pass
+    return None
+
+def backoff_delay(attempt):
+    """Full-jitter exponential backoff"""
+    return random.uniform(0, min(HTTP_BACKOFF_CAP, HTTP_BACKOFF_BASE * (2 ** attempt)))
+
+def http_request(method, url, **kwargs):
+    """Send a request through the shared session, honouring rate limits and retrying transient errors
+
+    Retries connection errors, 429 and 5xx up to HTTP_RETRIES times. The final
+    response is returned as-is (callers still raise_for_status).
+    """
+    import requests
+    bucket = route_bucket(method, url)
+    kwargs.setdefault("timeout", HTTP_TIMEOUT)
+    attempt = 0
+    while True:
+        # rewind any file uploads / streamed bodies consumed by a previous attempt
+        for f in [*(kwargs.get("files") or {}).values(), kwargs.get("data")]:
+            if hasattr(f, "seek"):
+                f.seek(0)
+        bucket.acquire()
+        with _session_lock:
+            transport_stats["requests"] += 1
+        try:
+            r = get_session().request(method, url, **kwargs)
+        except (requests.ConnectionError, requests.Timeout):
+            if attempt >= HTTP_RETRIES:
+                raise
+            delay = backoff_delay(attempt)
+        else:
+            with _metrics_lock:
+                code = str(r.status_code)
+                metrics["http_status"][code] = metrics["http_status"].get(code, 0) + 1
+            # Discord announces an exhausted bucket before we hit it
+            if r.headers.get("X-RateLimit-Remaining") == "0":
+                reset_after = parse_retry_after(r)
+                if reset_after:
+                    bucket.block_for(reset_after)
+            if RECORD_DIR:
+                record_exchange(method, url, kwargs, r)
+            if r.status_code not in RETRY_STATUSES or attempt >= HTTP_RETRIES:
+                return r
+            retry_after = parse_retry_after(r)
+            with _session_lock:
+                transport_stats["rate_limited" if r.status_code == 429 else "server_errors"] += 1
+            if r.status_code == 429 and retry_after is not None:
+                bucket.block_for(retry_after)
+                delay = retry_after + random.uniform(0, HTTP_BACKOFF_BASE / 4)
+            else:
+                delay = max(retry_after or 0, backoff_delay(attempt))
+            r.close()
+        attempt += 1
+        with _session_lock:
+            transport_stats["retries"] += 1
+        time.sleep(delay)
+
+_record_lock = threading.Lock()
+
+def record_exchange(method, url, kwargs, r):
+    """Append one exchange to RECORD_DIR/exchanges.jsonl; bodies go to bodies/<sha1> (stored once)
+
+    Reads the whole response, so a streamed fetch is buffered while recording.
+    """
+    def store(body):
+        if not body:
+            return None
+        digest = hashlib.sha1(body).hexdigest()
+        path = os.path.join(RECORD_DIR, "bodies", digest)
+        if not os.path.exists(path):
+            with open(path + ".tmp", "wb") as f:
+                f.write(body)
+            os.replace(path + ".tmp", path)
+        return digest
+
+    body = kwargs.get("data")
+    if hasattr(body, "read"):
+        body.seek(0)
+        body = body.read()
+        kwargs["data"].seek(0)
+    elif kwargs.get("json") is not None:
+        body = json.dumps(kwargs["json"]).encode("utf-8")
+    headers = kwargs.get("headers") or {}
+    entry = {
+        "time": time.time(),
+        "method": method,
+        "url": redact(url),
+        "request": {"content_type": headers.get("Content-Type", "application/json" if kwargs.get("json") is not None else None),
+                    "if_none_match": headers.get("If-None-Match")},
+        "status": r.status_code,
+        "headers": {k: v for k, v in r.headers.items()
+                    if k.lower() in ("content-type", "etag", "last-modified", "retry-after") or k.lower().startswith("x-ratelimit-")},
+    }
+    with _record_lock:
+        os.makedirs(os.path.join(RECORD_DIR, "bodies"), exist_ok=True)
+        entry["request"]["body"] = store(body)
+        entry["body"] = store(r.content)
+        with open(os.path.join(RECORD_DIR, "exchanges.jsonl"), "a", encoding="utf-8") as f:
+            f.write(json.dumps(entry) + "\n")
+
+def host_slot(url):
+    """Semaphore limiting concurrent requests to the host of url"""
+    host = urlsplit(url).netloc
+    with _session_lock:
+        if host not in _host_slots:
+            _host_slots[host] = threading.BoundedSemaphore(HOST_CONCURRENCY)
+        return _host_slots[host]
+
+# -----------------------------
+# On-disk HTTP cache (ETag / Last-Modified revalidation)
+# -----------------------------
+cache_stats = {"hits": 0, "misses": 0, "stores": 0, "expired": 0, "evicted": 0}
+_cache_lock = threading.Lock()
+
+def _count(stat):
+    with _cache_lock:
+        cache_stats[stat] += 1
+
+def _cache_path(url):
+    return os.path.join(HTTP_CACHE_DIR, hashlib.sha256(url.encode("utf-8")).hexdigest() + ".json")
+
+def _load_cache_entry(path):
+    """Return a cache entry if present and within TTL; expired entries are deleted
+
+    An entry's freshness is its file's mtime: a 304 just touches the file.
+    """
+    try:
+        stored_at = os.stat(path).st_mtime
+        with open(path, "r", encoding="utf-8") as f:
+            entry = json.load(f)
+    except Exception:
+        return None
+    if time.time() - stored_at > HTTP_CACHE_TTL:
+        _count("expired")
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+        return None
+    return entry
+
+def _store_cache_entry(path, entry):
+    os.makedirs(HTTP_CACHE_DIR, exist_ok=True)
+    try:
+        old_size = os.stat(path).st_size
+    except OSError:
+        old_size = None
+    tmp = f"{path}.{threading.get_ident()}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(entry, f)
+    new_size = os.stat(tmp).st_size
+    os.replace(tmp, path)
+    _count("stores")
+    # only a new or grown entry can push the cache over its limit
+    if old_size is None or new_size > old_size:
+        _enforce_cache_size()
+
+def _touch_cache_entry(path):
+    """Mark an entry revalidated (fresh and recently used) without rewriting it"""
+    try:
+        os.utime(path)
+    except OSError:
+        pass
+
+def _enforce_cache_size():
+    """Delete least recently used entries until the cache fits HTTP_CACHE_MAX_BYTES"""
+    with _cache_lock:
+        entries = []
+        for name in os.listdir(HTTP_CACHE_DIR):
+            if name.endswith(".json"):
+                p = os.path.join(HTTP_CACHE_DIR, name)
+                try:
+                    st = os.stat(p)
+                except OSError:
+                    continue
+                entries.append((st.st_mtime, st.st_size, p))
+        total = sum(size for _, size, _ in entries)
+        for _, size, p in sorted(entries):
+            if total <= HTTP_CACHE_MAX_BYTES:
+                break
+            try:
+                os.remove(p)
+                total -= size
+                cache_stats["evicted"] += 1
+            except OSError:
+                pass
+
+def cached_get_json(url, sizes=None):
+    """GET url and return parsed JSON, revalidating a cached copy with a conditional request
+
+    With a `sizes` list the body's size in bytes is appended to it (a revalidated
+    copy counts what it cost when it was fetched).
+    """
+    if not HTTP_CACHE_DIR:
+        with phase("fetch"):
+            r = http_request("GET", url)
+            r.raise_for_status()
+        if sizes is not None:
+            sizes.append(len(r.content))
+        return decode_json(r)
+
+    path = _cache_path(url)
+    entry = _load_cache_entry(path)
+    headers = {}
+    if entry:
+        if entry.get("etag"):
+            headers["If-None-Match"] = entry["etag"]
+        if entry.get("last_modified"):
+            headers["If-Modified-Since"] = entry["last_modified"]
+
+    with phase("fetch"):
+        r = http_request("GET", url, headers=headers)
+    if r.status_code == 304 and entry:
+        _count("hits")
+        _touch_cache_entry(path)
+        if sizes is not None:
+            sizes.append(entry.get("size", 0))
+        return entry["data"]
     r.raise_for_status()
-    return r.json()
+    _count("misses")
+    if sizes is not None:
+        sizes.append(len(r.content))
+    data = decode_json(r)
+    etag, last_modified = r.headers.get("ETag"), r.headers.get("Last-Modified")
+    if etag or last_modified:
+        _store_cache_entry(path, {"etag": etag, "last_modified": last_modified, "size": len(r.content),
+                                  "data": data})
+    return data
+
+def print_cache_stats():
+    if HTTP_CACHE_DIR:
+        print("[Sora] HTTP cache:", ", ".join(f"{k}={v}" for k, v in cache_stats.items()))
+
+def get_board_data(board_id=None):
+    """Fetch lists + cards + checklists from Trello"""
+    strategy = choose_fetch_strategy(board_id or TRELLO_BOARD_IDS[0])
+    sizes = [] if FETCH_STRATEGY == "auto" else None  # response bytes, as read off the wire
+    if strategy == "split":
+        data = join_board_parts(**get_board_parts(board_id or TRELLO_BOARD_IDS[0], sizes))
+    else:
+        url = board_url(board_id) if board_id else BOARD_URL
+        with host_slot(url):
+            data = cached_get_json(url, sizes)
+    if sizes is not None:
+        record_fetch_size(board_id or TRELLO_BOARD_IDS[0], strategy, sum(sizes) + len(sizes) * REQUEST_OVERHEAD_BYTES,
+                          sum(len(lst.get("cards", [])) for lst in data))
+    return data
+
+def _get_json(url, sizes=None):
+    with host_slot(url):
+        return cached_get_json(url, sizes)
+
+def get_board_parts(board_id, sizes=None):
+    """GET the split endpoints in parallel; returns {"lists": ..., "cards": ..., "checklists": ..., "labels": ...}"""
+    from concurrent.futures import ThreadPoolExecutor
+    urls = split_urls(board_id)
+    with ThreadPoolExecutor(max_workers=len(urls)) as pool:
+        futures = {part: pool.submit(_get_json, url, sizes) for part, url in urls.items()}
+        return {part: fut.result() for part, fut in futures.items()}
+
+def join_board_parts(lists, cards, checklists, labels):
+    """Rebuild the nested lists -> cards -> checklists shape from the split endpoints, by ID and position"""
+    labels_by_id = {lb["id"]: lb for lb in labels}
+    card_checklists = {}
+    for cl in sorted(checklists, key=lambda cl: cl.get("pos", 0)):
+        cl.pop("pos", None)
+        card_checklists.setdefault(cl.pop("idCard", None), []).append(cl)
+    list_cards = {lst["id"]: [] for lst in lists}
+    keep_pos = "pos" in CARD_FIELDS.split(",")
+    for card in sorted(cards, key=lambda card: card.get("pos", 0)):
+        if not keep_pos:
+            card.pop("pos", None)
+        dest = list_cards.get(card.pop("idList", None))
+        if dest is None:
+            continue  # card on an archived list
+        if "idLabels" in card:
+            card["labels"] = [labels_by_id[i] for i in card.pop("idLabels") if i in labels_by_id]
+        card["checklists"] = card_checklists.get(card["id"], [])
+        dest.append(card)
+    for lst in lists:
+        lst["cards"] = list_cards[lst["id"]]
+    return lists
+
+# -----------------------------
+# Fetch strategy choice: bytes per card measured for each strategy, per board
+# -----------------------------
+def load_fetch_stats(board_id):
+    """{strategy: {"bytes", "cards"}, "fetches": total} measured for one board"""
+    stats = {}
+    try:
+        conn = connect_state_db()
+        try:
+            for strategy, size, cards, fetches in conn.execute(
+                    "SELECT strategy, bytes, cards, fetches FROM fetch_stats WHERE board_id = ?", (board_id,)):
+                stats[strategy] = {"bytes": size, "cards": cards}
+                stats["fetches"] = stats.get("fetches", 0) + fetches
+        finally:
+            conn.close()
+    except Exception as e:
+        print("[Sora] Could not read fetch stats:", e)
+    return stats
+
+def choose_fetch_strategy(board_id):
+    """The configured strategy, or for "auto" the one that moved fewer bytes per card on this board"""
+    if FETCH_STRATEGY != "auto":
+        return FETCH_STRATEGY
+    stats = load_fetch_stats(board_id)
+    for strategy in ("nested", "split"):
+        if strategy not in stats:
+            return strategy
+    best, other = sorted(("nested", "split"), key=lambda s: stats[s]["bytes"] / max(1, stats[s]["cards"]))
+    return other if stats.get("fetches", 0) % FETCH_REPROBE == FETCH_REPROBE - 1 else best
+
+def record_fetch_size(board_id, strategy, size, cards):
+    try:
+        with state_transaction() as conn:
+            conn.execute("INSERT INTO fetch_stats VALUES (?, ?, ?, ?, 1) ON CONFLICT (board_id, strategy)"
+                         " DO UPDATE SET bytes = excluded.bytes, cards = excluded.cards, fetches = fetches + 1",
+                         (board_id, strategy, size, cards))
+    except Exception as e:
+        print(f"[Sora] Could not record fetch stats for board {board_id}:", e)
+    log_event("fetch_strategy", board=board_id, strategy=strategy, bytes=size, cards=cards)
+
+def fetch_boards(board_ids):
+    """Fetch several boards concurrently; yield (board_id, board_data, error) as each one finishes"""
+    from concurrent.futures import ThreadPoolExecutor, as_completed
+    fetch = sync_board_data if DELTA_SYNC else get_board_data
+    with ThreadPoolExecutor(max_workers=max(1, min(FETCH_WORKERS, len(board_ids)))) as pool:
+        futures = {pool.submit(fetch, board_id): board_id for board_id in board_ids}
+        for fut in as_completed(futures):
+            try:
+                yield futures[fut], fut.result(), None
+            except Exception as e:
+                yield futures[fut], None, e
+
+def fetch_board_data(board_id=None):
+    """Fetch one board with the configured strategy (live webhook state, delta sync, streaming or full)"""
+    if webhook_receiver is not None:
+        return get_live_board(board_id or TRELLO_BOARD_IDS[0]).lists_copy()
+    if DELTA_SYNC:
+        return sync_board_data(board_id)
+    if STREAM_FETCH:
+        return stream_board_data(board_id)
+    return get_board_data(board_id)
+
+def iter_board_lists(chunks):
+    """Incrementally decode a top-level JSON array from byte chunks, yielding one list at a time"""
+    decoder = json.JSONDecoder()
+    utf8 = codecs.getincrementaldecoder("utf-8")()
+    buf = ""
+    started = False
+    need = 0  # don't retry a partial element until the buffer has grown past this
+
+    for chunk in _with_end_marker(chunks):
+        final = chunk is None
+        buf += utf8.decode(b"" if final else chunk, final=final)
+        if len(buf) < need and not final:
+            continue
+        while True:
+            buf = buf.lstrip()
+            if not started:
+                if not buf:
+                    break
+                if buf[0] != "[":
+                    raise ValueError("Trello board payload is not a JSON array")
+                buf = buf[1:]
+                started = True
+                continue
+            buf = buf.lstrip(", \t\r\n")
+            if not buf:
+                break
+            if buf[0] == "]":
+                return
+            try:
+                lst, end = decoder.raw_decode(buf)
+            except ValueError:
+                # element not complete yet: wait until we have twice as much before retrying
+                need = len(buf) * 2
+                break
+            need = 0
+            buf = buf[end:]
+            yield lst
+
+    raise ValueError("Trello board payload ended mid-stream")
+
+def _with_end_marker(chunks):
+    yield from chunks
+    yield None
+
+def stream_board_data(board_id=None):
+    """Fetch the board with a streamed response and yield each list as soon as it is parsed"""
+    url = board_url(board_id) if board_id else BOARD_URL
+    with host_slot(url):
+        with phase("fetch"):
+            r = http_request("GET", url, stream=True)
+            r.raise_for_status()
+        # body download and decoding overlap with rendering, so they show up in the render phase
+        with r:
+            yield from iter_board_lists(_counted(r.iter_content(chunk_size=STREAM_CHUNK_SIZE)))
+
+def _counted(chunks):
+    for chunk in chunks:
+        metric_count("bytes_in", len(chunk))
+        yield chunk
+
+# -----------------------------
+# Delta sync (snapshot + actions feed)
+# -----------------------------
+class SnapshotInconsistent(Exception):
+    """An action cannot be applied to the local snapshot; a full fetch is needed"""
+
+def actions_url(board_id, since=None, limit=ACTIONS_PAGE_LIMIT):
+    url = (
+        f"{TRELLO_API}/boards/{board_id}/actions"
+        f"?filter={ACTION_FILTER}&limit={limit}"
+        f"&key={TRELLO_KEY}&token={TRELLO_TOKEN}"
+    )
+    if since:
+        url += f"&since={since}"
+    return url
+
+def get_board_actions(board_id, since=None, limit=ACTIONS_PAGE_LIMIT):
+    """Fetch board actions newer than the action ID `since` (Trello returns newest first)"""
+    url = actions_url(board_id, since, limit)
+    with host_slot(url):
+        with phase("fetch_actions"):
+            r = http_request("GET", url)
+            r.raise_for_status()
+        return decode_json(r)
+
+def snapshot_path(board_id):
+    return os.path.join(SNAPSHOT_DIR, f"{board_id}.json")
+
+def load_snapshot(board_id):
+    """Return the saved snapshot dict for a board, or None if missing/unreadable"""
+    try:
+        with open(snapshot_path(board_id), "r", encoding="utf-8") as f:
+            snap = json.load(f)
+        if snap.get("board_id") == board_id and isinstance(snap.get("lists"), list):
+            return snap
+    except Exception:
+        pass
+    return None
+
+def save_snapshot(board_id, lists, last_action_id, full_sync_at):
+    """full_sync_at: time of the full fetch the snapshot descends from"""
+    os.makedirs(SNAPSHOT_DIR, exist_ok=True)
+    path = snapshot_path(board_id)
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump({"board_id": board_id, "last_action_id": last_action_id, "full_sync_at": full_sync_at,
+                   "lists": lists}, f)
+    os.replace(tmp, path)
+
+def full_sync_due(full_sync_at):
+    """A snapshot only ever patched by actions is refetched after SORA_SNAPSHOT_FULL_SYNC_HOURS"""
+    return time.time() - (full_sync_at or 0) >= SNAPSHOT_FULL_SYNC_HOURS * 3600
+
+class BoardSnapshot:
+    """A lists+cards+checklists snapshot indexed by ID so Trello actions apply in O(1)"""
+
+    def __init__(self, lists):
+        self.lists = lists
+        self.action_date = None
+        self.lists_by_id = {lst["id"]: lst for lst in lists}
+        self.cards_by_id = {}
+        self.card_list = {}
+        for lst in lists:
+            for card in lst.get("cards", []):
+                self.cards_by_id[card["id"]] = card
+                self.card_list[card["id"]] = lst["id"]
+
+    def find_card(self, data):
+        """The card an action changes, with its dateLastActivity moved to the action's date"""
+        card = self.cards_by_id.get((data.get("card") or {}).get("id"))
+        if card is None:
+            raise SnapshotInconsistent(f"unknown card in {data.get('card')}")
+        if "dateLastActivity" in card:
+            if self.action_date:
+                card["dateLastActivity"] = self.action_date
+            else:
+                del card["dateLastActivity"]  # the render cache falls back to hashing the content
+        return card
+
+    @staticmethod
+    def find_checklist(card, data):
+        cl_id = (data.get("checklist") or {}).get("id")
+        for cl in card.setdefault("checklists", []):
+            if cl["id"] == cl_id:
+                return cl
+        raise SnapshotInconsistent(f"unknown checklist {cl_id}")
+
+    @staticmethod
+    def find_item(cl, data):
+        it_id = (data.get("checkItem") or {}).get("id")
+        for it in cl.setdefault("checkItems", []):
+            if it["id"] == it_id:
+                return it
+        raise SnapshotInconsistent(f"unknown check item {it_id}")
+
+    def remove_card(self, card_id):
+        if card_id not in self.cards_by_id:
+            return
+        lst = self.lists_by_id[self.card_list.pop(card_id)]
+        lst["cards"] = [c for c in lst["cards"] if c["id"] != card_id]
+        del self.cards_by_id[card_id]
+
+    def add_card(self, card, list_id):
+        """Insert by the card's position (cards are kept in Trello order); at the end without one"""
+        if list_id not in self.lists_by_id:
+            raise SnapshotInconsistent(f"unknown list {list_id}")
+        cards = self.lists_by_id[list_id].setdefault("cards", [])
+        pos = card.get("pos")
+        if pos is None or not cards:
+            cards.append(card)
+        elif any("pos" not in c for c in cards):
+            raise SnapshotInconsistent(f"card positions in list {list_id} unknown")
+        else:
+            i = len(cards)
+            while i and cards[i - 1]["pos"] > pos:
+                i -= 1
+            cards.insert(i, card)
+        self.cards_by_id[card["id"]] = card
+        self.card_list[card["id"]] = list_id
+
+    def remove_list(self, lst):
+        for card in lst.get("cards", []):
+            self.cards_by_id.pop(card["id"], None)
+            self.card_list.pop(card["id"], None)
+        self.lists.remove(lst)
+        del self.lists_by_id[lst["id"]]
+
+    def apply(self, action):
+        """Apply one Trello action; raises SnapshotInconsistent when the snapshot can't explain it"""
+        kind = action.get("type")
+        data = action.get("data") or {}
+        self.action_date = action.get("date")
+
+        if kind == "createCard":
+            if data["card"]["id"] not in self.cards_by_id:
+                card = {"id": data["card"]["id"], "name": data["card"].get("name", ""), "labels": [], "checklists": []}
+                if self.action_date and "dateLastActivity" in CARD_FIELDS.split(","):
+                    card["dateLastActivity"] = self.action_date
+                self.add_card(card, data["list"]["id"])
+        elif kind == "updateCard":
+            card = self.find_card(data)
+            old = data.get("old") or {}
+            if "closed" in old:
+                if data["card"].get("closed"):
+                    self.remove_card(card["id"])
+                    return
+                raise SnapshotInconsistent("card restored from archive")
+            if "idList" in old or "pos" in old:
+                list_id = data["card"].get("idList") or self.card_list[card["id"]]
+                self.remove_card(card["id"])
+                if "pos" in data["card"]:
+                    card["pos"] = data["card"]["pos"]
+                elif "pos" in old:
+                    raise SnapshotInconsistent("card moved to an unknown position")
+                else:
+                    card.pop("pos", None)  # moved to another list, place unknown: its end
+                self.add_card(card, list_id)
+            for field in ("name", "desc"):
+                if field in old:
+                    card[field] = data["card"].get(field, "")
+        elif kind in ("deleteCard", "moveCardFromBoard"):
+            self.remove_card((data.get("card") or {}).get("id"))
+        elif kind in ("moveCardToBoard", "copyCard", "convertToCardFromCheckItem", "emailCard"):
+            # the new card's labels, checklists (and the converted item's removal) are not in the action
+            raise SnapshotInconsistent(f"card created by {kind}")
+
+        elif kind == "addChecklistToCard":
+            if data.get("checklistSource"):
+                raise SnapshotInconsistent("checklist copied with unknown items")
+            card = self.find_card(data)
+            if not any(cl["id"] == data["checklist"]["id"] for cl in card.setdefault("checklists", [])):
+                card["checklists"].append({"id": data["checklist"]["id"],
+                                           "name": data["checklist"].get("name", ""), "checkItems": []})
+        elif kind == "removeChecklistFromCard":
+            card = self.find_card(data)
+            card["checklists"] = [cl for cl in card.get("checklists", []) if cl["id"] != data["checklist"]["id"]]
+        elif kind == "updateChecklist":
+            self.find_checklist(self.find_card(data), data)["name"] = data["checklist"].get("name", "")
+
+        elif kind == "createCheckItem":
+            cl = self.find_checklist(self.find_card(data), data)
+            if not any(it["id"] == data["checkItem"]["id"] for it in cl.setdefault("checkItems", [])):
+                cl["checkItems"].append({"id": data["checkItem"]["id"], "name": data["checkItem"].get("name", ""),
+                                         "state": data["checkItem"].get("state", "incomplete")})
+        elif kind in ("updateCheckItem", "updateCheckItemStateOnCard"):
+            item = self.find_item(self.find_checklist(self.find_card(data), data), data)
+            for field in ("name", "state"):
+                if field in data["checkItem"]:
+                    item[field] = data["checkItem"][field]
+        elif kind == "deleteCheckItem":
+            cl = self.find_checklist(self.find_card(data), data)
+            cl["checkItems"] = [it for it in cl.get("checkItems", []) if it["id"] != data["checkItem"]["id"]]
+
+        elif kind == "addLabelToCard":
+            card = self.find_card(data)
+            if not any(lb["id"] == data["label"]["id"] for lb in card.setdefault("labels", [])):
+                card["labels"].append(dict(data["label"]))
+        elif kind == "removeLabelFromCard":
+            card = self.find_card(data)
+            card["labels"] = [lb for lb in card.get("labels", []) if lb["id"] != data["label"]["id"]]
+        elif kind in ("updateLabel", "deleteLabel"):
+            label_id = data["label"]["id"]
+            for card in self.cards_by_id.values():
+                if kind == "deleteLabel":
+                    card["labels"] = [lb for lb in card.get("labels", []) if lb["id"] != label_id]
+                else:
+                    for lb in card.get("labels", []):
+                        if lb["id"] == label_id:
+                            lb.update({k: v for k, v in data["label"].items() if k in ("name", "color")})
+
+        elif kind == "createList":
+            if data["list"]["id"] not in self.lists_by_id:
+                lst = {"id": data["list"]["id"], "name": data["list"].get("name", ""), "cards": []}
+                self.lists.append(lst)
+                self.lists_by_id[lst["id"]] = lst
+        elif kind == "updateList":
+            lst = self.lists_by_id.get(data["list"]["id"])
+            old = data.get("old") or {}
+            if lst is None:
+                raise SnapshotInconsistent(f"unknown list {data['list']['id']}")
+            if "closed" in old:
+                if not data["list"].get("closed"):
+                    raise SnapshotInconsistent("list restored from archive")
+                self.remove_list(lst)
+            elif "name" in old:
+                lst["name"] = data["list"].get("name", "")
+        elif kind == "moveListFromBoard":
+            lst = self.lists_by_id.get(data["list"]["id"])
+            if lst is not None:
+                self.remove_list(lst)
+        elif kind == "moveListToBoard":
+            raise SnapshotInconsistent("list moved in from another board")
+        else:
+            raise SnapshotInconsistent(f"unhandled action {kind}")
+
+def apply_actions(lists, actions):
+    """Apply Trello actions (oldest first) to a lists+cards+checklists snapshot in place"""
+    snapshot = BoardSnapshot(lists)
+    for action in actions:
+        snapshot.apply(action)
+    return snapshot.lists
+
+def full_sync(board_id):
+    """Full board download, recorded as a fresh snapshot"""
+    # grab the sync point first so nothing that happens during the download is lost
+    latest = get_board_actions(board_id, limit=1)
+    started = time.time()
+    lists = get_board_data(board_id)
+    save_snapshot(board_id, lists, latest[0]["id"] if latest else None, started)
+    return lists
+
+def sync_board_data(board_id=None):
+    """Return current board lists, replaying only new actions onto the local snapshot when possible"""
+    board_id = board_id or TRELLO_BOARD_IDS[0]
+    snap = load_snapshot(board_id)
+    if snap is None or not snap.get("last_action_id"):
+        print(f"[Sora] No usable snapshot for board {board_id}, doing a full fetch")
+        return full_sync(board_id)
+    if full_sync_due(snap.get("full_sync_at")):
+        print(f"[Sora] Snapshot of board {board_id} is due for a full fetch")
+        return full_sync(board_id)
+
+    actions = get_board_actions(board_id, since=snap["last_action_id"])
+    if len(actions) >= ACTIONS_PAGE_LIMIT:
+        print(f"[Sora] Too many changes on board {board_id} since last sync, doing a full fetch")
+        return full_sync(board_id)
+    if not actions:
+        return snap["lists"]
+
+    try:
+        lists = apply_actions(snap["lists"], list(reversed(actions)))
+    except (SnapshotInconsistent, KeyError, TypeError) as e:
+        print(f"[Sora] Snapshot for board {board_id} is out of date ({e}), doing a full fetch")
+        return full_sync(board_id)
+    save_snapshot(board_id, lists, actions[0]["id"], snap.get("full_sync_at"))
+    print(f"[Sora] Applied {len(actions)} changes to the snapshot of board {board_id}")
+    return lists
+
+class PriorityMatcher:
+    """Label-keyword matcher compiled once, with results memoized per Trello label
+
+    Boards reuse a handful of labels across thousands of cards, so each distinct
+    (label id, name) is scanned once and every later card is a dict lookup.
+    """
+
+    def __init__(self, keyword_markers, default=DEFAULT_PRIORITY_MARKER):
+        self.keywords = tuple((keyword.strip().lower(), marker.strip()) for keyword, marker in keyword_markers)
+        self.default = default
+        self.cache = {}
+
+    def label_match(self, label):
+        """Return (keyword index, marker) for a label, or None when no keyword matches"""
+        key = (label.get("id"), label.get("name"))
+        try:
+            return self.cache[key]
+        except KeyError:
+            pass
+        lowered = (label.get("name") or "").lower()
+        match = None
+        for index, (keyword, marker) in enumerate(self.keywords):
+            if keyword in lowered:
+                match = (index, marker)
+                break
+        self.cache[key] = match
+        return match
+
+    def card_match(self, card):
+        """First matching label of the card, in label order"""
+        for label in card.get("labels") or ():
+            match = self.label_match(label)
+            if match is not None:
+                return match
+        return None
+
+    def marker(self, card):
+        match = self.card_match(card)
+        return match[1] if match is not None else self.default
+
+priority_matcher = PriorityMatcher(PRIORITY_LABELS)
+
+# -----------------------------
+# Progress analytics (check-item completions from the actions history)
+# -----------------------------
+def history_url(board_id, since, before=None):
+    url = (
+        f"{TRELLO_API}/boards/{board_id}/actions"
+        f"?filter=updateCheckItemStateOnCard&fields=date,data&memberCreator=false&member=false"
+        f"&limit={ACTIONS_PAGE_LIMIT}&since={since}"
+        f"&key={TRELLO_KEY}&token={TRELLO_TOKEN}"
+    )
+    if before:
+        url += f"&before={before}"
+    return url
+
+def get_completion_history(board_id=None):
+    """Check-item changes in the analytics window as columns: {"dates", "cards", "deltas", "card_ids"}
+
+    One entry per change: its date, the card (an index into card_ids), and +1
+    (completed) or -1 (unchecked). Pages back through the actions feed newest first; returns None
+    (analytics skipped) if numpy is missing or the history cannot be fetched.
+    """
+    import importlib.util
+    if importlib.util.find_spec("numpy") is None:
+        print("[Sora] Progress analytics need numpy (pip install -r requirements-analytics.txt); skipping them")
+        return None
+    board_id = board_id or TRELLO_BOARD_IDS[0]
+    since = (datetime.now(timezone.utc).date() - timedelta(days=ANALYTICS_DAYS)).isoformat()
+    history = {"dates": [], "cards": [], "deltas": [], "card_ids": []}
+    card_codes = {}
+    before = None
+    try:
+        with phase("fetch_history"):
+            for _ in range(ANALYTICS_MAX_PAGES):
+                url = history_url(board_id, since, before)
+                with host_slot(url):
+                    page = cached_get_json(url)
+                for action in page:
+                    data = action.get("data") or {}
+                    state = (data.get("checkItem") or {}).get("state")
+                    card_id = (data.get("card") or {}).get("id")
+                    if state in ("complete", "incomplete") and card_id and action.get("date"):
+                        history["dates"].append(action["date"][:10])
+                        code = card_codes.get(card_id)
+                        if code is None:
+                            code = card_codes[card_id] = len(history["card_ids"])
+                            history["card_ids"].append(card_id)
+                        history["cards"].append(code)
+                        history["deltas"].append(1 if state == "complete" else -1)
+                if len(page) < ACTIONS_PAGE_LIMIT:
+                    break
+                before = page[-1]["id"]
+    except Exception as e:
+        print(f"[Sora] Could not fetch the history of board {board_id}, skipping progress analytics:", e)
+        return None
+    metric_count("history_events", len(history["deltas"]))
+    return history
+
+def analyze_progress(history, card_lists, n_lists, total_items, completed_items, today=None):
+    """Velocity, burndown trend and projected completion from a completion history
+
+    card_lists maps card ID -> list index (cards no longer on an open list count
+    for the board only). Everything is computed on NumPy arrays: one bincount
+    for the board series, one over (list, day) cells for the per-list grid.
+    """
+    import numpy as np
+    window = ANALYTICS_WINDOW
+    n_days = max(ANALYTICS_DAYS, 2 * window)
+    today = np.datetime64(today or datetime.now(timezone.utc).date(), "D")
+    day = (np.array(history["dates"], dtype="datetime64[D]") - (today - (n_days - 1))).astype(np.int64)
+    delta = np.array(history["deltas"], dtype=np.int64)
+    card_list = np.array([card_lists.get(c, -1) for c in history["card_ids"]] or [-1], dtype=np.int64)
+    lists = card_list[np.array(history["cards"], dtype=np.int64)]
+    keep = (day >= 0) & (day < n_days)
+    day, delta, lists = day[keep], delta[keep], lists[keep]
+
+    # net items completed per day, for the board and per list (row per list, column per day)
+    daily = np.bincount(day, weights=delta, minlength=n_days)
+    on_list = lists >= 0
+    per_list = np.bincount(lists[on_list] * n_days + day[on_list], weights=delta[on_list],
+                           minlength=n_lists * n_days).reshape(n_lists, n_days)
+
+    # items left at the end of each day: today's remaining plus whatever got done after that day
+    remaining_now = total_items - completed_items
+    remaining = remaining_now + (np.cumsum(daily[::-1])[::-1] - daily)
+
+    velocity = float(daily[-window:].mean())
+    previous = float(daily[-2 * window:-window].mean())
+    slope = float(np.polyfit(np.arange(window), remaining[-window:], 1)[0])  # items per day, < 0 when burning down
+    if velocity <= 0 and not (daily[-window:] > 0).any():
+        trend = "stalled"
+    elif velocity > previous * 1.2:
+        trend = "up"
+    elif velocity < previous * 0.8:
+        trend = "down"
+    else:
+        trend = "flat"
+    eta = None
+    if remaining_now > 0 and slope < 0:
+        eta = (today + int(np.ceil(remaining_now / -slope))).item()
+    weeks = daily[-(n_days // 7) * 7:].reshape(-1, 7).sum(axis=1)
+    return {
+        "window": window,
+        "velocity": velocity,
+        "previous": previous,
+        "burn_rate": -slope,
+        "trend": trend,
+        "remaining": remaining_now,
+        "eta": eta,
+        "weekly": weeks[-12:].tolist(),
+        "lists_done": per_list[:, -window:].sum(axis=1).tolist(),
+    }
+
+# -----------------------------
+# Webhook receiver (live board state pushed by Trello)
+# -----------------------------
+class LiveBoard:
+    """Board state kept current by webhook events, snapshotted to disk when changed"""
+
+    def __init__(self, board_id, lists, last_action_id, full_sync_at=None):
+        self.board_id = board_id
+        self.full_sync_at = full_sync_at
+        self.snapshot = BoardSnapshot(lists)
+        self.last_action_id = last_action_id
+        self.synced_action_id = last_action_id  # the sync point: older events are already in the lists
+        self.lock = threading.Lock()
+        self.dirty = False
+        self.stale = False
+        self.events = 0
+        self.recent_ids = set()
+
+    def apply(self, action):
+        """Apply one pushed action; returns False for redeliveries, events from before the sync point and while stale"""
+        action_id = action.get("id", "")
+        with self.lock:
+            if self.stale or action_id in self.recent_ids:
+                return False
+            if self.synced_action_id and action_id <= self.synced_action_id:
+                return False  # late or redelivered, and included in the fetch the state was built from
+            if action.get("type") not in SNAPSHOT_ACTIONS:
+                return False  # comments, members, attachments: nothing the report shows
+            try:
+                if self.last_action_id and action_id <= self.last_action_id:
+                    raise SnapshotInconsistent("event delivered out of order")
+                self.snapshot.apply(action)
+            except (SnapshotInconsistent, KeyError, TypeError) as e:
+                # drop further events: the next read resyncs from a full fetch, which includes them
+                print(f"[Sora] Live state of board {self.board_id} is out of date ({e})")
+                self.stale = True
+                return False
+            self.last_action_id = action_id
+            if len(self.recent_ids) >= 1000:
+                self.recent_ids.clear()
+            self.recent_ids.add(action_id)
+            self.dirty = True
+            self.events += 1
+            return True
+
+    def lists_copy(self):
+        with self.lock:
+            return json.loads(json.dumps(self.snapshot.lists))
+
+    def save(self):
+        with self.lock:
+            if self.dirty and not self.stale:
+                save_snapshot(self.board_id, self.snapshot.lists, self.last_action_id, self.full_sync_at)
+                self.dirty = False
+
+live_boards = {}
+_live_lock = threading.Lock()  # guards the three dicts below; never held over the network
+_live_build_locks = {}  # board id -> lock held while that board's state is (re)built
+_pending_events = {}  # board id -> webhook actions received while its state is (re)built
+_rebuilding = set()  # boards with a background rebuild queued or running
+webhook_receiver = None
+
+def get_live_board(board_id):
+    """Live state for a board: seeded by delta sync from its snapshot, rebuilt by a full fetch when
+    stale or when its last full fetch is SORA_SNAPSHOT_FULL_SYNC_HOURS old
+
+    Blocks while the board is fetched, but only callers of that same board.
+    Webhook events that arrive meanwhile are buffered and applied before the
+    new state is used.
+    """
+    with _live_lock:
+        live = live_boards.get(board_id)
+        build_lock = _live_build_locks.setdefault(board_id, threading.Lock())
+    if live is not None and not live.stale and not full_sync_due(live.full_sync_at):
+        return live
+    with build_lock:
+        with _live_lock:
+            live = live_boards.get(board_id)
+        if live is not None and not live.stale and not full_sync_due(live.full_sync_at):
+            return live  # rebuilt while we waited
+        lists = full_sync(board_id) if live is not None else sync_board_data(board_id)
+        snap = load_snapshot(board_id) or {}
+        live = LiveBoard(board_id, lists, snap.get("last_action_id"), snap.get("full_sync_at"))
+        while True:
+            with _live_lock:
+                pending = _pending_events.pop(board_id, [])
+                if not pending:
+                    live_boards[board_id] = live  # from here on events are applied as they arrive
+                    return live
+            for action in sorted(pending, key=lambda a: a.get("id", "")):
+                live.apply(action)
+
+def rebuild_live_board(board_id):
+    """Background rebuild for the webhook path"""
+    try:
+        get_live_board(board_id)
+    except Exception as e:
+        print(f"[Sora] Could not rebuild live state of board {board_id}:", e)
+        with _live_lock:
+            _pending_events.pop(board_id, None)  # the next rebuild's fetch includes them
+    finally:
+        with _live_lock:
+            _rebuilding.discard(board_id)
+
+def push_live_event(board_id, action):
+    """Apply a webhook action, or buffer it and rebuild the board's state in the background"""
+    with _live_lock:
+        live = live_boards.get(board_id)
+        if live is None or live.stale:
+            _pending_events.setdefault(board_id, []).append(action)
+            start = board_id not in _rebuilding
+            _rebuilding.add(board_id)
+            live = None
+    if live is not None:
+        live.apply(action)
+    elif start:
+        threading.Thread(target=rebuild_live_board, args=(board_id,), daemon=True).start()
+
+def verify_trello_signature(body, path, signature):
+    """Trello signs base64(HMAC-SHA1(app secret, body + callback URL))"""
+    if not TRELLO_WEBHOOK_SECRET:
+        return True
+    digest = hmac.new(TRELLO_WEBHOOK_SECRET.encode("utf-8"),
+                      body + (WEBHOOK_CALLBACK_URL + path).encode("utf-8"), hashlib.sha1).digest()
+    return hmac.compare_digest(base64.b64encode(digest).decode("ascii"), signature or "")
+
+def handle_trello_webhook(path, body, signature):
+    """Apply one webhook callback body; returns the HTTP status to answer with"""
+    if not verify_trello_signature(body, path, signature):
+        return 401
+    try:
+        event = json.loads(body)
+        action = event["action"]
+    except (ValueError, KeyError, TypeError):
+        return 400
+    parts = path.split("?")[0].strip("/").split("/")
+    board_id = parts[1] if len(parts) == 2 and parts[0] == "trello" else (event.get("model") or {}).get("id")
+    if not board_id:
+        return 400
+    if board_id not in TRELLO_BOARD_IDS:
+        return 404  # only the boards this bot reports on are synced with our credentials
+    try:
+        push_live_event(board_id, action)  # never fetches: a stale board is rebuilt in the background
+        metric_count("webhook_events")
+    except Exception as e:
+        print(f"[Sora] Could not apply webhook event for board {board_id}:", e)
+        return 500
+    return 200
+
+def save_live_boards():
+    with _live_lock:
+        boards = list(live_boards.values())
+    for live in boards:
+        live.save()
+
+def is_loopback(host):
+    import ipaddress
+    if host == "localhost":
+        return True
+    try:
+        return ipaddress.ip_address(host.strip("[]")).is_loopback
+    except ValueError:
+        return False
+
+def start_webhook_receiver(listen=None):
+    """Serve Trello webhook callbacks in background threads; returns the HTTP server"""
+    global webhook_receiver
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    class TrelloWebhookHandler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def reply(self, status):
+            self.send_response(status)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+
+        def do_HEAD(self):
+            # Trello checks the callback URL with a HEAD request when the webhook is created
+            self.reply(200)
+
+        do_GET = do_HEAD
+
+        def do_POST(self):
+            body = self.rfile.read(int(self.headers.get("Content-Length") or 0))
+            self.reply(handle_trello_webhook(self.path, body, self.headers.get("X-Trello-Webhook")))
+
+        def log_message(self, *args):
+            pass
+
+    host, _, port = (listen or WEBHOOK_LISTEN).rpartition(":")
+    host = host or "0.0.0.0"
+    if not TRELLO_WEBHOOK_SECRET and not is_loopback(host):
+        raise SystemExit(f"[Sora] Refusing to listen for webhooks on {host} without TRELLO_WEBHOOK_SECRET "
+                         "(unsigned callbacks are only accepted on a loopback address)")
+    server = ThreadingHTTPServer((host, int(port)), TrelloWebhookHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    def snapshot_loop():
+        while True:
+            time.sleep(WEBHOOK_SNAPSHOT_SECONDS)
+            save_live_boards()
+
+    threading.Thread(target=snapshot_loop, daemon=True).start()
+    atexit.register(save_live_boards)
+    webhook_receiver = server
+    print(f"[Sora] Listening for Trello webhooks on {server.server_address[0]}:{server.server_address[1]}")
+    return server
 
 def get_priority_emoji(card):
     """Return short text emoji based on label keywords (few standard symbols)"""
-    emojis = {
-        "high": "!!",
-        "medium": "!",
-        "low": ".",
-        "urgent": "!!!",
-        "done": "✅"
-    }
-    if "labels" in card and card["labels"]:
-        for label in card["labels"]:
-            name = (label.get("name") or "").lower()
-            for keyword, emoji in emojis.items():
-                if keyword in name:
-                    return emoji
-    return ":"  # default small text marker
-
-def sora_summary(total_lists, total_cards, completed_cards, total_items, completed_items):
-    """Construct the Sora-style summary message"""
+    return priority_matcher.marker(card)
+
+# -----------------------------
+# Board model (compact, counts computed once while building)
+# -----------------------------
+class Checklist:
+    """Items as parallel arrays (names, and 0/1 states as bytes), not one object per item:
+    millions of small tracked objects made the garbage collector dominate large renders"""
+    __slots__ = ("name", "item_names", "states", "completed_items")
+
+    def __init__(self, name, item_names, states):
+        self.name = name
+        self.item_names = item_names
+        self.states = states
+        self.completed_items = states.count(1)
+
+    def items(self):
+        """(name, complete) per item"""
+        return zip(self.item_names, self.states)
+
+    @classmethod
+    def from_trello(cls, cl):
+        items = cl.get("checkItems", [])
+        return cls(cl.get("name", "Checklist"), tuple([it.get("name", "") for it in items]),
+                   bytes([it.get("state") == "complete" for it in items]))
+
+class Card:
+    __slots__ = ("id", "name", "marker", "checklists", "total_items", "completed_items", "done",
+                 "cache_key", "block", "note")
+
+    def __init__(self, card_id, name, marker, checklists, total_items=None, completed_items=None):
+        self.id = card_id
+        self.name = name
+        self.marker = marker
+        self.checklists = checklists
+        self.total_items = sum(len(cl.states) for cl in checklists) if total_items is None else total_items
+        self.completed_items = (sum(cl.completed_items for cl in checklists)
+                                if completed_items is None else completed_items)
+        # a card counts as done only when it has checklist items and all are complete
+        self.done = self.total_items > 0 and self.completed_items == self.total_items
+        # set by RenderCache: content hash, and the cached rendered block on a hit
+        self.cache_key = None
+        self.block = None
+        self.note = None  # Sora's per-card line, drawn once for every format
+
+    @classmethod
+    def from_trello(cls, card):
+        return cls(card.get("id"), card.get("name", "Untitled card"), get_priority_emoji(card),
+                   tuple(Checklist.from_trello(cl) for cl in card.get("checklists", [])))
+
+    @classmethod
+    def text_only(cls, card):
+        """A card for the text report alone: its block drawn straight from the Trello dicts in the
+        pass that counts its items (what render_card_block would draw), with no checklist objects"""
+        lines = [None]  # the header, once the card's state is known
+        total_items = completed_items = 0
+        for cl in card.get("checklists", []):
+            items = cl.get("checkItems", [])
+            lines.append(f"│   📑 {cl.get('name', 'Checklist')}:")
+            for item in items:  # a plain loop with the mark inlined beats comprehensions over states here
+                if item.get("state") == "complete":
+                    completed_items += 1
+                    lines.append(f"│   ├─ {item.get('name', '')} - ✅")
+                else:
+                    lines.append(f"│   ├─ {item.get('name', '')} - ❌")
+            total_items += len(items)
+        self = cls(card.get("id"), card.get("name", "Untitled card"), get_priority_emoji(card), (),
+                   total_items, completed_items)
+        lines[0] = f"├─ {self.marker} {self.name} - {'✅' if self.done else '❌'}"
+        self.block = "\n".join(lines)
+        return self
+
+class BoardList:
+    __slots__ = ("id", "name", "cards", "total_cards", "completed_cards", "total_items", "completed_items",
+                 "hidden")
+
+    def __init__(self, list_id, name, cards):
+        self.id = list_id
+        self.name = name
+        self.cards = cards
+        self.total_cards = len(cards)
+        self.completed_cards = sum(1 for c in cards if c.done)
+        self.total_items = sum(c.total_items for c in cards)
+        self.completed_items = sum(c.completed_items for c in cards)
+        # bounded report: (cards, completed cards, items, completed items) left out of .cards
+        self.hidden = None
+
+    def roll_up(self, counts):
+        """Count every card of the list, given as (card id, items, completed items); the ones not in .cards become .hidden"""
+        shown = (self.total_cards, self.completed_cards, self.total_items, self.completed_items)
+        self.total_cards = len(counts)
+        self.completed_cards = sum(1 for _, items, done in counts if items and done == items)
+        self.total_items = sum(items for _, items, _ in counts)
+        self.completed_items = sum(done for _, _, done in counts)
+        hidden = tuple(total - part for total, part in zip(
+            (self.total_cards, self.completed_cards, self.total_items, self.completed_items), shown))
+        self.hidden = hidden if hidden[0] else None
+
+    @classmethod
+    def counted(cls, list_id, name, total_cards, completed_cards, total_items, completed_items):
+        """A list known only by its counts (its cards were rendered elsewhere)"""
+        blist = cls(list_id, name, ())
+        blist.total_cards = total_cards
+        blist.completed_cards = completed_cards
+        blist.total_items = total_items
+        blist.completed_items = completed_items
+        return blist
+
+    @classmethod
+    def from_trello(cls, lst, cache=None, full=True):
+        """Without full the cards only serve the text report (see Card.text_only)"""
+        cards = lst.get("cards", [])
+        if cache is not None:
+            built = tuple(cache.card(card, full) for card in cards)
+        elif full:
+            built = tuple(Card.from_trello(card) for card in cards)
+        else:
+            built = tuple(Card.text_only(card) for card in cards)
+        return cls(lst.get("id"), lst.get("name", "Unnamed list"), built)
+
+class Board:
+    """Running board totals; lists are added one at a time so the payload can be streamed"""
+    __slots__ = ("lists", "total_lists", "total_cards", "completed_cards", "total_items", "completed_items")
+
+    def __init__(self):
+        self.lists = []
+        self.total_lists = 0
+        self.total_cards = 0
+        self.completed_cards = 0
+        self.total_items = 0
+        self.completed_items = 0
+
+    def add(self, blist):
+        self.lists.append(blist)
+        self.total_lists += 1
+        self.total_cards += blist.total_cards
+        self.completed_cards += blist.completed_cards
+        self.total_items += blist.total_items
+        self.completed_items += blist.completed_items
+        return blist
+
+    @classmethod
+    def from_trello(cls, board_data):
+        board = cls()
+        for lst in board_data:
+            board.add(BoardList.from_trello(lst))
+        return board
+
+def sora_summary(total_lists, total_cards, completed_cards, total_items, completed_items, progress=None):
+    """Construct the Sora-style summary message (plus a pace line when progress analytics ran)"""
+    phrases = load_phrases()
     time_greeting = get_time_greeting()
-    intro = random.choice(intros)
-    ending = random.choice(endings)
+    intro = random.choice(phrases["intros"])
+    ending = random.choice(phrases["endings"])
 
     total_possible = total_cards + total_items
     progress_ratio = (completed_cards + completed_items) / total_possible if total_possible > 0 else 0
 
     if progress_ratio == 0:
-        encouragement = random.choice(encouragements_none)
+        encouragement = random.choice(phrases["encouragements_none"])
     elif progress_ratio < 0.5:
-        encouragement = "You're doing okay, Alex! Keep pushing, I believe in you! :)"
+        encouragement = phrases["encouragement_partial"]
     else:
-        encouragement = random.choice(encouragements_done)
-
-    text = (
-        f"{time_greeting}\n\n"
-        f"{intro}\n\n"
-        f"You have {total_lists} lists on your board.\n"
-        f"{total_cards} cards total — {completed_cards} completed ✅\n"
-        f"{total_items} checklist items — {completed_items} completed ✅\n\n"
-        f"{encouragement}\n\n"
-        f"{ending}\n\n"
-        f"Here’s the full board so you can see everything:"
+        encouragement = random.choice(phrases["encouragements_done"])
+    if progress is not None:
+        encouragement += "\n\n" + progress_text(progress, phrases)
+
+    text = phrases["summary"].format(
+        greeting=time_greeting,
+        intro=intro,
+        lists=total_lists,
+        cards=total_cards,
+        completed_cards=completed_cards,
+        items=total_items,
+        completed_items=completed_items,
+        encouragement=encouragement,
+        ending=ending,
     )
     return text
 
-def generate_report(board_data):
-    """Generate full .txt report and summary counts"""
-    lines = []
-    total_cards = 0
-    completed_cards = 0
-    total_checklist_items = 0
-    completed_checklist_items = 0
+def render_card_block(card):
+    """Card header + checklist lines as one newline-joined block"""
+    card_status = "✅" if card.done else "❌"
+    lines = [f"├─ {card.marker} {card.name} - {card_status}"]
 
-    for lst in board_data:
-        list_name = lst.get("name", "Unnamed list")
-        lines.append(f"📋 {list_name}")
-        lines.append("")
+    # Add per-checklist sections (preserve checklist names)
+    for cl in card.checklists:
+        lines.append(f"│   📑 {cl.name}:")
+        lines += [f"│   ├─ {name} - {'✅' if complete else '❌'}" for name, complete in cl.items()]
+    return "\n".join(lines)
 
-        for card in lst.get("cards", []):
-            card_name = card.get("name", "Untitled card")
-            emoji = get_priority_emoji(card)
+class RenderCache:
+    """Persistent cache of rendered card blocks, keyed by a hash of the card's Trello content
 
-            # Gather checklist items for this card
-            checklist_items = []
-            for cl in card.get("checklists", []):
-                for it in cl.get("checkItems", []):
-                    checklist_items.append(it)
+    The hash is taken from the raw card (name, labels, and dateLastActivity when
+    fetched, else the checklists) so a hit skips building the card's checklist
+    objects as well as rendering them; entries keep the item counts the
+    aggregates need. Each card's last hash is remembered too,
+    which is what the "changes since last report" section is computed from. Both
+    maps are LRU-bounded by max_cards (dict insertion order, refreshed on use).
+    """
+
+    def __init__(self, path, max_cards):
+        self.path = path
+        self.max_cards = max_cards
+        self.blocks = {}
+        self.card_hashes = {}
+        self.hits = 0
+        self.misses = 0
+        self.dirty = False
+        self.lock = threading.Lock()
+        # markers depend on the label table, so a different table must not reuse blocks
+        self.salt = json.dumps(PRIORITY_LABELS, ensure_ascii=False)
+        try:
+            with open(path, "rb") as f:
+                data = marshal.loads(f.read())
+            if data.get("salt") == self.salt:
+                self.blocks = data.get("blocks", {})
+            self.card_hashes = data.get("cards", {})
+        except Exception:
+            pass
 
-            if checklist_items:
-                completed_items_count = sum(1 for it in checklist_items if it.get("state") == "complete")
-                card_done = (completed_items_count == len(checklist_items))
+    def key(self, raw):
+        # Trello bumps dateLastActivity on every change to the card or its checklists, so it
+        # stands in for them (hashing every item costs about as much as rendering it); label
+        # renames don't touch cards, so the labels are hashed either way
+        active = raw.get("dateLastActivity")
+        content = _key_encoder.encode([raw.get("name"), raw.get("labels"), active or raw.get("checklists")])
+        return hashlib.blake2b(content.encode("ascii"), digest_size=16).hexdigest()
+
+    def card(self, raw, full=False):
+        """Build a Card from a Trello card dict, reusing the cached block when its content is unchanged
+
+        With full the checklists are built even on a hit (formats other than text need them).
+        """
+        key = self.key(raw)
+        with self.lock:
+            entry = self.blocks.pop(key, None)
+            if entry is not None:
+                self.blocks[key] = entry
+                self.hits += 1
             else:
-                completed_items_count = 0
-                card_done = False
+                self.misses += 1
+        if entry is None and not full:
+            card = Card.text_only(raw)
+            card.cache_key = key
+            self.store(card, card.block)
+            return card
+        if entry is None:
+            card = Card.from_trello(raw)
+        elif full:
+            card = Card.from_trello(raw)
+            card.block = entry[0]
+        else:
+            block, total_items, completed_items = entry
+            card = Card(raw.get("id"), raw.get("name", "Untitled card"), get_priority_emoji(raw), (),
+                        total_items, completed_items)
+            card.block = block
+        card.cache_key = key
+        return card
+
+    def store(self, card, block):
+        with self.lock:
+            self.blocks[card.cache_key] = (block, card.total_items, card.completed_items)
+            self.dirty = True
+            if len(self.blocks) > self.max_cards:
+                del self.blocks[next(iter(self.blocks))]
+
+    def record(self, card):
+        """Remember the card's hash; returns "new", "updated" or None when unchanged"""
+        with self.lock:
+            previous = self.card_hashes.pop(card.id, None)
+            self.card_hashes[card.id] = card.cache_key
+            if len(self.card_hashes) > self.max_cards:
+                del self.card_hashes[next(iter(self.card_hashes))]
+            if previous != card.cache_key:
+                self.dirty = True
+        if previous == card.cache_key:
+            return None
+        return "new" if previous is None else "updated"
+
+    def save(self):
+        with self.lock:
+            metric_count("render_cache_hits", self.hits)
+            metric_count("render_cache_misses", self.misses)
+            self.hits = self.misses = 0
+            if not self.dirty:
+                return
+            self.dirty = False
+            tmp = f"{self.path}.{threading.get_ident()}.tmp"
+            with open(tmp, "wb") as f:
+                # marshal, not JSON: the text render is a single pass over the dicts now, and
+                # parsing a JSON cache of every block took longer than rendering them again
+                f.write(marshal.dumps({"salt": self.salt, "blocks": self.blocks, "cards": self.card_hashes}))
+            os.replace(tmp, self.path)
+
+_render_cache = None
+_key_encoder = json.JSONEncoder(check_circular=False, separators=(",", ":"))
 
-            card_status = "✅" if card_done else "❌"
-            lines.append(f"├─ {emoji} {card_name} - {card_status}")
-            total_cards += 1
-            if card_done:
-                completed_cards += 1
+def get_render_cache():
+    global _render_cache
+    if RENDER_CACHE_FILE and _render_cache is None:
+        _render_cache = RenderCache(RENDER_CACHE_FILE, RENDER_CACHE_MAX_CARDS)
+    return _render_cache
 
-            # Add per-checklist sections (preserve checklist names)
+def build_list(lst, cache=None, changes=None, full=False):
+    """Board model for one Trello list, with Sora's per-card notes drawn once for every format
+
+    Cards built by a RenderCache carry their cached block when unchanged; with
+    `changes` every card whose content hash moved is appended as
+    (list name, card name, "new"/"updated").
+    """
+    phrases = load_phrases()
+    blist = BoardList.from_trello(lst, cache, full)
+    for card in blist.cards:
+        if cache is not None:
+            change = cache.record(card)
+            if change and changes is not None:
+                changes.append((blist.name, card.name, change))
+
+        # Per-card Sora commentary (use simple tailored lines)
+        card.note = random.choice(phrases["card_praise"] if card.done else phrases["card_pep"])
+    return blist
+
+def priority_rank(card):
+    """Importance of a card's priority label: its keyword's place in SORA_REPORT_PRIORITY_ORDER
+
+    Unlabelled cards come right after the listed keywords, cards whose label
+    matched some other keyword (such as "done") last.
+    """
+    match = priority_matcher.card_match(card)
+    if match is None:
+        return len(REPORT_PRIORITY_ORDER)
+    keyword = priority_matcher.keywords[match[0]][0]
+    return REPORT_PRIORITY_ORDER.index(keyword) if keyword in REPORT_PRIORITY_ORDER else len(REPORT_PRIORITY_ORDER) + 1
+
+def top_cards(board_data, per_list=None, per_board=None):
+    """One pass over the board keeping only the cards a bounded report shows
+
+    Returns [(list with just the chosen cards, [(card id, items, completed
+    items)] for every card)]. Each card is ranked by (priority, share of items
+    done, -items left, position) and a heap per list keeps the per_list best
+    (never more than per_board); the per_board best of those survive. Chosen cards keep their board order.
+    """
+    per_list = REPORT_TOP_CARDS if per_list is None else per_list
+    per_board = REPORT_TOP_BOARD if per_board is None else per_board
+    # the board's best are among each list's best, so no list needs more than either budget
+    keep_per_list = min([n for n in (per_list, per_board) if n] or [0])
+    lists, candidates = [], []
+    for li, lst in enumerate(board_data):
+        heap, counts = [], []
+        for ci, card in enumerate(lst.get("cards", [])):
+            items = completed = 0
             for cl in card.get("checklists", []):
-                cl_name = cl.get("name", "Checklist")
-                lines.append(f"│   📑 {cl_name}:")
-                for item in cl.get("checkItems", []):
-                    item_name = item.get("name", "")
-                    item_status = "✅" if item.get("state") == "complete" else "❌"
-                    lines.append(f"│   ├─ {item_name} - {item_status}")
-                    total_checklist_items += 1
-                    if item.get("state") == "complete":
-                        completed_checklist_items += 1
-
-            # Per-card Sora commentary (use simple tailored lines)
-            if card_done:
-                # praise line - pick from encouragements_done but short
-                praise = random.choice([
-                    "Yay! You finished this one :] Great job, Alex! (≧▽≦)",
-                    "Nice! This one is done — wonderful work! :)",
-                    "Amazing — you completed it, Alex! :]",
-                    "Nice finishing touch — well done! (•‿•)"
-                ])
-                lines.append(f"│   Note from Sora: {praise}")
+                check_items = cl.get("checkItems", [])
+                items += len(check_items)
+                completed += sum(1 for it in check_items if it.get("state") == "complete")
+            counts.append((card.get("id"), items, completed))
+            # negated rank, so the heap's smallest entry is the least important card kept so far
+            entry = ((-priority_rank(card), -(completed / items if items else 0.0), items - completed, -ci), ci, card)
+            if not keep_per_list or len(heap) < keep_per_list:
+                heapq.heappush(heap, entry)
+            else:
+                heapq.heappushpop(heap, entry)
+        # only the list's own fields, so a streamed list and its other cards can be freed now
+        lists.append(({k: v for k, v in lst.items() if k != "cards"}, counts, heap))
+        candidates.extend((entry[0], li, entry[1]) for entry in heap)
+    if per_board and len(candidates) > per_board:
+        keep = {(li, ci) for _, li, ci in heapq.nlargest(per_board, candidates)}
+    else:
+        keep = None
+    result = []
+    for li, (meta, counts, heap) in enumerate(lists):
+        chosen = sorted((ci, card) for _, ci, card in heap if keep is None or (li, ci) in keep)
+        meta["cards"] = [card for _, card in chosen]
+        result.append((meta, counts))
+    return result
+
+def rollup_text(hidden):
+    cards, completed_cards, items, completed_items = hidden
+    return (f"…and {cards} more card{'s' if cards != 1 else ''} ({completed_cards} done) "
+            f"with {items} checklist items ({completed_items} done)")
+
+NO_CHANGES = "Nothing changed since last time — a calm board (•‿•)"
+
+def change_rows(changes):
+    return [f"{card_name} ({list_name}) - {change}" for list_name, card_name, change in changes]
+
+def render_changes(changes):
+    """The "changes since last report" section"""
+    lines = ["🔄 Changes since last report", ""]
+    if not changes:
+        lines.append(NO_CHANGES)
+    lines.extend("├─ " + row for row in change_rows(changes))
+    lines.append("")
+    return lines
+
+def progress_text(progress, phrases):
+    """Sora's pace line for the summary"""
+    if progress["trend"] == "stalled":
+        return phrases["progress_stalled"].format(days=progress["window"])
+    text = phrases["progress"].format(velocity=progress["velocity"], trend=phrases["progress_trend"][progress["trend"]])
+    if progress["eta"] is not None:
+        eta = progress["eta"]
+        text += " " + phrases["progress_eta"].format(
+            date=eta.strftime("%B %d" if eta.year == datetime.now().year else "%B %d, %Y"))
+    return text
+
+def progress_rows(progress, lists):
+    """(heading, board rows, per-list rows) of the progress section, shared by every format"""
+    window = progress["window"]
+    bars = "▁▂▃▄▅▆▇█"
+    top = max(max(progress["weekly"]), 1)
+    spark = "".join(bars[max(0, min(7, round(w / top * 7)))] for w in progress["weekly"])
+    eta = progress["eta"].isoformat() if progress["eta"] is not None else "no burndown yet"
+    rows = [
+        f"Velocity: {progress['velocity']:.2f} items/day (previous {window} days: {progress['previous']:.2f})",
+        f"Burndown: {progress['burn_rate']:.2f} items/day, {progress['remaining']} left - projected done: {eta}",
+        f"Weekly completions: {spark}",
+    ]
+    list_rows = [f"{blist.name}: {int(done):+d} items, {blist.total_items - blist.completed_items} left"
+                 for blist, done in zip(lists, progress["lists_done"])]
+    return f"📈 Progress (last {window} days)", rows, list_rows
+
+def render_progress(progress, lists):
+    """The "progress" section: board pace, weekly completions, and items done per list"""
+    heading, rows, list_rows = progress_rows(progress, lists)
+    return [heading, ""] + ["├─ " + row for row in rows] + ["│   " + row for row in list_rows] + [""]
+
+# -----------------------------
+# Report formats: renderers writing into shared UTF-8 buffers
+# -----------------------------
+class ReportBuffer:
+    """One format's output: text written straight into a UTF-8 byte buffer
+
+    mark() records a chunk boundary (after each list); chunks() hands out
+    memoryviews into the single buffer, so nothing is joined or copied again.
+    """
+
+    def __init__(self):
+        self.raw = io.BytesIO()
+        self.text = io.TextIOWrapper(self.raw, encoding="utf-8", newline="\n")
+        self.write = self.text.write
+        self.marks = [0]
+
+    def mark(self):
+        self.text.flush()
+        self.marks.append(self.raw.tell())
+
+    def chunks(self):
+        self.mark()
+        self.text.detach()  # the wrapper must not close the buffer the views point into
+        return cut_chunks(self.raw.getbuffer(), self.marks)
+
+    def value(self):
+        """(bytes, chunk boundaries): the whole output in one piece, to send to another process"""
+        self.mark()
+        return self.text.detach().getvalue(), self.marks
+
+def cut_chunks(data, marks):
+    view = memoryview(data)
+    return [view[a:b] for a, b in zip(marks, marks[1:]) if b > a]
+
+class ReportChunks(list):
+    """A rendered report: its chunks, the format's name, and the other formats rendered alongside"""
+
+    def __init__(self, chunks, fmt="text", alternates=()):
+        super().__init__(chunks)
+        self.format = fmt
+        self.alternates = list(alternates)
+
+class Renderer:
+    """Writes one report format as the board model streams past
+
+    begin() writes whatever precedes the lists, write_list() sees each
+    BoardList once (notes already drawn), finish() gets the board totals,
+    changes and progress. Subclasses set the file extension and content type
+    used for the attachment.
+    """
+    extension = "txt"
+    content_type = "text/plain; charset=utf-8"
+
+    def __init__(self, cache=None):
+        self.out = ReportBuffer()
+        self.cache = cache
+        self.lists = 0
+
+    def begin(self):
+        pass
+
+    def write_list(self, blist):
+        raise NotImplementedError
+
+    def finish(self, board, changes=None, progress=None):
+        pass
+
+class TextRenderer(Renderer):
+    """The original text-tree report"""
+
+    def write_list(self, blist):
+        # newline-separated across lists, exactly like one "\n".join over the whole report
+        parts = [("\n" if self.lists else "") + f"📋 {blist.name}\n"]
+        for card in blist.cards:
+            block = card.block
+            if block is None:
+                block = render_card_block(card)
+                if self.cache is not None and card.cache_key is not None:
+                    self.cache.store(card, block)
+            parts.append(f"\n{block}\n│   Note from Sora: {card.note}\n")
+        if blist.hidden:
+            parts.append(f"\n└─ {rollup_text(blist.hidden)}\n")
+        parts.append("\n")  # spacing between lists
+        self.out.write("".join(parts))  # one write per list: the text wrapper's per-call cost adds up
+        self.lists += 1
+        self.out.mark()
+
+    def finish(self, board, changes=None, progress=None):
+        if changes is not None:
+            self.out.write("\n" + "\n".join(render_changes(changes)))
+            self.out.mark()
+        if progress is not None:
+            self.out.write("\n" + "\n".join(render_progress(progress, board.lists)))
+
+_md_escapes = str.maketrans({c: "\\" + c for c in "\\`*_[]<>#|"})
+
+def md_escape(text):
+    return text.translate(_md_escapes)
+
+class MarkdownRenderer(Renderer):
+    """Headings per list, task lists for checklist items"""
+    extension = "md"
+    content_type = "text/markdown; charset=utf-8"
+
+    def write_list(self, blist):
+        w = self.out.write
+        w(f"## 📋 {md_escape(blist.name)}\n\n")
+        for card in blist.cards:
+            w(f"- {'✅' if card.done else '❌'} {card.marker} **{md_escape(card.name)}**\n")
+            for cl in card.checklists:
+                w(f"  - 📑 {md_escape(cl.name)}\n")
+                w("".join(f"    - [{'x' if complete else ' '}] {md_escape(name)}\n" for name, complete in cl.items()))
+            w(f"  - *Note from Sora: {md_escape(card.note)}*\n")
+        if blist.hidden:
+            w(f"- *{rollup_text(blist.hidden)}*\n")
+        w("\n")
+        self.out.mark()
+
+    def finish(self, board, changes=None, progress=None):
+        w = self.out.write
+        w(f"---\n\n**{board.total_lists} lists · {board.total_cards} cards ({board.completed_cards} done) · "
+          f"{board.total_items} items ({board.completed_items} done)**\n")
+        if changes is not None:
+            w("\n## 🔄 Changes since last report\n\n")
+            w("".join(f"- {md_escape(row)}\n" for row in change_rows(changes)) or f"{NO_CHANGES}\n")
+        if progress is not None:
+            heading, rows, list_rows = progress_rows(progress, board.lists)
+            w(f"\n## {heading}\n\n")
+            w("".join(f"- {row}\n" for row in rows))
+            w("".join(f"  - {md_escape(row)}\n" for row in list_rows))
+
+class HtmlRenderer(Renderer):
+    """A compact standalone page: one line of markup per list"""
+    extension = "html"
+    content_type = "text/html; charset=utf-8"
+
+    def __init__(self, cache=None):
+        from html import escape
+        super().__init__(cache)
+        self.escape = escape
+
+    def begin(self):
+        self.out.write('<!DOCTYPE html><html><head><meta charset="utf-8"><title>Trello report</title></head><body>\n')
+
+    def write_list(self, blist):
+        e, w = self.escape, self.out.write
+        w(f"<h2>📋 {e(blist.name)}</h2><ul>")
+        for card in blist.cards:
+            w(f"<li>{e(card.marker)} {e(card.name)} - {'✅' if card.done else '❌'}<ul>")
+            for cl in card.checklists:
+                w(f"<li>📑 {e(cl.name)}:<ul>")
+                w("".join(f"<li>{e(name)} - {'✅' if complete else '❌'}</li>" for name, complete in cl.items()))
+                w("</ul></li>")
+            w(f"</ul><i>Note from Sora: {e(card.note)}</i></li>")
+        if blist.hidden:
+            w(f"<li><i>{rollup_text(blist.hidden)}</i></li>")
+        w("</ul>\n")
+        self.out.mark()
+
+    def finish(self, board, changes=None, progress=None):
+        e, w = self.escape, self.out.write
+        w(f"<p><b>{board.total_lists} lists · {board.total_cards} cards ({board.completed_cards} done) · "
+          f"{board.total_items} items ({board.completed_items} done)</b></p>\n")
+        if changes is not None:
+            w("<h2>🔄 Changes since last report</h2>")
+            rows = change_rows(changes)
+            w("<ul>" + "".join(f"<li>{e(row)}</li>" for row in rows) + "</ul>\n" if rows else f"<p>{NO_CHANGES}</p>\n")
+        if progress is not None:
+            heading, rows, list_rows = progress_rows(progress, board.lists)
+            w(f"<h2>{heading}</h2><ul>" + "".join(f"<li>{row}</li>" for row in rows))
+            w("<li>Per list:<ul>" + "".join(f"<li>{e(row)}</li>" for row in list_rows) + "</ul></li></ul>\n")
+        w("</body></html>\n")
+
+_report_encoder = json.JSONEncoder(ensure_ascii=False, check_circular=False, separators=(",", ":"))
+
+class JsonRenderer(Renderer):
+    """One JSON document, streamed list by list: {"lists": [...], "totals", "changes", "progress"}"""
+    extension = "json"
+    content_type = "application/json"
+
+    def begin(self):
+        self.out.write('{"lists":[')
+
+    def write_list(self, blist):
+        # cards are written as text rather than encoded from dicts: a dict per checklist item
+        # is millions of short-lived objects on a large board
+        enc, s = _report_encoder.encode, json.encoder.encode_basestring
+        w = self.out.write
+        w(("," if self.lists else "") + enc({
+            "id": blist.id,
+            "name": blist.name,
+            "total_cards": blist.total_cards,
+            "completed_cards": blist.completed_cards,
+            "total_items": blist.total_items,
+            "completed_items": blist.completed_items,
+        })[:-1] + ',"cards":[')
+        w(",".join(enc({
+            "id": card.id,
+            "name": card.name,
+            "marker": card.marker,
+            "done": card.done,
+            "total_items": card.total_items,
+            "completed_items": card.completed_items,
+        })[:-1] + ',"checklists":[' + ",".join(
+            f'{{"name":{s(cl.name)},"items":['
+            + ",".join(f'{{"name":{s(name)},"complete":{"true" if complete else "false"}}}' for name, complete in cl.items())
+            + "]}" for cl in card.checklists) + f'],"note":{enc(card.note)}}}' for card in blist.cards))
+        w('],"hidden":' + enc(None if blist.hidden is None else dict(zip(
+            ("cards", "completed_cards", "items", "completed_items"), blist.hidden))) + "}")
+        self.lists += 1
+        self.out.mark()
+
+    def finish(self, board, changes=None, progress=None):
+        if progress is not None:
+            progress = dict(progress, eta=progress["eta"] and progress["eta"].isoformat(), lists_done=[
+                {"list": blist.name, "done": int(done), "left": blist.total_items - blist.completed_items}
+                for blist, done in zip(board.lists, progress["lists_done"])])
+        self.out.write("]," + _report_encoder.encode({
+            "totals": {"lists": board.total_lists, "cards": board.total_cards,
+                       "completed_cards": board.completed_cards, "items": board.total_items,
+                       "completed_items": board.completed_items},
+            "changes": None if changes is None else [
+                {"list": list_name, "card": card_name, "change": change} for list_name, card_name, change in changes],
+            "progress": progress,
+        })[1:] + "\n")
+
+RENDERERS = {"text": TextRenderer, "markdown": MarkdownRenderer, "json": JsonRenderer, "html": HtmlRenderer}
+
+def report_formats(formats=None):
+    formats = formats or REPORT_FORMATS
+    unknown = [f for f in formats if f not in RENDERERS]
+    if unknown:
+        raise ValueError(f"Unknown report format(s): {', '.join(unknown)} (known: {', '.join(RENDERERS)})")
+    return formats
+
+def render_report(board_data, stats=None, history=None, formats=None):
+    """Render the report as UTF-8 chunks (one per list) plus the summary text
+
+    board_data may be any iterable of lists; each list is converted to the board
+    model and handed to every requested format's renderer as soon as it arrives,
+    so the Trello data is walked once however many formats a run asks for
+    (formats defaults to SORA_REPORT_FORMATS). The chunks returned are the first
+    format's; the others are in .alternates. If a stats dict is given it receives
+    the board totals and a (card id, items, completed items) tuple per card. With
+    a completion history (get_completion_history) the report and summary also
+    cover velocity and the projected completion date. A fully fetched board is
+    rendered in the process pool when SORA_RENDER_WORKERS > 1 (see render_reports).
+    """
+    return render_reports([(board_data, stats, history)], formats)[0]
+
+def render_serial(board_data, stats, history, formats):
+    board = Board()
+    cache = get_render_cache()
+    renderers = [RENDERERS[f](cache) for f in formats]
+    full = any(f != "text" for f in formats)  # cached cards skip their checklists, which only text can afford
+    changes = [] if cache is not None and REPORT_CHANGES else None
+    card_lists = {} if history is not None else None
+    progress = None
+    with phase("render"), gc_frozen():
+        for renderer in renderers:
+            renderer.begin()
+        bounded = REPORT_TOP_CARDS > 0 or REPORT_TOP_BOARD > 0
+        for lst, counts in top_cards(board_data) if bounded else ((lst, None) for lst in board_data):
+            blist = build_list(lst, cache, changes, full)
+            if counts is None:
+                counts = [(c.id, c.total_items, c.completed_items) for c in blist.cards]
             else:
-                pep = random.choice([
-                    "Keep going, Alex! You got this! :)",
-                    "A little push and this will be done — believe in you! :]",
-                    "You can do it — take it one step at a time (•‿•)",
-                    "Stay steady, Alex — small steps win the race (≧▽≦)"
-                ])
-                lines.append(f"│   Note from Sora: {pep}")
-
-            lines.append("")  # spacing between cards
-        lines.append("")  # spacing between lists
-
-    report_text = "\n".join(lines)
-    short_summary = sora_summary(
-        len(board_data),
-        total_cards,
-        completed_cards,
-        total_checklist_items,
-        completed_checklist_items
+                blist.roll_up(counts)
+            board.add(blist)
+            for renderer in renderers:
+                renderer.write_list(blist)
+            if stats is not None:
+                stats.setdefault("cards", []).extend(counts)
+            if card_lists is not None:
+                card_lists.update((card_id, board.total_lists - 1) for card_id, _, _ in counts)
+            blist.cards = ()  # rendered: keep only the counts
+        if history is not None:
+            with phase("analytics"):
+                progress = analyze_progress(history, card_lists, board.total_lists,
+                                            board.total_items, board.completed_items)
+        for renderer in renderers:
+            renderer.finish(board, changes, progress)
+        if cache is not None:
+            cache.save()
+    summary = board_summary(board, stats, progress)
+    return report_output(formats, [r.out.chunks() for r in renderers]), summary
+
+def board_summary(board, stats, progress):
+    """Board metrics, the stats totals, and Sora's summary (drawn after every card note)"""
+    metric_count("lists", board.total_lists)
+    metric_count("cards", board.total_cards)
+    metric_count("cards_completed", board.completed_cards)
+    metric_count("items", board.total_items)
+    metric_count("items_completed", board.completed_items)
+    if stats is not None:
+        stats.update(lists=board.total_lists, cards_total=board.total_cards, completed_cards=board.completed_cards,
+                     items=board.total_items, completed_items=board.completed_items)
+
+    return sora_summary(
+        board.total_lists,
+        board.total_cards,
+        board.completed_cards,
+        board.total_items,
+        board.completed_items,
+        progress,
     )
-    return report_text, short_summary
 
-def send_to_discord_file(report_text, summary):
-    """Send summary text then send the .txt file via webhook"""
-    # Send summary message (text)
-    post = requests.post(WEBHOOK_URL, json={"content": summary})
-    post.raise_for_status()
+def report_output(formats, chunks_per_format):
+    outputs = [ReportChunks(chunks, f) for f, chunks in zip(formats, chunks_per_format)]
+    metric_count("report_bytes", sum(len(c) for chunks in outputs for c in chunks))
+    outputs[0].alternates = outputs[1:]
+    return outputs[0]
+
+# -----------------------------
+# Parallel render: boards sharded by list across a process pool
+# -----------------------------
+def render_reports(jobs, formats=None):
+    """Render several boards: [(board_data, stats, history), ...] -> [(chunks, summary), ...]
+
+    Serial (render_serial) unless SORA_RENDER_WORKERS > 1. Then each fully
+    fetched board is cut into shards of whole lists (shard_lists) and the
+    shards of every board are formatted in the process pool at once. Sora's
+    notes and summaries are drawn here, in the serial order, so the output is
+    byte-identical to the serial path; the per-list counts the workers return
+    must match the ones counted while sharding. With the render cache on, in
+    bounded mode, or for streamed board data, boards are rendered serially.
+    """
+    formats = report_formats(formats)
+    if RENDER_WORKERS <= 1 or get_render_cache() is not None or REPORT_TOP_CARDS > 0 or REPORT_TOP_BOARD > 0:
+        return [render_serial(board_data, stats, history, formats) for board_data, stats, history in jobs]
+    planned = []
+    for board_data, stats, history in jobs:
+        if isinstance(board_data, list):
+            planned.append(ShardedReport(board_data, stats, history, formats))
+        else:
+            planned.append(render_serial(board_data, stats, history, formats))
+    shards = [shard for plan in planned if isinstance(plan, ShardedReport) for shard in plan.shards]
+    with phase("render"):
+        if sum(plan.items for plan in planned if isinstance(plan, ShardedReport)) < RENDER_SHARD_ITEMS:
+            rendered = iter([render_shard(shard) for shard in shards])  # not worth a trip to the pool
+        else:
+            rendered = get_render_pool().map(render_shard, shards)
+        return [plan.collect(rendered) if isinstance(plan, ShardedReport) else plan for plan in planned]
+
+class ShardedReport:
+    """One board's share of a parallel render: shards out, counts and summary in
+
+    Built in the parent: walks the Trello lists once, drawing each card's note
+    and packing the lists into shards, then renders everything that is not a
+    list (format headers and trailers, progress, summary) from the counts.
+    """
+
+    def __init__(self, board_data, stats, history, formats):
+        self.formats = formats
+        self.board = Board()
+        self.shards = []
+        self.items = 0
+        card_lists = {} if history is not None else None
+        phrases = load_phrases()
+        renderers = [RENDERERS[f]() for f in formats]
+        for renderer in renderers:
+            renderer.begin()
+        self.heads = [r.out.chunks() for r in renderers]
+
+        with phase("render"):
+            batch, batch_items = [], 0
+            for lst in board_data:
+                packed, blist, cards = shard_list(lst, phrases)
+                self.board.add(blist)
+                if stats is not None:
+                    stats.setdefault("cards", []).extend(cards)
+                if card_lists is not None:
+                    card_lists.update((card_id, self.board.total_lists - 1) for card_id, _, _ in cards)
+                batch.append(packed)
+                batch_items += blist.total_items + blist.total_cards
+                if batch_items >= RENDER_SHARD_ITEMS:
+                    self.add_shard(batch)
+                    batch, batch_items = [], 0
+            if batch:
+                self.add_shard(batch)
+        self.items = self.board.total_items
+
+        progress = None
+        if history is not None:
+            with phase("analytics"):
+                progress = analyze_progress(history, card_lists, self.board.total_lists,
+                                            self.board.total_items, self.board.completed_items)
+        for renderer in renderers:
+            renderer.out = ReportBuffer()
+            renderer.finish(self.board, None, progress)
+        self.tails = [r.out.chunks() for r in renderers]
+        self.summary = board_summary(self.board, stats, progress)
+
+    def add_shard(self, lists):
+        first = self.board.total_lists - len(lists)
+        self.shards.append(marshal.dumps((self.formats, first, lists)))
+
+    def collect(self, rendered):
+        """Take this board's shards from the rendered stream: (chunks, summary)"""
+        chunks = [list(head) for head in self.heads]
+        counts = []
+        for _ in self.shards:
+            outputs, shard_counts = next(rendered)
+            for out, (data, marks) in zip(chunks, outputs):
+                out.extend(cut_chunks(data, marks))
+            counts.extend(shard_counts)
+        expected = [(b.total_cards, b.completed_cards, b.total_items, b.completed_items) for b in self.board.lists]
+        if counts != expected:
+            raise RuntimeError("render shards disagree with the board counts")
+        for out, tail in zip(chunks, self.tails):
+            out.extend(tail)
+        return report_output(self.formats, chunks), self.summary
+
+def shard_list(lst, phrases):
+    """Pack one Trello list as flat columns for render_shard; draws the card notes
+
+    Returns (packed list, counts-only BoardList, [(card id, items, completed items)]).
+    """
+    cards = lst.get("cards", [])
+    ids, names, markers, notes, n_checklists = [], [], [], [], []
+    checklist_names, n_items, item_names = [], [], []
+    states = bytearray()
+    counts = []
+    completed_cards = 0
+    for card in cards:
+        checklists = card.get("checklists", [])
+        first = len(states)
+        for cl in checklists:
+            items = cl.get("checkItems", [])
+            checklist_names.append(cl.get("name", "Checklist"))
+            n_items.append(len(items))
+            for it in items:
+                item_names.append(it.get("name", ""))
+                states.append(it.get("state") == "complete")
+        total, completed = len(states) - first, states.count(1, first)
+        done = total > 0 and completed == total
+        completed_cards += done
+        ids.append(card.get("id"))
+        names.append(card.get("name", "Untitled card"))
+        markers.append(get_priority_emoji(card))
+        n_checklists.append(len(checklists))
+        notes.append(random.choice(phrases["card_praise"] if done else phrases["card_pep"]))
+        counts.append((card.get("id"), total, completed))
+    list_id, name = lst.get("id"), lst.get("name", "Unnamed list")
+    packed = (list_id, name, ids, names, markers, notes, n_checklists, checklist_names, n_items, item_names,
+              bytes(states))
+    return packed, BoardList.counted(list_id, name, len(cards), completed_cards, len(states), states.count(1)), counts
+
+def render_shard(shard):
+    """Pool worker: format one shard's lists in every requested format
+
+    Returns ([(bytes, chunk boundaries)] per format, [(cards, completed cards,
+    items, completed items)] per list).
+    """
+    formats, first, lists = marshal.loads(shard)
+    renderers = [RENDERERS[f]() for f in formats]
+    for renderer in renderers:
+        renderer.lists = first
+    counts = []
+    for list_id, name, ids, names, markers, notes, n_checklists, checklist_names, n_items, item_names, states in lists:
+        cards = []
+        ci = ii = 0  # checklist / item cursors
+        for card_id, card_name, marker, note, k in zip(ids, names, markers, notes, n_checklists):
+            checklists = []
+            for cl_name, n in zip(checklist_names[ci:ci + k], n_items[ci:ci + k]):
+                checklists.append(Checklist(cl_name, tuple(item_names[ii:ii + n]), states[ii:ii + n]))
+                ii += n
+            ci += k
+            card = Card(card_id, card_name, marker, tuple(checklists))
+            card.note = note
+            cards.append(card)
+        blist = BoardList(list_id, name, tuple(cards))
+        for renderer in renderers:
+            renderer.write_list(blist)
+        counts.append((blist.total_cards, blist.completed_cards, blist.total_items, blist.completed_items))
+    return [r.out.value() for r in renderers], counts
+
+_render_pool = None
+
+def get_render_pool():
+    global _render_pool
+    if _render_pool is None:
+        # spawn, not fork: the parent has live threads (dispatcher, HTTP pool) that a fork would copy mid-flight
+        import multiprocessing
+        from concurrent.futures import ProcessPoolExecutor
+        _render_pool = ProcessPoolExecutor(RENDER_WORKERS, mp_context=multiprocessing.get_context("spawn"))
+    return _render_pool
+
+def generate_report(board_data):
+    """Generate full .txt report and summary counts"""
+    chunks, short_summary = render_report(board_data)
+    return b"".join(chunks).decode("utf-8"), short_summary
+
+class MultipartFile:
+    """Seekable, sized multipart/form-data body streaming one file from a list of byte chunks
+
+    Having a length lets requests send a normal Content-Length upload (no chunked
+    encoding); seek(0) lets http_request resend it on retry.
+    """
+
+    def __init__(self, field, filename, chunks, content_type="text/plain; charset=utf-8"):
+        self._build([(field, filename, chunks, content_type)])
+
+    @classmethod
+    def form(cls, files, fields=None):
+        """One body with several (field, filename, chunks, content type) files and JSON fields"""
+        body = cls.__new__(cls)
+        body._build(files, fields)
+        return body
+
+    def _build(self, files, fields=None):
+        import uuid
+        boundary = uuid.uuid4().hex
+        self.content_type = f"multipart/form-data; boundary={boundary}"
+        self.parts = []
+        for name, value in (fields or {}).items():
+            self.parts.append((
+                f"--{boundary}\r\n"
+                f'Content-Disposition: form-data; name="{name}"\r\n'
+                f"Content-Type: application/json\r\n\r\n{value}\r\n"
+            ).encode("utf-8"))
+        for field, filename, chunks, content_type in files:
+            self.parts.append((
+                f"--{boundary}\r\n"
+                f'Content-Disposition: form-data; name="{field}"; filename="{filename}"\r\n'
+                f"Content-Type: {content_type}\r\n\r\n"
+            ).encode("utf-8"))
+            self.parts.extend(chunks)  # shared with every other body built from the same report
+            self.parts.append(b"\r\n")
+        self.parts.append(f"--{boundary}--\r\n".encode("utf-8"))
+        self.length = sum(len(p) for p in self.parts)
+        self.seek(0)
+
+    def __len__(self):
+        return self.length
+
+    def seek(self, offset, whence=0):
+        if offset or whence:
+            raise ValueError("MultipartFile can only be rewound to the start")
+        self.index = 0
+        self.offset = 0
+
+    def read(self, size=-1):
+        out = []
+        want = self.length if size is None or size < 0 else size
+        while want > 0 and self.index < len(self.parts):
+            part = self.parts[self.index]
+            piece = part[self.offset:self.offset + want]
+            out.append(piece)
+            want -= len(piece)
+            self.offset += len(piece)
+            if self.offset >= len(part):
+                self.index += 1
+                self.offset = 0
+        return b"".join(out)
+
+# -----------------------------
+# Attachment planning: compression + splitting at list boundaries
+# -----------------------------
+def split_oversized(chunks, limit):
+    """Split any chunk larger than limit at line boundaries (a single huge list)"""
+    for chunk in chunks:
+        if len(chunk) > limit:
+            chunk = bytes(chunk)  # buffer views have no rfind
+        while len(chunk) > limit:
+            cut = chunk.rfind(b"\n", 0, limit) + 1 or limit
+            yield chunk[:cut]
+            chunk = chunk[cut:]
+        if chunk:
+            yield chunk
+
+def group_plain(chunks, limit):
+    """Greedily pack chunks into groups whose total size stays within limit"""
+    groups, current, size = [], [], 0
+    for chunk in split_oversized(chunks, limit):
+        if current and size + len(chunk) > limit:
+            groups.append(current)
+            current, size = [], 0
+        current.append(chunk)
+        size += len(chunk)
+    if current or not groups:
+        groups.append(current)
+    return groups
+
+def group_compressed(chunks, limit):
+    """Pack chunks into groups whose gzip-compressed size stays within limit
 
-    # Write file
-    with open("trello_report.txt", "w", encoding="utf-8") as f:
-        f.write(report_text)
+    Returns (raw chunk group, gzip bytes) pairs. The compressor state is copied
+    before each chunk so a group can be closed exactly at the last chunk that fits.
+    """
+    groups = []
+    comp, out, current = zlib.compressobj(6, zlib.DEFLATED, 31), [], []
+    for chunk in split_oversized(chunks, limit):
+        trial = comp.copy()
+        data = trial.compress(chunk)
+        closed_size = sum(map(len, out)) + len(data) + len(trial.copy().flush())
+        if current and closed_size > limit:
+            groups.append((current, b"".join(out) + comp.flush()))
+            comp, out, current = zlib.compressobj(6, zlib.DEFLATED, 31), [], []
+            trial = comp.copy()
+            data = trial.compress(chunk)
+        comp = trial
+        out.append(data)
+        current.append(chunk)
+    groups.append((current, b"".join(out) + comp.flush()))
+    return groups
 
-    # Send file
-    with open("trello_report.txt", "rb") as f:
-        r = requests.post(WEBHOOK_URL, files={"file": f})
+def zip_bytes(name, chunks):
+    import io
+    import zipfile
+    buf = io.BytesIO()
+    with zipfile.ZipFile(buf, "w", zipfile.ZIP_DEFLATED, compresslevel=6) as zf:
+        with zf.open(name, "w") as f:
+            for chunk in chunks:
+                f.write(chunk)
+    return buf.getvalue()
+
+def plan_attachments(chunks, compression=None, limit=None, fmt="text"):
+    """Decide how the report is uploaded: list of (filename, [bytes chunks], content type)"""
+    compression = compression or REPORT_COMPRESSION
+    limit = (limit or ATTACHMENT_LIMIT) - ATTACHMENT_MARGIN
+    renderer = RENDERERS[fmt]
+    total = sum(len(c) for c in chunks)
+    if compression == "none" or (compression == "auto" and total <= limit):
+        groups = [(g, None) for g in group_plain(chunks, limit)]
+        ext, ctype = renderer.extension, renderer.content_type
+    else:
+        groups = group_compressed(chunks, limit)
+        if compression == "zip":
+            ext, ctype = "zip", "application/zip"
+        else:
+            ext, ctype = f"{renderer.extension}.gz", "application/gzip"
+
+    parts = []
+    for i, (raw, gz) in enumerate(groups, 1):
+        base = "trello_report" if len(groups) == 1 else f"trello_report.part{i}of{len(groups)}"
+        if gz is None:
+            body = raw
+        elif ext == "zip":
+            body = [zip_bytes(f"{base}.{renderer.extension}", raw)]
+        else:
+            body = [gz]
+        parts.append((f"{base}.{ext}", body, ctype))
+    return parts
+
+def upload_attachment(part, webhook=None):
+    filename, chunks, content_type = part
+    body = MultipartFile("file", filename, chunks, content_type)
+    with phase("upload"):
+        r = http_request("POST", webhook or WEBHOOK_URL, data=body, headers={"Content-Type": body.content_type})
         r.raise_for_status()
+    metric_count("bytes_out", len(body))
+
+def prepare_report(report, summary):
+    """Encode and plan the attachments once: (summary, parts) ready for any number of webhooks
+
+    Formats rendered alongside the main one (render_report's .alternates) become
+    extra attachments; only the main one is dumped to SORA_REPORT_DUMP.
+    """
+    chunks = [report.encode("utf-8")] if isinstance(report, str) else report
+    parts = plan_attachments(chunks, fmt=getattr(chunks, "format", "text"))
+    if len(parts) > 1:
+        summary += f"\n(It's a big one, so I split it into {len(parts)} parts!)"
+    for alternate in getattr(chunks, "alternates", ()):
+        parts += plan_attachments(alternate, fmt=alternate.format)
+    metric_count("attachment_parts", len(parts))
+
+    # Optional debug copy
+    if REPORT_DUMP_FILE:
+        with open(REPORT_DUMP_FILE, "wb") as f:
+            f.writelines(chunks)
+    return summary, parts
+
+def post_report(summary, parts, webhook=None, sent=(), on_sent=None):
+    """Summary message, then the attachment part(s), to one webhook
+
+    Messages are numbered 0 (the summary) and 1.. (the parts). Those in `sent`
+    are skipped and on_sent(n) is called as each one is accepted, which is how
+    the outbox resumes a half-delivered report.
+    """
+    if 0 not in sent:
+        with phase("upload"):
+            post = http_request("POST", webhook or WEBHOOK_URL, json={"content": summary})
+            post.raise_for_status()
+        metric_count("bytes_out", len(summary.encode("utf-8")))
+        if on_sent is not None:
+            on_sent(0)
+
+    def upload(n, part):
+        upload_attachment(part, webhook)
+        if on_sent is not None:
+            on_sent(n)
+
+    # Send file(s) straight from memory; the webhook's token bucket paces parallel parts
+    todo = [(n, part) for n, part in enumerate(parts, 1) if n not in sent]
+    if len(todo) <= 1:
+        for n, part in todo:
+            upload(n, part)
+        return
+    from concurrent.futures import ThreadPoolExecutor
+    with ThreadPoolExecutor(max_workers=max(1, min(UPLOAD_WORKERS, len(todo)))) as pool:
+        for fut in [pool.submit(upload, n, part) for n, part in todo]:
+            fut.result()
+
+def send_to_discord_file(report, summary):
+    """Send summary text then send the .txt file via webhook
+
+    report is either the text from generate_report or the chunks from render_report.
+    Reports over the attachment limit are compressed and/or split into parts at
+    list boundaries, uploaded in parallel.
+    """
+    post_report(*prepare_report(report, summary))
+
+# -----------------------------
+# Fan-out dispatch: routed reports, one queue and worker per webhook
+# -----------------------------
+class DeliveryFailed(Exception):
+    """A routed report did not reach every webhook; .failures maps webhook -> error"""
+
+    def __init__(self, board_id, failures, total):
+        super().__init__(f"board {board_id}: {len(failures)} of {total} webhooks failed: "
+                         + "; ".join(str(e) for e in failures.values()))
+        self.failures = failures
+        self.total = total
+
+class Delivery:
+    """One rendered report on its way to all of its webhooks (the planned parts are shared)
+
+    With a key the report is in the outbox: messages accepted by a webhook and the
+    per-webhook outcome are written through, and `sent` holds what an earlier run
+    already got through (webhook -> message numbers, see post_report).
+    """
+
+    def __init__(self, board_id, summary, parts, webhooks, key=None, sent=None):
+        self.board_id = board_id
+        self.summary = summary
+        self.parts = parts
+        self.size = sum(len(c) for _, chunks, _ in parts for c in chunks)
+        self.webhooks = webhooks
+        self.key = key
+        self.sent = sent or {}
+        self.failures = {}
+        self.pending = len(webhooks)
+        self.lock = threading.Lock()
+        self.done = threading.Event()
+        if not webhooks:
+            self.done.set()
+
+    def mark_sent(self, webhook, n):
+        with self.lock:
+            sent = self.sent.setdefault(webhook, set())
+            sent.add(n)
+            sent = sorted(sent)
+        if self.key is not None:
+            outbox_mark_sent(self.key, webhook, sent)
+
+    def finish(self, webhook, error=None):
+        if self.key is not None:
+            outbox_finish(self.key, webhook, error)
+        with self.lock:
+            if error is not None:
+                self.failures[webhook] = error
+            self.pending -= 1
+            if self.pending == 0:
+                self.done.set()
+
+    def wait(self):
+        """Block until every webhook was tried; raise DeliveryFailed if any of them failed"""
+        self.done.wait()
+        if self.failures:
+            raise DeliveryFailed(self.board_id, self.failures, len(self.webhooks))
+
+def routes_for(board_id):
+    return ROUTES.get(board_id) or ROUTES.get("*") or ([WEBHOOK_URL] if WEBHOOK_URL else [])
+
+class Dispatcher:
+    """Per-webhook delivery queues
+
+    A report is planned once and its Delivery is queued on every webhook it is
+    routed to. Each webhook has its own worker thread, so a slow or failing
+    channel only holds up itself. A worker waits up to DISPATCH_LINGER for more
+    reports, then posts as many as fit in one message (DISCORD_MAX_FILES files,
+    the attachment limit, DISCORD_MAX_CONTENT characters) as a single multipart
+    POST. http_request's route bucket for that webhook paces the posts.
+    """
+
+    def __init__(self, linger=None):
+        self.linger = DISPATCH_LINGER if linger is None else linger
+        self.queues = {}
+        self.lock = threading.Lock()
+
+    def submit(self, board_id, report, summary, webhooks=None):
+        summary, parts = prepare_report(report, summary)
+        webhooks = list(webhooks or routes_for(board_id))
+        if not OUTBOX:
+            return self.queue(Delivery(board_id, summary, parts, webhooks))
+        key, pending = outbox_put(board_id, summary, parts, webhooks)
+        return self.queue(Delivery(board_id, summary, parts, list(pending), key, pending))
+
+    def queue(self, delivery):
+        for webhook in delivery.webhooks:
+            self.webhook_queue(webhook).put(delivery)
+        return delivery
+
+    def webhook_queue(self, webhook):
+        import queue
+        with self.lock:
+            q = self.queues.get(webhook)
+            if q is None:
+                q = self.queues[webhook] = queue.Queue()
+                threading.Thread(target=self.worker, args=(webhook, q), daemon=True).start()
+            return q
+
+    def worker(self, webhook, q):
+        import queue
+        carry = None
+        while True:
+            batch = [carry or q.get()]
+            carry = None
+            deadline = time.monotonic() + self.linger
+            while True:
+                try:
+                    nxt = q.get(timeout=max(0.0, deadline - time.monotonic()))
+                except queue.Empty:
+                    break
+                if batch[0].sent.get(webhook) or nxt.sent.get(webhook) or not fits_one_message(batch + [nxt]):
+                    carry = nxt  # half-delivered reports resume on their own
+                    break
+                batch.append(nxt)
+            try:
+                post_batch(webhook, batch)
+            except Exception as e:
+                for delivery in batch:
+                    delivery.finish(webhook, e)
+            else:
+                for delivery in batch:
+                    delivery.finish(webhook)
+
+def batch_content(batch):
+    if len(batch) == 1:
+        return batch[0].summary
+    return "\n\n".join(f"📋 Board {d.board_id}\n{d.summary}" for d in batch)
+
+def fits_one_message(batch):
+    return (sum(len(d.parts) for d in batch) <= DISCORD_MAX_FILES
+            and sum(d.size for d in batch) <= ATTACHMENT_LIMIT - ATTACHMENT_MARGIN
+            and len(batch_content(batch)) <= DISCORD_MAX_CONTENT)
+
+def post_batch(webhook, batch):
+    """Post deliveries to one webhook: several reports as one message, or one report the usual way"""
+    if len(batch) == 1 and (batch[0].sent.get(webhook) or not fits_one_message(batch)):
+        d = batch[0]
+        post_report(d.summary, d.parts, webhook, d.sent.get(webhook, ()), lambda n: d.mark_sent(webhook, n))
+        return
+    files = []
+    for d in batch:
+        prefix = f"{d.board_id}-" if len(batch) > 1 else ""
+        files += [(f"files[{len(files) + i}]", prefix + filename, chunks, ctype)
+                  for i, (filename, chunks, ctype) in enumerate(d.parts)]
+    body = MultipartFile.form(files, {"payload_json": json.dumps({"content": batch_content(batch)})})
+    with phase("upload"):
+        r = http_request("POST", webhook, data=body, headers={"Content-Type": body.content_type})
+        r.raise_for_status()
+    metric_count("bytes_out", len(body))
+    metric_count("dispatch_batches")
+
+_dispatcher = None
+
+def get_dispatcher():
+    global _dispatcher
+    with _session_lock:
+        if _dispatcher is None:
+            _dispatcher = Dispatcher()
+        return _dispatcher
+
+def deliver_report(board_id, report, summary):
+    """Send a board's report to its routed webhooks (or DISCORD_WEBHOOK without SORA_ROUTES)"""
+    if not ROUTES and not OUTBOX:
+        send_to_discord_file(report, summary)
+        return
+    get_dispatcher().submit(board_id or TRELLO_BOARD_IDS[0], report, summary).wait()
 
 # -----------------------------
 # Main: progressive probability + random delay
 # -----------------------------
-def read_last_run():
+def read_last_run_file():
+    """Last run date from the pre-history last_run.txt, if one is lying around"""
     if os.path.exists(LAST_RUN_FILE):
         try:
             with open(LAST_RUN_FILE, "r", encoding="utf-8") as f:
@@ -598,52 +2885,633 @@ def read_last_run():
             return None
     return None
 
-def write_last_run(date_obj):
-    with open(LAST_RUN_FILE, "w", encoding="utf-8") as f:
-        f.write(date_obj.strftime("%Y-%m-%d"))
+# -----------------------------
+# Run history (SQLite, WAL so several boards / processes can write at once)
+# -----------------------------
+STATE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY,
+    ts REAL NOT NULL,
+    board_id TEXT NOT NULL,
+    decision TEXT NOT NULL,
+    status TEXT,
+    lists INTEGER,
+    cards INTEGER,
+    completed_cards INTEGER,
+    items INTEGER,
+    completed_items INTEGER,
+    delay_s INTEGER,
+    fetch_s REAL,
+    render_s REAL,
+    send_s REAL,
+    error TEXT
+);
+CREATE INDEX IF NOT EXISTS runs_by_board_status ON runs (board_id, status, ts);
+CREATE TABLE IF NOT EXISTS card_snapshots (
+    run_id INTEGER NOT NULL REFERENCES runs (id),
+    card_id TEXT NOT NULL,
+    items INTEGER NOT NULL,
+    completed_items INTEGER NOT NULL,
+    PRIMARY KEY (run_id, card_id)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS fetch_stats (
+    board_id TEXT NOT NULL,
+    strategy TEXT NOT NULL,
+    bytes INTEGER NOT NULL,
+    cards INTEGER NOT NULL,
+    fetches INTEGER NOT NULL,
+    PRIMARY KEY (board_id, strategy)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS outbox (
+    key TEXT PRIMARY KEY,
+    board_id TEXT NOT NULL,
+    created REAL NOT NULL,
+    summary TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS outbox_by_board ON outbox (board_id, created);
+CREATE TABLE IF NOT EXISTS outbox_parts (
+    key TEXT NOT NULL REFERENCES outbox (key),
+    seq INTEGER NOT NULL,
+    filename TEXT NOT NULL,
+    content_type TEXT NOT NULL,
+    body BLOB NOT NULL,
+    PRIMARY KEY (key, seq)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS outbox_targets (
+    key TEXT NOT NULL REFERENCES outbox (key),
+    webhook TEXT NOT NULL,
+    status TEXT NOT NULL DEFAULT 'pending',
+    sent TEXT NOT NULL DEFAULT '[]',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    error TEXT,
+    PRIMARY KEY (key, webhook)
+) WITHOUT ROWID;
+"""
+_state_schema_ready = False
+
+def connect_state_db():
+    """Open the run history (autocommit; writers use BEGIN IMMEDIATE and wait on each other)"""
+    import sqlite3
+    global _state_schema_ready
+    conn = sqlite3.connect(STATE_DB, timeout=30, isolation_level=None)
+    if not _state_schema_ready:
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.executescript(STATE_SCHEMA)
+        _state_schema_ready = True
+    conn.execute("PRAGMA synchronous=NORMAL")
+    return conn
+
+@contextmanager
+def state_transaction():
+    """A write transaction on the state DB, rolled back if the block raises"""
+    conn = connect_state_db()
+    try:
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield conn
+            conn.execute("COMMIT")
+        except BaseException:
+            if conn.in_transaction:
+                conn.execute("ROLLBACK")
+            raise
+    finally:
+        conn.close()
+
+def record_run(board_id, decision, status=None, stats=None, timings=None, delay=None, error=None):
+    """Append one run (decision "skipped", "sent" or "resumed", status "delivered" / "failed") with its card snapshot"""
+    stats = stats or {}
+    timings = timings or {}
+    try:
+        with state_transaction() as conn:
+            run_id = conn.execute(
+                "INSERT INTO runs (ts, board_id, decision, status, lists, cards, completed_cards, items,"
+                " completed_items, delay_s, fetch_s, render_s, send_s, error)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (time.time(), board_id, decision, status, stats.get("lists"), stats.get("cards_total"),
+                 stats.get("completed_cards"), stats.get("items"), stats.get("completed_items"), delay,
+                 timings.get("fetch"), timings.get("render"), timings.get("send"), error),
+            ).lastrowid
+            conn.executemany(
+                "INSERT OR REPLACE INTO card_snapshots VALUES (?, ?, ?, ?)",
+                ((run_id, card_id, items, done) for card_id, items, done in stats.get("cards", ()) if card_id),
+            )
+    except Exception as e:
+        print(f"[Sora] Could not record run for board {board_id}:", e)
+
+def read_last_run(board_ids=None):
+    """Date of the latest delivered report for any of the boards (one index lookup per board)"""
+    last = None
+    try:
+        conn = connect_state_db()
+        try:
+            for board_id in board_ids or TRELLO_BOARD_IDS:
+                (ts,) = conn.execute("SELECT MAX(ts) FROM runs WHERE board_id = ? AND status IN ('delivered', 'partial')",
+                                     (board_id,)).fetchone()
+                if ts is not None and (last is None or ts > last):
+                    last = ts
+        finally:
+            conn.close()
+    except Exception as e:
+        print("[Sora] Could not read run history:", e)
+    return datetime.fromtimestamp(last).date() if last is not None else None
+
+def redact(error):
+    """Error text safe to store: request errors quote the URL, which carries the Trello credentials or webhook token"""
+    error = re.sub(r"\b(key|token)=[^&\s]+", r"\1=<redacted>", str(error))
+    return re.sub(r"(/webhooks/[^/\s]+/)[^/?\s]+", r"\1<redacted>", error)
+
+class RunLog:
+    """One report run on its way to the history: counts (filled by render_report), timings, outcome"""
+
+    def __init__(self, board_id=None, delay=None, decision="sent"):
+        self.board_id = board_id or TRELLO_BOARD_IDS[0]
+        self.delay = delay
+        self.decision = decision
+        self.stats = {}
+        self.timings = {}
+
+    @contextmanager
+    def timed(self, name):
+        t0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.timings[name] = self.timings.get(name, 0.0) + time.perf_counter() - t0
+
+    def finish(self, status, error=None):
+        if isinstance(error, DeliveryFailed) and len(error.failures) < error.total:
+            status = "partial"  # reached some of its channels: counts as a report for scheduling
+        if error is not None:
+            error = redact(error)
+        record_run(self.board_id, self.decision, status, self.stats, self.timings, self.delay, error)
+
+# -----------------------------
+# Durable outbox: rendered reports in the state DB until every webhook has them
+# -----------------------------
+def webhook_id(webhook):
+    """How the state DB names a webhook (never the URL itself: it carries the token)"""
+    return hashlib.blake2b(webhook.encode("utf-8"), digest_size=8).hexdigest()
+
+def outbox_put(board_id, summary, parts, webhooks):
+    """Store a planned report before its first send; returns (key, {webhook: messages already sent})
+
+    The key hashes the board, summary and attachment bytes, so storing the same
+    report again is a no-op: only webhooks still owed it come back, with their
+    progress so far.
+    """
+    h = hashlib.blake2b(board_id.encode("utf-8"), digest_size=16)
+    h.update(summary.encode("utf-8"))
+    bodies = []
+    for filename, chunks, content_type in parts:
+        body = b"".join(chunks)
+        h.update(filename.encode("utf-8"))
+        h.update(body)
+        bodies.append((filename, content_type, body))
+    key = h.hexdigest()
+    with state_transaction() as conn:
+        if conn.execute("INSERT OR IGNORE INTO outbox VALUES (?, ?, ?, ?)",
+                        (key, board_id, time.time(), summary)).rowcount:
+            conn.executemany("INSERT INTO outbox_parts VALUES (?, ?, ?, ?, ?)",
+                             ((key, seq, *part) for seq, part in enumerate(bodies, 1)))
+        conn.executemany("INSERT OR IGNORE INTO outbox_targets (key, webhook) VALUES (?, ?)",
+                         ((key, webhook_id(w)) for w in webhooks))
+        state = dict(conn.execute("SELECT webhook, sent FROM outbox_targets WHERE key = ? AND status = 'pending'",
+                                  (key,)).fetchall())
+    metric_count("outbox_bytes", sum(len(body) for _, _, body in bodies))
+    return key, {w: set(json.loads(state[webhook_id(w)])) for w in webhooks if webhook_id(w) in state}
+
+def outbox_mark_sent(key, webhook, sent):
+    with state_transaction() as conn:
+        conn.execute("UPDATE outbox_targets SET sent = ? WHERE key = ? AND webhook = ?",
+                     (json.dumps(sent), key, webhook_id(webhook)))
+
+def outbox_finish(key, webhook, error=None):
+    """Record one webhook's outcome; a report nobody is still owed drops its attachment bytes"""
+    try:
+        with state_transaction() as conn:
+            if error is None:
+                conn.execute("UPDATE outbox_targets SET status = 'delivered', error = NULL WHERE key = ? AND webhook = ?",
+                             (key, webhook_id(webhook)))
+            else:
+                conn.execute("UPDATE outbox_targets SET attempts = attempts + 1, error = ?,"
+                             " status = CASE WHEN attempts + 1 >= ? THEN 'dead' ELSE 'pending' END"
+                             " WHERE key = ? AND webhook = ?",
+                             (redact(error), OUTBOX_MAX_ATTEMPTS, key, webhook_id(webhook)))
+            if not conn.execute("SELECT 1 FROM outbox_targets WHERE key = ? AND status = 'pending'",
+                                (key,)).fetchone():
+                conn.execute("DELETE FROM outbox_parts WHERE key = ?", (key,))
+    except Exception as e:
+        print(f"[Sora] Could not update the outbox for report {key}:", e)
+
+def outbox_pending(board_ids):
+    """Deliveries earlier runs still owe these boards' webhooks, oldest first
+
+    Reports older than SORA_OUTBOX_MAX_AGE_HOURS are dropped, as are webhooks
+    that are no longer configured for the board.
+    """
+    deliveries = []
+    with state_transaction() as conn:
+        expired = "SELECT key FROM outbox WHERE created < ?"
+        cutoff = time.time() - OUTBOX_MAX_AGE_HOURS * 3600
+        (dropped,) = conn.execute(f"SELECT COUNT(*) FROM outbox_targets WHERE status = 'pending' AND key IN ({expired})",
+                                  (cutoff,)).fetchone()
+        for table in ("outbox_parts", "outbox_targets"):
+            conn.execute(f"DELETE FROM {table} WHERE key IN ({expired})", (cutoff,))
+        conn.execute("DELETE FROM outbox WHERE created < ?", (cutoff,))
+        if dropped:
+            print(f"[Sora] Gave up on {dropped} delivery(ies) older than {OUTBOX_MAX_AGE_HOURS:g} hours")
+
+        for board_id in board_ids:
+            configured = {webhook_id(w): w for w in routes_for(board_id)}
+            for key, summary in conn.execute("SELECT key, summary FROM outbox WHERE board_id = ? ORDER BY created",
+                                             (board_id,)).fetchall():
+                sent = {}
+                for wid, messages in conn.execute("SELECT webhook, sent FROM outbox_targets"
+                                                  " WHERE key = ? AND status = 'pending'", (key,)).fetchall():
+                    if wid in configured:
+                        sent[configured[wid]] = set(json.loads(messages))
+                    else:
+                        conn.execute("UPDATE outbox_targets SET status = 'dead', error = 'webhook no longer configured'"
+                                     " WHERE key = ? AND webhook = ?", (key, wid))
+                if not sent:
+                    continue
+                parts = [(filename, [body], content_type) for filename, content_type, body in conn.execute(
+                    "SELECT filename, content_type, body FROM outbox_parts WHERE key = ? ORDER BY seq", (key,))]
+                deliveries.append(Delivery(board_id, summary, parts, list(sent), key, sent))
+    return deliveries
+
+def resume_outbox(board_ids=None):
+    """Finish the deliveries earlier runs left in the outbox; returns {board id: error or None}
+
+    Nothing is fetched or rendered: the stored messages go out through the
+    dispatcher, skipping whatever each webhook already accepted. Every resumed
+    report is recorded in the run history, so a delivered one counts as the
+    board's latest report.
+    """
+    deliveries = outbox_pending(board_ids or TRELLO_BOARD_IDS)
+    if not deliveries:
+        return {}
+    print(f"[Sora] Resuming {len(deliveries)} undelivered report(s) from the outbox")
+    dispatcher = get_dispatcher()
+    t0 = time.perf_counter()
+    for delivery in deliveries:
+        dispatcher.queue(delivery)
+    results = {}
+    for delivery in deliveries:
+        run = RunLog(delivery.board_id, decision="resumed")
+        try:
+            delivery.wait()
+        except DeliveryFailed as e:
+            run.timings["send"] = time.perf_counter() - t0
+            print("[Sora] Failed to resume report for", e)
+            run.finish("failed", e)
+            results[delivery.board_id] = e
+            continue
+        run.timings["send"] = time.perf_counter() - t0
+        print(f"[Sora] Resumed report for board {delivery.board_id} delivered to {len(delivery.webhooks)} webhook(s)")
+        run.finish("delivered")
+        results.setdefault(delivery.board_id, None)
+    return results
+
+def days_since(last_run_date, today):
+    # if never run before, count it as 1 day to allow a reasonable chance to run
+    return (today - last_run_date).days if last_run_date else 1
+
+def run_chance(days_since_last):
+    """Progressive chance: base + (0.15 * days since last), capped"""
+    return min(BASE_CHANCE + DAILY_RAMP * days_since_last, MAX_CHANCE)
+
+def decide_run(days_since_last, rng=random):
+    """Roll today's decision: None to rest, else the delay in seconds before sending"""
+    if rng.random() >= run_chance(days_since_last):
+        return None
+    return rng.randint(0, MAX_DELAY_SECONDS)
+
+def render_boards(fetched, delay=None):
+    """(RunLog, report, summary) for each board fetch_boards delivered; fetch failures are recorded
+
+    Serially each board is rendered as soon as it arrives. With SORA_RENDER_WORKERS > 1
+    the boards are collected first and rendered in one pass, their shards sharing the pool.
+    """
+    ready = []
+    for board_id, board_data, error in fetched:
+        run = RunLog(board_id, delay)
+        if error is not None:
+            print(f"[Sora] Failed to fetch Trello board {board_id}:", error)
+            run.finish("failed", error)
+            continue
+        with run.timed("fetch"):
+            history = get_completion_history(board_id) if ANALYTICS else None
+        if RENDER_WORKERS > 1:
+            ready.append((run, board_data, history))
+            continue
+        with run.timed("render"):
+            report, summary = render_report(board_data, run.stats, history)
+        yield run, report, summary
+    if ready:
+        t0 = time.perf_counter()
+        results = render_reports([(board_data, run.stats, history) for run, board_data, history in ready])
+        elapsed = time.perf_counter() - t0
+        for (run, _, _), (report, summary) in zip(ready, results):
+            run.timings["render"] = elapsed  # one shared pass
+            yield run, report, summary
+
+def report_board(board_id=None, delay=None):
+    """Fetch, render and send one board's report, recording the run
+
+    With the outbox on, a report an earlier run failed to deliver is finished
+    instead (no fetch).
+    """
+    if OUTBOX:
+        resumed = resume_outbox([board_id or TRELLO_BOARD_IDS[0]])
+        if resumed:
+            error = next((e for e in resumed.values() if e is not None), None)
+            if error is not None:
+                raise error
+            return
+    run = RunLog(board_id, delay)
+    try:
+        with run.timed("fetch"):
+            board_data = fetch_board_data(board_id)
+            history = get_completion_history(board_id) if ANALYTICS else None
+        with run.timed("render"):
+            report, summary = render_report(board_data, run.stats, history)
+        with run.timed("send"):
+            deliver_report(board_id, report, summary)
+    except Exception as e:
+        run.finish("failed", e)
+        raise
+    run.finish("delivered")
+
+# -----------------------------
+# Daemon: many boards, jittered report times, state persisted across restarts
+# -----------------------------
+def load_daemon_state():
+    try:
+        with open(DAEMON_STATE_FILE, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except Exception:
+        return {}
+
+def save_daemon_state(state):
+    write_daemon_state(json.dumps(state, indent=1, sort_keys=True))
+
+def write_daemon_state(text):
+    tmp = DAEMON_STATE_FILE + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        f.write(text)
+    os.replace(tmp, DAEMON_STATE_FILE)
+
+def decision_time(day):
+    """Timestamp of the daily roll for a date"""
+    hour, minute = (int(x) for x in DAEMON_DECIDE_AT.split(":"))
+    return datetime(day.year, day.month, day.day, hour, minute).timestamp()
+
+def next_board_event(entry, now):
+    """When the daemon next needs to look at a board: its pending send, or its next daily roll"""
+    if entry.get("fire_at") is not None:
+        return entry["fire_at"]
+    today = datetime.fromtimestamp(now).date()
+    if entry.get("decided_for") != today.isoformat():
+        return max(now, decision_time(today))
+    return decision_time(today + timedelta(days=1))
+
+def daemon_last_runs(boards):
+    """{board id: date of its latest report} for (board id, state-file last_sent) pairs"""
+    return {board_id: read_last_run([board_id]) or (datetime.strptime(last, "%Y-%m-%d").date() if last else None)
+            for board_id, last in boards}
+
+def daemon_record_skipped(board_ids):
+    for board_id in board_ids:
+        record_run(board_id, "skipped")
+
+def daemon_report(board_id, delay, decided_for):
+    """report_board for a pending send; False if its report already went out
+
+    State writes are batched, so after a crash a board can still show the send
+    its last run delivered; the run history says whether it did.
+    """
+    last = read_last_run([board_id])
+    if decided_for and last is not None and last.isoformat() >= decided_for:
+        print(f"[Sora] Board {board_id}: report for {decided_for} was already sent")
+        return False
+    report_board(board_id, delay)
+    return True
+
+async def run_daemon(board_ids):
+    """Schedule every board in one event loop
+
+    Each board has a single entry in a heap of wake-up times and the loop sleeps
+    until the earliest one: waiting costs nothing per board, while the daily roll
+    is one pass over the boards due. Reports, run-history reads and writes, and
+    state writes (batched, at most every SORA_DAEMON_SAVE_SECONDS) run in worker
+    threads, at most DAEMON_WORKERS reports at a time.
+    """
+    import asyncio
+    state = load_daemon_state()
+    workers = asyncio.Semaphore(DAEMON_WORKERS)
+    saving = asyncio.Lock()
+    running = set()
+    heap = []
+    for board_id in board_ids:
+        entry = state.setdefault(board_id, {})
+        heapq.heappush(heap, (next_board_event(entry, time.time()), board_id))
+    save_daemon_state(state)
+    dirty, saved_at = False, time.monotonic()
+    print(f"[Sora] Daemon scheduling {len(board_ids)} boards")
+
+    async def save():
+        nonlocal dirty, saved_at
+        text = json.dumps(state, indent=1, sort_keys=True)  # entries only change on this thread
+        dirty, saved_at = False, time.monotonic()
+        async with saving:
+            await asyncio.to_thread(write_daemon_state, text)
+
+    async def job(board_id):
+        nonlocal dirty
+        entry = state[board_id]
+        async with workers:
+            try:
+                if await asyncio.to_thread(daemon_report, board_id, entry.get("delay"), entry.get("decided_for")):
+                    print(f"[Sora] Report for board {board_id} sent successfully!")
+            except Exception as e:
+                print(f"[Sora] Failed to send report for board {board_id}:", e)
+        entry["fire_at"] = None
+        dirty = True
+        heapq.heappush(heap, (next_board_event(entry, time.time()), board_id))
+        wake.set()
+
+    wake = asyncio.Event()
+    try:
+        while True:
+            now = time.time()
+            if not heap or heap[0][0] > now:
+                if dirty and time.monotonic() - saved_at >= DAEMON_SAVE_SECONDS:
+                    await save()
+                    continue
+                # sleep until the next event or state write (re-checked hourly in case the clock jumps)
+                timeout = min(heap[0][0] - now, 3600) if heap else 3600
+                if dirty:
+                    timeout = min(timeout, saved_at + DAEMON_SAVE_SECONDS - time.monotonic())
+                wake.clear()
+                try:
+                    await asyncio.wait_for(wake.wait(), max(timeout, 0))
+                except asyncio.TimeoutError:
+                    pass
+                continue
+
+            rolls = []
+            while heap and heap[0][0] <= now:
+                _, board_id = heapq.heappop(heap)
+                if state[board_id].get("fire_at") is not None:
+                    task = asyncio.create_task(job(board_id))
+                    running.add(task)
+                    task.add_done_callback(running.discard)  # rescheduled when the job finishes
+                else:
+                    rolls.append(board_id)
+            if not rolls:
+                continue
+
+            today = datetime.fromtimestamp(now).date()
+            last_runs = await asyncio.to_thread(daemon_last_runs,
+                                                [(b, state[b].get("last_sent")) for b in rolls])  # pre-history state files
+            skipped = []
+            for board_id in rolls:
+                entry = state[board_id]
+                days = days_since(last_runs[board_id], today)
+                delay = decide_run(days)
+                entry["decided_for"] = today.isoformat()
+                if delay is None:
+                    print(f"[Sora] Board {board_id}: taking a rest today (chance was {run_chance(days):.2f})")
+                    skipped.append(board_id)
+                else:
+                    entry["fire_at"] = now + delay
+                    entry["delay"] = delay
+                    print(f"[Sora] Board {board_id}: sending in {delay // 3600} hours and {(delay % 3600) // 60} minutes")
+                heapq.heappush(heap, (next_board_event(entry, now), board_id))
+            dirty = True
+            if skipped:
+                await asyncio.to_thread(daemon_record_skipped, skipped)
+    finally:
+        if dirty:
+            save_daemon_state(state)
 
 if __name__ == "__main__":
+    check_config()
+    run_outcome = "failed"  # updated as the run progresses; reported by the exit hook
+    atexit.register(lambda: finish_metrics(run_outcome))
+
+    if WEBHOOK_LISTEN:
+        start_webhook_receiver()
+        for board_id in TRELLO_BOARD_IDS:
+            get_live_board(board_id)
+        if not DAEMON:
+            # receiver only: keep snapshots fresh for later delta-sync runs
+            try:
+                while True:
+                    time.sleep(3600)
+            except KeyboardInterrupt:
+                print("[Sora] Webhook receiver stopped")
+            run_outcome = "stopped"
+            sys.exit(0)
+
+    if DAEMON:
+        import asyncio
+        try:
+            asyncio.run(run_daemon(TRELLO_BOARD_IDS))
+        except KeyboardInterrupt:
+            print("[Sora] Daemon stopped")
+        run_outcome = "stopped"
+        sys.exit(0)
+
+    # A report an earlier run could not deliver goes out first; it is today's report
+    if OUTBOX:
+        resumed = resume_outbox()
+        if resumed:
+            ok = all(e is None for e in resumed.values())
+            run_outcome = "sent" if ok else "failed"
+            sys.exit(0 if ok else 1)
+
     # Determine days since last run
-    last_run_date = read_last_run()
+    last_run_date = read_last_run() or read_last_run_file()
     today = datetime.now().date()
-    if last_run_date:
-        days_since_last = (today - last_run_date).days
-    else:
-        # if never run before, set to 1 day to allow reasonable chance to run
-        days_since_last = 1
+    days_since_last = days_since(last_run_date, today)
+    print(f"[Sora] Days since last: {days_since_last}, chance to run today: {run_chance(days_since_last):.2f}")
 
-    # Progressive chance: base + (0.15 * days since last), capped
-    base_chance = 0.2  # 20% base
-    progressive_chance = min(base_chance + 0.15 * days_since_last, 0.9)  # cap at 90%
-    print(f"[Sora] Days since last: {days_since_last}, chance to run today: {progressive_chance:.2f}")
-
-    # Decide whether to run today
-    if random.random() >= progressive_chance:
+    # Decide whether to run today; if so, a random 0-4 hour delay keeps timing unpredictable
+    delay_seconds = decide_run(days_since_last)
+    if delay_seconds is None:
         print("[Sora] Taking a rest today :) No report sent.")
+        for board_id in TRELLO_BOARD_IDS:
+            record_run(board_id, "skipped")
+        run_outcome = "skipped"
         sys.exit(0)
 
-    # If we decided to run, add a random 0-4 hour delay so timing is unpredictable
-    delay_seconds = random.randint(0, 4 * 3600)
     hrs = delay_seconds // 3600
     mins = (delay_seconds % 3600) // 60
     print(f"[Sora] Waiting {hrs} hours and {mins} minutes before sending...")
     time.sleep(delay_seconds)
+    metric_count("delay_seconds", delay_seconds)
+    start_profiler()
+
+    if len(TRELLO_BOARD_IDS) > 1:
+        # Multi-board: fetch all boards concurrently, report on each as soon as it arrives
+        sent = 0
+        routed = []  # with SORA_ROUTES or the outbox, deliveries go out in the background and are collected below
+        for run, report, summary in render_boards(fetch_boards(TRELLO_BOARD_IDS), delay_seconds):
+            board_id = run.board_id
+            if ROUTES or OUTBOX:
+                routed.append((run, get_dispatcher().submit(board_id, report, summary), time.perf_counter()))
+                continue
+            try:
+                with run.timed("send"):
+                    send_to_discord_file(report, summary)
+                print(f"[Sora] Report for board {board_id} sent successfully!")
+                run.finish("delivered")
+                sent += 1
+            except Exception as e:
+                print(f"[Sora] Failed to send report for board {board_id}:", e)
+                run.finish("failed", e)
+        for run, delivery, submitted in routed:
+            try:
+                delivery.wait()
+            except DeliveryFailed as e:
+                run.timings["send"] = time.perf_counter() - submitted
+                print("[Sora] Failed to send report for", e)
+                run.finish("failed", e)
+                continue
+            run.timings["send"] = time.perf_counter() - submitted
+            print(f"[Sora] Report for board {run.board_id} sent to {len(delivery.webhooks)} webhook(s)!")
+            run.finish("delivered")
+            sent += 1
+        print_cache_stats()
+        run_outcome = "sent" if sent == len(TRELLO_BOARD_IDS) else "failed"
+        sys.exit(0 if sent == len(TRELLO_BOARD_IDS) else 1)
 
     # Fetch Trello data and generate report
+    # (in streaming mode the fetch happens while the report is generated)
+    run = RunLog(delay=delay_seconds)
     try:
-        board_data = get_board_data()
+        with run.timed("fetch"):
+            board_data = fetch_board_data()
+            history = get_completion_history() if ANALYTICS else None
+        with run.timed("render"):
+            report, summary = render_report(board_data, run.stats, history)
     except Exception as e:
         print("[Sora] Failed to fetch Trello board:", e)
+        run.finish("failed", e)
         sys.exit(1)
-
-    report_text, summary = generate_report(board_data)
+    print_cache_stats()
 
     # Send to Discord
     try:
-        send_to_discord_file(report_text, summary)
+        with run.timed("send"):
+            deliver_report(None, report, summary)
         print("[Sora] Report sent successfully!")
-        # update last run
-        write_last_run(today)
+        run_outcome = "sent"
+        # update the run history (the scheduler reads the last run from it)
+        run.finish("delivered")
     except Exception as e:
         print("[Sora] Failed to send report:", e)
+        run.finish("failed", e)
         sys.exit(1)
\ No newline at end of file